@@ -5,4 +5,32 @@ from .adjoint import (AdjFloat, sin, cos, tan, exp, log, sinh, # noqa F401
                       TanBlock, ExpBlock, LogBlock, SinhBlock, # noqa F401
                       CoshBlock, TanhBlock, AsinBlock, AcosBlock, # noqa F401
                       AtanBlock, AsinhBlock, AcoshBlock, AtanhBlock, # noqa F401
-                      clear_tape) # noqa F401
+                      GuardBlock, RetraceError, Tape, get_tape, # noqa F401
+                      clear_tape, fsum, prod, dot, polyval, # noqa F401
+                      FsumBlock, ProdBlock, DotBlock, # noqa F401
+                      PolyvalBlock) # noqa F401
+from .compact_tape import CompactTape, CompactFloat # noqa F401
+from .linear_tape import LinearTape # noqa F401
+from .spilling_tape import SpillingTape # noqa F401
+from .tape_file import MappedTape, save_tape, load_tape # noqa F401
+from .adj_array import (AdjArray, ArrayAddBlock, ArraySubBlock, # noqa F401
+                        ArrayMulBlock, ArrayDivBlock, # noqa F401
+                        ArrayPowBlock, ArraySumBlock, # noqa F401
+                        ArraySinBlock, ArrayCosBlock, # noqa F401
+                        ArrayTanBlock, ArrayExpBlock, # noqa F401
+                        ArrayLogBlock, ArraySinhBlock, # noqa F401
+                        ArrayCoshBlock, ArrayTanhBlock, # noqa F401
+                        ArrayAsinBlock, ArrayAcosBlock, # noqa F401
+                        ArrayAtanBlock, ArrayAsinhBlock, # noqa F401
+                        ArrayAcoshBlock, ArrayAtanhBlock) # noqa F401
+from .optimise import (optimise, fold_constants, PASSES, # noqa F401
+                       eliminate_common_subexpressions, # noqa F401
+                       eliminate_dead_code, preaccumulate, # noqa F401
+                       PreaccumulatedBlock, # noqa F401
+                       PREACCUMULATE_INPUTS) # noqa F401
+from .replay import Trace # noqa F401
+from .compiler import CompiledTape, compile_tape # noqa F401
+from .checkpointing import Revolve, recomputations # noqa F401
+from .profiler import Profiler, tape_bytes # noqa F401
+from .primitives import (Primitive, PrimitiveBlock, primitive, # noqa F401
+                         PRIMITIVES) # noqa F401
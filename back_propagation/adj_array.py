@@ -0,0 +1,390 @@
+"""Adjoint algorithmic differentiation on whole NumPy arrays."""
+from functools import wraps
+from numbers import Number
+
+import numpy as np
+
+from .adjoint import AdjFloat, Block, get_tape
+
+
+def deal_with_other_types(meth):
+    """Cast the second argument of a method to AdjArray when needed."""
+    @wraps(meth)
+    def fn(self, other):
+        if not isinstance(other, (AdjArray, AdjFloat)):
+            if isinstance(other, (Number, np.ndarray)):
+                other = AdjArray(other, 0)
+            else:
+                raise TypeError(
+                    (f"Can only operate on an AdjArray, an AdjFloat, an "
+                     f"ndarray or a Number, not a {type(other).__name__}"))
+        return meth(self, other)
+    return fn
+
+
+def unbroadcast(adj, shape):
+    """Reduce (or expand) an adjoint to the shape of its operand."""
+    adj = np.asarray(adj)
+    if adj.shape == shape:
+        return adj
+    adj = np.broadcast_to(adj, np.broadcast_shapes(adj.shape, shape))
+    extra = adj.ndim - len(shape)
+    axes = tuple(range(extra)) + tuple(
+        i + extra for i, n in enumerate(shape)
+        if n == 1 and adj.shape[i + extra] != 1)
+    return adj.sum(axis=axes).reshape(shape)
+
+
+def _unary(fn, block):
+    """Return a method applying the ufunc fn and recording block."""
+    def meth(self):
+        result = type(self)(fn(self.val), 0)
+        get_tape().append(block(result, self))
+        return result
+    meth.__doc__ = "Implement " + fn.__name__ + " for AdjArray."
+    return meth
+
+
+def _binary(block, x, y, val):
+    """Record block applied to x and y, returning an AdjArray of val."""
+    result = AdjArray(val, 0)
+    get_tape().append(block(result, x, y))
+    return result
+
+
+class ArrayBlock(Block):
+    """Log an operation on arrays onto the tape."""
+
+    def recompute(self):
+        """Recompute the value of the result from the values of the ops."""
+        self.result.val = self.function(*[
+            o.val if isinstance(o, (AdjArray, AdjFloat)) else o
+            for o in self.ops])
+
+    def accumulate(self, op, adj):
+        """Add adj, fitted to the shape of op, to the adjoint of op."""
+        op.adj += unbroadcast(adj, np.shape(op.val))
+
+
+class ArrayAddBlock(ArrayBlock):
+    """Log an elementwise addition onto the tape."""
+
+    function = staticmethod(np.add)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        for o in self.ops:
+            self.accumulate(o, self.result.adj)
+
+
+class ArraySubBlock(ArrayBlock):
+    """Log an elementwise subtraction onto the tape."""
+
+    function = staticmethod(np.subtract)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.accumulate(self.ops[0], self.result.adj)
+        self.accumulate(self.ops[1], -self.result.adj)
+
+
+class ArrayMulBlock(ArrayBlock):
+    """Log an elementwise multiplication onto the tape."""
+
+    function = staticmethod(np.multiply)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.accumulate(self.ops[0], self.ops[1].val * self.result.adj)
+        self.accumulate(self.ops[1], self.ops[0].val * self.result.adj)
+
+
+class ArrayDivBlock(ArrayBlock):
+    """Log an elementwise division onto the tape."""
+
+    function = staticmethod(np.true_divide)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.accumulate(self.ops[0], self.result.adj / self.ops[1].val)
+        self.accumulate(self.ops[1], -(self.result.val * self.result.adj /
+                                       self.ops[1].val))
+
+
+class ArrayPowBlock(ArrayBlock):
+    """Log an elementwise exponentiation onto the tape."""
+
+    function = staticmethod(np.power)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        x, y = self.ops[0].val, self.ops[1].val
+        self.accumulate(self.ops[0], y * x ** (y - 1) * self.result.adj)
+        positive = x > 0
+        logx = np.log(x, out=np.zeros(np.shape(x)), where=positive)
+        self.accumulate(self.ops[1], logx * self.result.val *
+                        self.result.adj)
+
+
+class ArraySumBlock(ArrayBlock):
+    """Log a sum over all elements onto the tape."""
+
+    function = staticmethod(np.sum)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.accumulate(self.ops[0], self.result.adj)
+
+
+class ArraySinBlock(ArrayBlock):
+    """Log an elementwise sin operation onto the tape."""
+
+    function = staticmethod(np.sin)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += np.cos(self.ops[0].val) * self.result.adj
+
+
+class ArrayCosBlock(ArrayBlock):
+    """Log an elementwise cos operation onto the tape."""
+
+    function = staticmethod(np.cos)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj -= np.sin(self.ops[0].val) * self.result.adj
+
+
+class ArrayTanBlock(ArrayBlock):
+    """Log an elementwise tan operation onto the tape."""
+
+    function = staticmethod(np.tan)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += (1 + self.result.val ** 2) * self.result.adj
+
+
+class ArrayExpBlock(ArrayBlock):
+    """Log an elementwise exp operation onto the tape."""
+
+    function = staticmethod(np.exp)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += self.result.val * self.result.adj
+
+
+class ArrayLogBlock(ArrayBlock):
+    """Log an elementwise log operation onto the tape."""
+
+    function = staticmethod(np.log)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += self.result.adj / self.ops[0].val
+
+
+class ArraySinhBlock(ArrayBlock):
+    """Log an elementwise sinh operation onto the tape."""
+
+    function = staticmethod(np.sinh)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += np.cosh(self.ops[0].val) * self.result.adj
+
+
+class ArrayCoshBlock(ArrayBlock):
+    """Log an elementwise cosh operation onto the tape."""
+
+    function = staticmethod(np.cosh)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += np.sinh(self.ops[0].val) * self.result.adj
+
+
+class ArrayTanhBlock(ArrayBlock):
+    """Log an elementwise tanh operation onto the tape."""
+
+    function = staticmethod(np.tanh)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += (1 - self.result.val ** 2) * self.result.adj
+
+
+class ArrayAsinBlock(ArrayBlock):
+    """Log an elementwise arcsin operation onto the tape."""
+
+    function = staticmethod(np.arcsin)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += (self.result.adj /
+                            np.sqrt(1 - self.ops[0].val ** 2))
+
+
+class ArrayAcosBlock(ArrayBlock):
+    """Log an elementwise arccos operation onto the tape."""
+
+    function = staticmethod(np.arccos)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj -= (self.result.adj /
+                            np.sqrt(1 - self.ops[0].val ** 2))
+
+
+class ArrayAtanBlock(ArrayBlock):
+    """Log an elementwise arctan operation onto the tape."""
+
+    function = staticmethod(np.arctan)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += self.result.adj / (1 + self.ops[0].val ** 2)
+
+
+class ArrayAsinhBlock(ArrayBlock):
+    """Log an elementwise arsinh operation onto the tape."""
+
+    function = staticmethod(np.arcsinh)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += (self.result.adj /
+                            np.sqrt(1 + self.ops[0].val ** 2))
+
+
+class ArrayAcoshBlock(ArrayBlock):
+    """Log an elementwise arcosh operation onto the tape."""
+
+    function = staticmethod(np.arccosh)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += (self.result.adj / np.sqrt(self.ops[0].val ** 2
+                                                      - 1))
+
+
+class ArrayAtanhBlock(ArrayBlock):
+    """Log an elementwise artanh operation onto the tape."""
+
+    function = staticmethod(np.arctanh)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjArray."""
+        self.ops[0].adj += self.result.adj / (1 - self.ops[0].val ** 2)
+
+
+class AdjArray:
+    """Implement backward-propagation on NumPy arrays.
+
+    Every operation records a single Block on the current tape, whatever
+    the size of the array. Unary Blocks share the shape of their operand,
+    so they update the adjoint directly; binary Blocks broadcast like
+    NumPy and sum the adjoint back down to each operand's shape.
+    """
+
+    # Make NumPy hand mixed ndarray/AdjArray operators to AdjArray.
+    __array_ufunc__ = None
+
+    def __init__(self, val, adj):
+        """Initialise AdjArray."""
+        self.val = np.asarray(val, dtype=float)
+        self.adj = adj
+
+    def __repr__(self):
+        """Representation of AdjArray."""
+        return (self.__class__.__name__ + "(" + str(self.val) +
+                "," + str(self.adj) + ")")
+
+    def __len__(self):
+        """Return the length of the array."""
+        return len(self.val)
+
+    @property
+    def shape(self):
+        """Return the shape of the array."""
+        return self.val.shape
+
+    def derivative(self, *vars, start=0):
+        """Return the derivative of the sum of AdjArray.
+
+        The tape is run backwards from a seed of one in every element.
+        """
+        return get_tape().derivative(self, *vars, start=start)
+
+    def sum(self):
+        """Sum every element into a 0-d AdjArray."""
+        result = type(self)(self.val.sum(), 0)
+        get_tape().append(ArraySumBlock(result, self))
+        return result
+
+    @deal_with_other_types
+    def __add__(self, other):
+        """Implement addition."""
+        return _binary(ArrayAddBlock, self, other, self.val + other.val)
+
+    @deal_with_other_types
+    def __radd__(self, other):
+        """Reverse addition."""
+        return _binary(ArrayAddBlock, other, self, other.val + self.val)
+
+    @deal_with_other_types
+    def __sub__(self, other):
+        """Implement subtraction."""
+        return _binary(ArraySubBlock, self, other, self.val - other.val)
+
+    @deal_with_other_types
+    def __rsub__(self, other):
+        """Reverse subtraction."""
+        return _binary(ArraySubBlock, other, self, other.val - self.val)
+
+    @deal_with_other_types
+    def __mul__(self, other):
+        """Implement multiplication."""
+        return _binary(ArrayMulBlock, self, other, self.val * other.val)
+
+    @deal_with_other_types
+    def __rmul__(self, other):
+        """Reverse multiplication."""
+        return _binary(ArrayMulBlock, other, self, other.val * self.val)
+
+    @deal_with_other_types
+    def __truediv__(self, other):
+        """Implement division."""
+        return _binary(ArrayDivBlock, self, other, self.val / other.val)
+
+    @deal_with_other_types
+    def __rtruediv__(self, other):
+        """Reverse division."""
+        return _binary(ArrayDivBlock, other, self, other.val / self.val)
+
+    @deal_with_other_types
+    def __pow__(self, other):
+        """Implement exponentiation."""
+        return _binary(ArrayPowBlock, self, other, self.val ** other.val)
+
+    @deal_with_other_types
+    def __rpow__(self, other):
+        """Reverse exponentiation."""
+        return _binary(ArrayPowBlock, other, self, other.val ** self.val)
+
+    sin = _unary(np.sin, ArraySinBlock)
+    cos = _unary(np.cos, ArrayCosBlock)
+    tan = _unary(np.tan, ArrayTanBlock)
+    exp = _unary(np.exp, ArrayExpBlock)
+    log = _unary(np.log, ArrayLogBlock)
+    sinh = _unary(np.sinh, ArraySinhBlock)
+    cosh = _unary(np.cosh, ArrayCoshBlock)
+    tanh = _unary(np.tanh, ArrayTanhBlock)
+    asin = _unary(np.arcsin, ArrayAsinBlock)
+    acos = _unary(np.arccos, ArrayAcosBlock)
+    atan = _unary(np.arctan, ArrayAtanBlock)
+    asinh = _unary(np.arcsinh, ArrayAsinhBlock)
+    acosh = _unary(np.arccosh, ArrayAcoshBlock)
+    atanh = _unary(np.arctanh, ArrayAtanhBlock)
@@ -1,16 +1,31 @@
 """A first attempt at implementing adjoint algorithmic differentiation."""
 import math
+import operator
+from contextvars import ContextVar
 from functools import wraps
 from numbers import Number
+from types import SimpleNamespace
+
+import numpy as np
+
+from forward_propagation import tangent_linear
 
 
 def deal_with_other_types(meth):
-    """Cast the second argument of a method to AdjFloat when needed."""
+    """Check the second argument of a method.
+
+    Numbers are passed through as passive operands, which are recorded as
+    they are and receive no adjoint. Other types that implement the
+    reflected operator, such as AdjArray, are left to handle the operation
+    themselves.
+    """
     @wraps(meth)
     def fn(self, other):
         if not isinstance(other, AdjFloat):
             if isinstance(other, Number):
-                other = AdjFloat(other, 0)
+                pass
+            elif hasattr(type(other), "__r" + meth.__name__[2:]):
+                return NotImplemented
             else:
                 raise TypeError(
                     (f"Can only operate on a AdjFloat or a Number, "
@@ -20,12 +35,19 @@ def deal_with_other_types(meth):
 
 
 def deal_with_other_types2(meth):
-    """Cast the argument of a method to AdjFloat when needed."""
+    """Evaluate a method on a passive argument without taping it.
+
+    Numbers are passive, so the function is applied to them directly and
+    nothing is recorded. Other types may supply their own rule as a method
+    of the same name, e.g. ``x.sin()``, which is then called instead.
+    """
     @wraps(meth)
     def fn(self):
         if not isinstance(self, AdjFloat):
-            if isinstance(self, Number):
-                self = AdjFloat(self, 0)
+            if hasattr(self, meth.__name__):
+                return getattr(self, meth.__name__)()
+            elif isinstance(self, Number):
+                return getattr(generic, meth.__name__)(self)
             else:
                 raise TypeError(
                     (f"Can only operate on a AdjFloat or a Number, "
@@ -34,11 +56,194 @@ def deal_with_other_types2(meth):
     return fn
 
 
+def elementary(name):
+    """Return the math function name, extended to values such as Dfloat.
+
+    Plain numbers take the fast path through math; anything math rejects
+    is handed to the rule of the same name in forward_propagation, so a
+    tape can carry Dfloat values and adjoints for forward-over-reverse.
+    """
+    function = getattr(math, name)
+    fallback = getattr(tangent_linear, name)
+
+    def fn(x):
+        try:
+            return function(x)
+        except TypeError:
+            return fallback(x)
+    fn.__name__ = name
+    return fn
+
+
+# The elementary functions used for values and partial derivatives.
+generic = SimpleNamespace(**{
+    name: elementary(name) for name in
+    ("sqrt", "sin", "cos", "tan", "exp", "log", "sinh", "cosh", "tanh",
+     "asin", "acos", "atan", "asinh", "acosh", "atanh")})
+
+
+def value(x):
+    """Return the value of an active (AdjFloat) or passive operand."""
+    return x.val if isinstance(x, AdjFloat) else x
+
+
+# The adjoint every result starts a sweep with. Adding any contribution
+# replaces this object, so Blocks whose result still holds it are skipped.
+UNREACHED = 0
+
+
+class RetraceError(RuntimeError):
+    """Raised when a replayed tape no longer matches the calculation."""
+
+
+class Tape:
+    """Record the Blocks of AdjFloat calculations for the reverse sweep.
+
+    A tape is made current with a ``with`` statement. The current tape is
+    held in a context variable, so each thread and asyncio task that enters
+    its own tape records and differentiates independently; outside any
+    ``with`` statement the module's default tape is used.
+    """
+
+    def __init__(self):
+        """Initialise Tape."""
+        self.blocks = []
+        self._len = 0
+        self._tokens = []
+
+    def __repr__(self):
+        """Representation of Tape."""
+        return self.__class__.__name__ + "(" + str(len(self)) + " blocks)"
+
+    def __len__(self):
+        """Return the number of recorded Blocks."""
+        return self._len
+
+    def __getitem__(self, i):
+        """Return the i-th recorded Block."""
+        if not -self._len <= i < self._len:
+            raise IndexError("tape index out of range")
+        return self.blocks[i % self._len]
+
+    def __iter__(self):
+        """Iterate over the recorded Blocks in order."""
+        blocks = self.blocks
+        for i in range(self._len):
+            yield blocks[i]
+
+    def __reversed__(self):
+        """Iterate over the recorded Blocks in reverse order."""
+        blocks = self.blocks
+        for i in range(self._len - 1, -1, -1):
+            yield blocks[i]
+
+    def __enter__(self):
+        """Make this the current tape."""
+        self._tokens.append(_current_tape.set(self))
+        return self
+
+    def __exit__(self, *exc):
+        """Restore the previously current tape."""
+        _current_tape.reset(self._tokens.pop())
+
+    def append(self, block):
+        """Record a Block, reusing a slot freed by clear if there is one."""
+        block.result.position = self._len
+        if self._len < len(self.blocks):
+            self.blocks[self._len] = block
+        else:
+            self.blocks.append(block)
+        self._len += 1
+
+    def position(self):
+        """Return a marker for the current end of the tape."""
+        return self._len
+
+    def position_of(self, x):
+        """Return the position of the Block that produced x, or -1."""
+        i = getattr(x, "position", -1)
+        if 0 <= i < self._len and self.blocks[i].result is x:
+            return i
+        return -1
+
+    def rewind(self, position):
+        """Drop the Blocks recorded after position, keeping the storage."""
+        blocks = self.blocks
+        for i in range(position, self._len):
+            blocks[i] = None
+        self._len = min(position, self._len)
+
+    def clear(self):
+        """Drop every recorded Block, keeping the storage for reuse."""
+        self.rewind(0)
+
+    def replay(self):
+        """Recompute every recorded value, in order, from the inputs.
+
+        The values of the inputs are read from the AdjFloats they were
+        recorded from, so set their val before replaying. Raises
+        RetraceError if a recorded comparison changes outcome.
+        """
+        for block in self:
+            block.recompute()
+
+    def derivative(self, output, *vars, start=0):
+        """Return the derivative of output by running the tape backwards."""
+        return self.sweep(((output, 1),), vars, start)
+
+    def jacobian(self, outputs, vars, start=0):
+        """Return the Jacobian of outputs by vars from one reverse sweep.
+
+        Each output is seeded with its own row of the identity, so every
+        adjoint on the tape is a NumPy vector with one entry per output and
+        the Blocks' rules propagate all of them at once.
+        """
+        seeds = tuple((y, e) for y, e in zip(outputs, np.eye(len(outputs)))
+                      if isinstance(y, AdjFloat))
+        jac = np.zeros((len(outputs), len(vars)))
+        for i, adj in enumerate(self.sweep(seeds, vars, start)):
+            jac[:, i] = adj
+        return jac
+
+    def sweep(self, seeds, vars, start=0):
+        """Run the tape backwards and return the adjoints of vars.
+
+        seeds pairs each output AdjFloat with the adjoint it starts from, so
+        one sweep computes a weighted sum of the outputs' derivatives. The
+        sweep runs from the last output's position back to the marker
+        start, and Blocks whose result no output reached are skipped;
+        values produced before start are treated as independent.
+        """
+        end = max([self.position_of(output) for output, _ in seeds] + [-1])
+        blocks = self.blocks
+        for i in range(start, end + 1):
+            blocks[i].result.adj = UNREACHED
+        for v in vars:
+            v.adj = 0
+        for output, seed in seeds:
+            output.adj = 0
+        for output, seed in seeds:
+            output.adj += seed
+        for i in range(end, start - 1, -1):
+            block = blocks[i]
+            if block.result.adj is not UNREACHED:
+                block.compute_adjoint()
+        return tuple(v.adj for v in vars)
+
+
+_default_tape = Tape()
+_current_tape = ContextVar("tape", default=_default_tape)
+
+
+def get_tape():
+    """Return the current tape."""
+    return _current_tape.get()
+
+
 class AdjFloat:
     """Implement backward-propagation differentiation."""
 
-    global tape
-    tape = []
+    __slots__ = ("val", "adj", "position")
 
     def __init__(self, val, adj):
         """Initialise AdjFloat."""
@@ -50,22 +255,19 @@ class AdjFloat:
         return (self.__class__.__name__ + "(" + str(self.val) +
                 "," + str(self.adj) + ")")
 
-    def derivative(self, *vars):
-        """Return the derivative of AdjFloat by running the tape backwards."""
-        for v in vars:
-            v.adj = 0
-        for block in tape:
-            block.result.adj = 0
-        self.adj = 1
-        for block in reversed(tape):
-            block.compute_adjoint()
-        return tuple(v.adj for v in vars)
+    def derivative(self, *vars, start=0):
+        """Return the derivative of AdjFloat by running the tape backwards.
+
+        Only the Blocks between the marker start and this AdjFloat's
+        position on the current tape are swept.
+        """
+        return get_tape().derivative(self, *vars, start=start)
 
     @deal_with_other_types
     def __add__(self, other):
         """Implement addition."""
-        result = type(self)(self.val + other.val, 0)
-        tape.append(AddBlock(result, self, other))
+        result = type(self)(self.val + value(other), 0)
+        get_tape().append(AddBlock(result, self, other))
         return result
 
     @deal_with_other_types
@@ -76,20 +278,22 @@ class AdjFloat:
     @deal_with_other_types
     def __sub__(self, other):
         """Implement subtraction."""
-        result = type(self)(self.val - other.val, 0)
-        tape.append(SubBlock(result, self, other))
+        result = type(self)(self.val - value(other), 0)
+        get_tape().append(SubBlock(result, self, other))
         return result
 
     @deal_with_other_types
     def __rsub__(self, other):
         """Reverse subtraction."""
-        return other - self
+        result = type(self)(value(other) - self.val, 0)
+        get_tape().append(SubBlock(result, other, self))
+        return result
 
     @deal_with_other_types
     def __mul__(self, other):
         """Implement multiplication."""
-        result = type(self)(self.val * other.val, 0)
-        tape.append(MulBlock(result, self, other))
+        result = type(self)(self.val * value(other), 0)
+        get_tape().append(MulBlock(result, self, other))
         return result
 
     @deal_with_other_types
@@ -100,140 +304,273 @@ class AdjFloat:
     @deal_with_other_types
     def __truediv__(self, other):
         """Implement division."""
-        result = type(self)(self.val / other.val, 0)
-        tape.append(DivBlock(result, self, other))
+        result = type(self)(self.val / value(other), 0)
+        get_tape().append(DivBlock(result, self, other))
         return result
 
     @deal_with_other_types
     def __rtruediv__(self, other):
         """Reverse division."""
-        return other / self
+        result = type(self)(value(other) / self.val, 0)
+        get_tape().append(DivBlock(result, other, self))
+        return result
 
     @deal_with_other_types
     def __pow__(self, other):
         """Implement subtraction."""
-        result = type(self)(self.val ** other.val, 0)
-        tape.append(PowBlock(result, self, other))
+        result = type(self)(self.val ** value(other), 0)
+        get_tape().append(PowBlock(result, self, other))
         return result
 
     @deal_with_other_types
     def __rpow__(self, other):
         """Reverse exponentiation."""
-        return other ** self
+        result = type(self)(value(other) ** self.val, 0)
+        get_tape().append(PowBlock(result, other, self))
+        return result
+
+    def _guard(self, function, other):
+        """Compare values, recording the outcome on the tape."""
+        outcome = function(self.val, value(other))
+        get_tape().append(GuardBlock(function, outcome, self, other))
+        return outcome
+
+    @deal_with_other_types
+    def __lt__(self, other):
+        """Implement less than, recorded as a guard."""
+        return self._guard(operator.lt, other)
+
+    @deal_with_other_types
+    def __le__(self, other):
+        """Implement less than or equal, recorded as a guard."""
+        return self._guard(operator.le, other)
+
+    @deal_with_other_types
+    def __gt__(self, other):
+        """Implement greater than, recorded as a guard."""
+        return self._guard(operator.gt, other)
+
+    @deal_with_other_types
+    def __ge__(self, other):
+        """Implement greater than or equal, recorded as a guard."""
+        return self._guard(operator.ge, other)
+
+    def sin(self):
+        """Implement sin as a method, for callers dispatching on it."""
+        return sin(self)
+
+    def cos(self):
+        """Implement cos as a method, for callers dispatching on it."""
+        return cos(self)
+
+    def tan(self):
+        """Implement tan as a method, for callers dispatching on it."""
+        return tan(self)
+
+    def exp(self):
+        """Implement exp as a method, for callers dispatching on it."""
+        return exp(self)
+
+    def log(self):
+        """Implement log as a method, for callers dispatching on it."""
+        return log(self)
+
+    def sinh(self):
+        """Implement sinh as a method, for callers dispatching on it."""
+        return sinh(self)
+
+    def cosh(self):
+        """Implement cosh as a method, for callers dispatching on it."""
+        return cosh(self)
+
+    def tanh(self):
+        """Implement tanh as a method, for callers dispatching on it."""
+        return tanh(self)
+
+    def asin(self):
+        """Implement asin as a method, for callers dispatching on it."""
+        return asin(self)
+
+    def acos(self):
+        """Implement acos as a method, for callers dispatching on it."""
+        return acos(self)
+
+    def atan(self):
+        """Implement atan as a method, for callers dispatching on it."""
+        return atan(self)
+
+    def asinh(self):
+        """Implement asinh as a method, for callers dispatching on it."""
+        return asinh(self)
+
+    def acosh(self):
+        """Implement acosh as a method, for callers dispatching on it."""
+        return acosh(self)
+
+    def atanh(self):
+        """Implement atanh as a method, for callers dispatching on it."""
+        return atanh(self)
 
 
 @deal_with_other_types2
 def sin(x):
     """Implement sin for AdjFloat."""
-    result = type(x)(math.sin(x.val), 0)
-    tape.append(SinBlock(result, x))
+    result = type(x)(generic.sin(x.val), 0)
+    get_tape().append(SinBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def cos(x):
     """Implement cos for AdjFloat."""
-    result = type(x)(math.cos(x.val), 0)
-    tape.append(CosBlock(result, x))
+    result = type(x)(generic.cos(x.val), 0)
+    get_tape().append(CosBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def tan(x):
     """Implement tan for AdjFloat."""
-    result = type(x)(math.tan(x.val), 0)
-    tape.append(TanBlock(result, x))
+    result = type(x)(generic.tan(x.val), 0)
+    get_tape().append(TanBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def exp(x):
     """Implement exp for AdjFloat."""
-    result = type(x)(math.exp(x.val), 0)
-    tape.append(ExpBlock(result, x))
+    result = type(x)(generic.exp(x.val), 0)
+    get_tape().append(ExpBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def log(x):
     """Implement log for AdjFloat."""
-    result = type(x)(math.log(x.val), 0)
-    tape.append(LogBlock(result, x))
+    result = type(x)(generic.log(x.val), 0)
+    get_tape().append(LogBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def sinh(x):
     """Implement sinh for AdjFloat."""
-    result = type(x)(math.sinh(x.val), 0)
-    tape.append(SinhBlock(result, x))
+    result = type(x)(generic.sinh(x.val), 0)
+    get_tape().append(SinhBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def cosh(x):
     """Implement cosh for AdjFloat."""
-    result = type(x)(math.cosh(x.val), 0)
-    tape.append(CoshBlock(result, x))
+    result = type(x)(generic.cosh(x.val), 0)
+    get_tape().append(CoshBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def tanh(x):
     """Implement tanh for AdjFloat."""
-    result = type(x)(math.tanh(x.val), 0)
-    tape.append(TanhBlock(result, x))
+    result = type(x)(generic.tanh(x.val), 0)
+    get_tape().append(TanhBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def asin(x):
     """Implement asin for AdjFloat."""
-    result = type(x)(math.asin(x.val), 0)
-    tape.append(AsinBlock(result, x))
+    result = type(x)(generic.asin(x.val), 0)
+    get_tape().append(AsinBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def acos(x):
     """Implement acos for AdjFloat."""
-    result = type(x)(math.acos(x.val), 0)
-    tape.append(AcosBlock(result, x))
+    result = type(x)(generic.acos(x.val), 0)
+    get_tape().append(AcosBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def atan(x):
     """Implement atan for AdjFloat."""
-    result = type(x)(math.atan(x.val), 0)
-    tape.append(AtanBlock(result, x))
+    result = type(x)(generic.atan(x.val), 0)
+    get_tape().append(AtanBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def asinh(x):
     """Implement asinh for AdjFloat."""
-    result = type(x)(math.asinh(x.val), 0)
-    tape.append(AsinhBlock(result, x))
+    result = type(x)(generic.asinh(x.val), 0)
+    get_tape().append(AsinhBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def acosh(x):
     """Implement acosh for AdjFloat."""
-    result = type(x)(math.acosh(x.val), 0)
-    tape.append(AcoshBlock(result, x))
+    result = type(x)(generic.acosh(x.val), 0)
+    get_tape().append(AcoshBlock(result, x))
     return result
 
 
 @deal_with_other_types2
 def atanh(x):
     """Implement atanh for AdjFloat."""
-    result = type(x)(math.atanh(x.val), 0)
-    tape.append(AtanhBlock(result, x))
+    result = type(x)(generic.atanh(x.val), 0)
+    get_tape().append(AtanhBlock(result, x))
+    return result
+
+
+def _record(block_type, val, ops):
+    """Record a Block of block_type over ops with a fresh result."""
+    result = AdjFloat(val, 0)
+    get_tape().append(block_type(result, *ops))
     return result
 
 
+def fsum(xs):
+    """Sum xs, recording one FsumBlock if any of them is an AdjFloat."""
+    xs = tuple(xs)
+    if not any(isinstance(x, AdjFloat) for x in xs):
+        return tangent_linear.fsum(xs)
+    return _record(FsumBlock, FsumBlock.function(*map(value, xs)), xs)
+
+
+def prod(xs):
+    """Multiply xs, recording one ProdBlock if any of them is an AdjFloat."""
+    xs = tuple(xs)
+    if not any(isinstance(x, AdjFloat) for x in xs):
+        return tangent_linear.prod(xs)
+    return _record(ProdBlock, ProdBlock.function(*map(value, xs)), xs)
+
+
+def dot(xs, ys):
+    """Return the dot product of xs and ys, recording one DotBlock."""
+    xs, ys = tuple(xs), tuple(ys)
+    if len(xs) != len(ys):
+        raise ValueError("dot needs sequences of the same length")
+    ops = xs + ys
+    if not any(isinstance(o, AdjFloat) for o in ops):
+        return tangent_linear.dot(xs, ys)
+    return _record(DotBlock, DotBlock.function(*map(value, ops)), ops)
+
+
+def polyval(p, x):
+    """Evaluate the polynomial p at x, recording one PolyvalBlock.
+
+    p holds the coefficients from the highest power down, as in
+    numpy.polyval.
+    """
+    ops = tuple(p) + (x,)
+    if not any(isinstance(o, AdjFloat) for o in ops):
+        return tangent_linear.polyval(p, x)
+    return _record(PolyvalBlock, PolyvalBlock.function(*map(value, ops)),
+                   ops)
+
+
 class Block:
     """Log an operation onto the tape to implement chain rule in reverse."""
 
@@ -247,92 +584,196 @@ class Block:
         return (self.__class__.__name__ + "(" + str(self.result) +
                 "," + str(self.ops) + ")")
 
+    def recompute(self):
+        """Recompute the value of the result from the values of the ops."""
+        self.result.val = self.function(*[value(o) for o in self.ops])
+
+
+class GuardBlock(Block):
+    """Log the outcome of a comparison onto the tape.
+
+    The outcome is kept as the value of the result. Replaying the tape
+    raises RetraceError if the comparison comes out differently, since the
+    recorded operations then no longer describe the calculation.
+    """
+
+    def __init__(self, function, outcome, *ops):
+        """Initialise GuardBlock."""
+        super().__init__(AdjFloat(outcome, 0), *ops)
+        self.function = function
+
+    def recompute(self):
+        """Check that the comparison still has the recorded outcome."""
+        if self.function(*[value(o) for o in self.ops]) != self.result.val:
+            raise RetraceError(
+                f"{self.function.__name__} comparison changed outcome")
+
+    def compute_adjoint(self):
+        """Comparisons pass nothing back to AdjFloat."""
+
+    def partials(self):
+        """Comparisons have no partial derivatives."""
+        return ()
+
 
 class AddBlock(Block):
     """Log an addition operation onto the tape."""
 
+    function = staticmethod(operator.add)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return 1, 1
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
         for o in self.ops:
-            o.adj += 1*self.result.adj
+            if isinstance(o, AdjFloat):
+                o.adj += 1*self.result.adj
 
 
 class SubBlock(Block):
     """Log a subtraction operation onto the tape."""
 
+    function = staticmethod(operator.sub)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return 1, -1
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += 1*self.result.adj
-        self.ops[1].adj -= 1*self.result.adj
+        x, y = self.ops
+        if isinstance(x, AdjFloat):
+            x.adj += 1*self.result.adj
+        if isinstance(y, AdjFloat):
+            y.adj -= 1*self.result.adj
 
 
 class MulBlock(Block):
     """Log a multiplication operation onto the tape."""
 
+    function = staticmethod(operator.mul)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        x, y = self.ops
+        return value(y), value(x)
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
         for i, o in enumerate(self.ops):
-            o.adj += self.ops[(i+1) % 2].val * self.result.adj
+            if isinstance(o, AdjFloat):
+                o.adj += value(self.ops[(i+1) % 2]) * self.result.adj
 
 
 class DivBlock(Block):
     """Log a division operation onto the tape."""
 
+    function = staticmethod(operator.truediv)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        y = value(self.ops[1])
+        return 1 / y, -self.result.val / y
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += self.result.adj / self.ops[1].val
-        self.ops[1].adj -= (self.ops[0].val * self.result.adj /
-                            (self.ops[1].val ** 2))
+        x, y = self.ops
+        if isinstance(x, AdjFloat):
+            x.adj += self.result.adj / value(y)
+        if isinstance(y, AdjFloat):
+            y.adj -= value(x) * self.result.adj / (y.val ** 2)
 
 
 class PowBlock(Block):
     """Log an exponentiation operation onto the tape."""
 
+    function = staticmethod(operator.pow)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        x, y = value(self.ops[0]), value(self.ops[1])
+        return (y * x ** (y - 1),
+                generic.log(x) * self.result.val if x > 0 else 0)
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += ((self.ops[1].val / self.ops[0].val) *
-                            self.result.adj *
-                            self.ops[0].val ** self.ops[1].val)
-        self.ops[1].adj += (math.log(self.ops[0].val) * self.result.adj *
-                            self.ops[0].val ** self.ops[1].val)
+        x, y = self.ops
+        if isinstance(x, AdjFloat):
+            x.adj += (value(y) * self.result.adj *
+                      x.val ** (value(y) - 1))
+        if isinstance(y, AdjFloat) and value(x) > 0:
+            y.adj += (generic.log(value(x)) * self.result.adj *
+                      self.result.val)
 
 
 class SinBlock(Block):
     """Log a sin operation onto the tape."""
 
+    function = staticmethod(generic.sin)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return generic.cos(self.ops[0].val),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += math.cos(self.ops[0].val) * self.result.adj
+        self.ops[0].adj += generic.cos(self.ops[0].val) * self.result.adj
 
 
 class CosBlock(Block):
     """Log a cos operation onto the tape."""
 
+    function = staticmethod(generic.cos)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return -generic.sin(self.ops[0].val),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj -= math.sin(self.ops[0].val) * self.result.adj
+        self.ops[0].adj -= generic.sin(self.ops[0].val) * self.result.adj
 
 
 class TanBlock(Block):
     """Log a tan operation onto the tape."""
 
+    function = staticmethod(generic.tan)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return 1 + self.result.val ** 2,
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += ((1 + (math.tan(self.ops[0].val)) ** 2) *
+        self.ops[0].adj += ((1 + (generic.tan(self.ops[0].val)) ** 2) *
                             self.result.adj)
 
 
 class ExpBlock(Block):
     """Log an exp operation onto the tape."""
 
+    function = staticmethod(generic.exp)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return self.result.val,
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += math.exp(self.ops[0].val) * self.result.adj
+        self.ops[0].adj += generic.exp(self.ops[0].val) * self.result.adj
 
 
 class LogBlock(Block):
     """Log a log operation onto the tape."""
 
+    function = staticmethod(generic.log)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return 1 / self.ops[0].val,
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
         self.ops[0].adj += self.result.adj / self.ops[0].val
@@ -341,48 +782,85 @@ class LogBlock(Block):
 class SinhBlock(Block):
     """Log a sinh operation onto the tape."""
 
+    function = staticmethod(generic.sinh)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return generic.cosh(self.ops[0].val),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += math.cosh(self.ops[0].val) * self.result.adj
+        self.ops[0].adj += generic.cosh(self.ops[0].val) * self.result.adj
 
 
 class CoshBlock(Block):
     """Log a cosh operation onto the tape."""
 
+    function = staticmethod(generic.cosh)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return generic.sinh(self.ops[0].val),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += math.sinh(self.ops[0].val) * self.result.adj
+        self.ops[0].adj += generic.sinh(self.ops[0].val) * self.result.adj
 
 
 class TanhBlock(Block):
     """Log a tanh operation onto the tape."""
 
+    function = staticmethod(generic.tanh)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return 1 / generic.cosh(self.ops[0].val) ** 2,
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += self.result.adj / (math.cosh(self.ops[0].val) ** 2)
+        self.ops[0].adj += (self.result.adj /
+                            (generic.cosh(self.ops[0].val) ** 2))
 
 
 class AsinBlock(Block):
     """Log an arcsin operation onto the tape."""
 
+    function = staticmethod(generic.asin)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return 1 / generic.sqrt(1 - self.ops[0].val ** 2),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
         self.ops[0].adj += (self.result.adj /
-                            math.sqrt(1 - (self.ops[0].val ** 2)))
+                            generic.sqrt(1 - (self.ops[0].val ** 2)))
 
 
 class AcosBlock(Block):
     """Log an arccos operation onto the tape."""
 
+    function = staticmethod(generic.acos)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return -1 / generic.sqrt(1 - self.ops[0].val ** 2),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
         self.ops[0].adj -= (self.result.adj /
-                            math.sqrt(1 - (self.ops[0].val ** 2)))
+                            generic.sqrt(1 - (self.ops[0].val ** 2)))
 
 
 class AtanBlock(Block):
     """Log an arctan operation onto the tape."""
 
+    function = staticmethod(generic.atan)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return 1 / (1 + self.ops[0].val ** 2),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
         self.ops[0].adj += self.result.adj / (1 + (self.ops[0].val ** 2))
@@ -391,29 +869,166 @@ class AtanBlock(Block):
 class AsinhBlock(Block):
     """Log an arsinh operation onto the tape."""
 
+    function = staticmethod(generic.asinh)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return 1 / generic.sqrt(1 + self.ops[0].val ** 2),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
         self.ops[0].adj += (self.result.adj /
-                            math.sqrt(1 + (self.ops[0].val ** 2)))
+                            generic.sqrt(1 + (self.ops[0].val ** 2)))
 
 
 class AcoshBlock(Block):
     """Log an arcosh operation onto the tape."""
 
+    function = staticmethod(generic.acosh)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        x = self.ops[0].val
+        return 1 / (generic.sqrt(x - 1) * generic.sqrt(x + 1)),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
-        self.ops[0].adj += (self.result.adj / (math.sqrt(self.ops[0].val - 1) *
-                            math.sqrt(self.ops[0].val + 1)))
+        self.ops[0].adj += (self.result.adj /
+                            (generic.sqrt(self.ops[0].val - 1) *
+                             generic.sqrt(self.ops[0].val + 1)))
 
 
 class AtanhBlock(Block):
     """Log an artanh operation onto the tape."""
 
+    function = staticmethod(generic.atanh)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return 1 / (1 - self.ops[0].val ** 2),
+
     def compute_adjoint(self):
         """Pass the result of the chain rule back to AdjFloat."""
         self.ops[0].adj += self.result.adj / (1 - (self.ops[0].val ** 2))
 
 
+class FsumBlock(Block):
+    """Log a sum of any number of operands onto the tape."""
+
+    @staticmethod
+    def function(*xs):
+        """Return the sum of the values."""
+        return tangent_linear.fsum(xs)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return (1,) * len(self.ops)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjFloat."""
+        adj = self.result.adj
+        for o in self.ops:
+            if isinstance(o, AdjFloat):
+                o.adj += adj
+
+
+class ProdBlock(Block):
+    """Log a product of any number of operands onto the tape."""
+
+    @staticmethod
+    def function(*xs):
+        """Return the product of the values."""
+        return tangent_linear.prod(xs)
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops.
+
+        Each is the product of the other operands, found from running
+        products from both ends so that zero operands need no division.
+        """
+        vals = [value(o) for o in self.ops]
+        partials = [1] * len(vals)
+        left = 1
+        for i, v in enumerate(vals):
+            partials[i] = left
+            left = left * v
+        right = 1
+        for i in range(len(vals) - 1, -1, -1):
+            partials[i] = partials[i] * right
+            right = right * vals[i]
+        return tuple(partials)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjFloat."""
+        adj = self.result.adj
+        for o, p in zip(self.ops, self.partials()):
+            if isinstance(o, AdjFloat):
+                o.adj += p * adj
+
+
+class DotBlock(Block):
+    """Log a dot product onto the tape.
+
+    The ops are the operands of the first sequence followed by those of
+    the second.
+    """
+
+    @staticmethod
+    def function(*ops):
+        """Return the dot product of the two halves of the values."""
+        n = len(ops) // 2
+        return tangent_linear.dot(ops[:n], ops[n:])
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        n = len(self.ops) // 2
+        return tuple(value(o) for o in self.ops[n:] + self.ops[:n])
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjFloat."""
+        adj = self.result.adj
+        n = len(self.ops) // 2
+        xs, ys = self.ops[:n], self.ops[n:]
+        for x, y in zip(xs, ys):
+            if isinstance(x, AdjFloat):
+                x.adj += value(y) * adj
+            if isinstance(y, AdjFloat):
+                y.adj += value(x) * adj
+
+
+class PolyvalBlock(Block):
+    """Log a polynomial evaluation onto the tape.
+
+    The ops are the coefficients, from the highest power down, followed by
+    the point.
+    """
+
+    @staticmethod
+    def function(*ops):
+        """Return the polynomial of the leading values at the last."""
+        return tangent_linear.polyval(ops[:-1], ops[-1])
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        x = value(self.ops[-1])
+        n = len(self.ops) - 1
+        powers = [1] * n
+        for i in range(n - 2, -1, -1):
+            powers[i] = powers[i + 1] * x
+        slope = result = 0
+        for c in self.ops[:-1]:
+            slope = slope * x + result
+            result = result * x + value(c)
+        return tuple(powers) + (slope,)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjFloat."""
+        adj = self.result.adj
+        for o, p in zip(self.ops, self.partials()):
+            if isinstance(o, AdjFloat):
+                o.adj += p * adj
+
+
 def clear_tape():
     """Clear the tape to allow for a new AdjFloat calculation to be run."""
-    tape = [] # noqa F841
+    get_tape().clear()
@@ -0,0 +1,122 @@
+"""Binomial checkpointing (revolve) for adjoints of time-stepping loops."""
+from math import comb
+
+from .adjoint import AdjFloat, Tape
+
+
+def split(steps, snaps):
+    """Return how far to advance before storing the next checkpoint.
+
+    This is the binomial rule of Griewank's revolve: with snaps free
+    checkpoints (besides the one holding the current state) and t the
+    least number of repetitions with comb(snaps + 1 + t, t) >= steps, the
+    split minimises the total number of steps recomputed.
+    """
+    c = snaps + 1
+    t = 0
+    while comb(c + t, c) < steps:
+        t += 1
+    m = steps - comb(c - 1 + t, c - 1)
+    if t >= 2:
+        m = max(m, comb(c + t - 2, c))
+    return min(max(m, 1), steps - 1)
+
+
+def recomputations(steps, snaps):
+    """Return the number of steps revolve recomputes to reverse steps."""
+    if steps <= 1:
+        return 0
+    if snaps == 0:
+        return steps * (steps - 1) // 2
+    m = split(steps, snaps)
+    return (m + recomputations(steps - m, snaps - 1) +
+            recomputations(m, snaps))
+
+
+class Revolve:
+    """Differentiate a time-stepping loop storing only a few states.
+
+    step maps a state, a list of numbers, to the next state and should use
+    the elementary functions of forward_propagation so it accepts plain
+    numbers and AdjFloats alike. Only snaps states are stored besides the
+    initial one, and only one step is ever on the tape; the forward segments
+    between checkpoints are recomputed during the reverse sweep, following
+    the optimal binomial schedule.
+    """
+
+    def __init__(self, step, snaps):
+        """Initialise Revolve."""
+        if snaps < 0:
+            raise ValueError("snaps must be non-negative")
+        self.step = step
+        self.snaps = snaps
+        self.tape = Tape()
+        self.objective = None
+        self.value = None
+        self.advances = 0
+        self.taped = 0
+        self.stored = 0
+        self.peak = 0
+
+    def __repr__(self):
+        """Representation of Revolve."""
+        return (self.__class__.__name__ + "(" + str(self.snaps) +
+                " snaps," + str(self.advances) + " advances)")
+
+    def advance(self, state, steps):
+        """Run steps steps forward on plain numbers."""
+        for _ in range(steps):
+            state = list(self.step(state))
+        self.advances += steps
+        return state
+
+    def adjoint_step(self, state, adj, step=True):
+        """Return the adjoint of state given the adjoint of the next one.
+
+        With adj None the (optional) step is taped together with the
+        objective, whose value is kept and which seeds the sweep.
+        """
+        self.tape.clear()
+        with self.tape:
+            inputs = [AdjFloat(v, 0) for v in state]
+            outputs = list(self.step(inputs)) if step else inputs
+            if adj is None:
+                y = self.objective(outputs)
+        self.taped += step
+        if adj is None:
+            self.value = y.val if isinstance(y, AdjFloat) else y
+            seeds = ((y, 1),) if isinstance(y, AdjFloat) else ()
+        else:
+            seeds = [(y, a) for y, a in zip(outputs, adj)
+                     if isinstance(y, AdjFloat)]
+        return list(self.tape.sweep(seeds, inputs))
+
+    def reverse(self, state, steps, snaps, adj=None):
+        """Reverse steps steps from state, starting from adjoint adj.
+
+        adj None stands for the adjoint seeded by the objective after the
+        last step, so the first forward run happens inside the schedule.
+        """
+        while steps > 1:
+            if snaps == 0:
+                for k in range(steps - 1, -1, -1):
+                    adj = self.adjoint_step(self.advance(state, k), adj)
+                return adj
+            m = split(steps, snaps)
+            checkpoint = self.advance(state, m)
+            self.stored += 1
+            self.peak = max(self.peak, self.stored)
+            adj = self.reverse(checkpoint, steps - m, snaps - 1, adj)
+            self.stored -= 1
+            steps = m
+        return self.adjoint_step(state, adj, steps == 1)
+
+    def gradient(self, state, steps, objective):
+        """Return objective(final state) and its gradient by initial state.
+
+        objective maps the final state to a number.
+        """
+        self.objective = objective
+        self.advances = self.taped = self.stored = self.peak = 0
+        grad = self.reverse(list(state), steps, self.snaps)
+        return self.value, grad
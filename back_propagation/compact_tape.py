@@ -0,0 +1,282 @@
+"""A struct-of-arrays tape for adjoint algorithmic differentiation."""
+import math
+from array import array
+from functools import wraps
+from numbers import Number
+
+# Opcodes of the nodes recorded on a CompactTape. VAR marks an independent
+# variable and CONST a number promoted onto the tape.
+(VAR, CONST, ADD, SUB, MUL, DIV, POW, SIN, COS, TAN, EXP, LOG, SINH, COSH,
+ TANH, ASIN, ACOS, ATAN, ASINH, ACOSH, ATANH) = range(21)
+
+UNARY_FUNCTIONS = {
+    SIN: math.sin, COS: math.cos, TAN: math.tan, EXP: math.exp,
+    LOG: math.log, SINH: math.sinh, COSH: math.cosh, TANH: math.tanh,
+    ASIN: math.asin, ACOS: math.acos, ATAN: math.atan, ASINH: math.asinh,
+    ACOSH: math.acosh, ATANH: math.atanh
+}
+
+# Local derivative of each unary opcode given the operand x and result r.
+# Reusing r avoids a second transcendental call where the rule allows it.
+UNARY_DERIVATIVES = {
+    SIN: lambda x, r: math.cos(x),
+    COS: lambda x, r: -math.sin(x),
+    TAN: lambda x, r: 1 + r ** 2,
+    EXP: lambda x, r: r,
+    LOG: lambda x, r: 1 / x,
+    SINH: lambda x, r: math.cosh(x),
+    COSH: lambda x, r: math.sinh(x),
+    TANH: lambda x, r: 1 - r ** 2,
+    ASIN: lambda x, r: 1 / math.sqrt(1 - x ** 2),
+    ACOS: lambda x, r: -1 / math.sqrt(1 - x ** 2),
+    ATAN: lambda x, r: 1 / (1 + x ** 2),
+    ASINH: lambda x, r: 1 / math.sqrt(1 + x ** 2),
+    ACOSH: lambda x, r: 1 / (math.sqrt(x - 1) * math.sqrt(x + 1)),
+    ATANH: lambda x, r: 1 / (1 - x ** 2)
+}
+
+
+def partials(op, x, y, r):
+    """Return the partial derivatives of a node by its operands.
+
+    x and y are the values of the operands (y is ignored by unary opcodes)
+    and r the value of the node.
+    """
+    if op == ADD:
+        return 1.0, 1.0
+    if op == SUB:
+        return 1.0, -1.0
+    if op == MUL:
+        return y, x
+    if op == DIV:
+        return 1 / y, -r / y
+    if op == POW:
+        return y * x ** (y - 1), r * math.log(x) if x > 0 else 0.0
+    if op in UNARY_DERIVATIVES:
+        return UNARY_DERIVATIVES[op](x, r), 0.0
+    return 0.0, 0.0
+
+
+def deal_with_other_types(meth):
+    """Record the second argument of a method as a constant when needed."""
+    @wraps(meth)
+    def fn(self, other):
+        if not isinstance(other, CompactFloat):
+            if isinstance(other, Number):
+                other = self.tape.constant(other)
+            else:
+                raise TypeError(
+                    (f"Can only operate on a CompactFloat or a Number, "
+                     f"not a {type(other).__name__}"))
+        elif other.tape is not self.tape:
+            raise ValueError("Cannot combine CompactFloats from two tapes.")
+        return meth(self, other)
+    return fn
+
+
+class CompactTape:
+    """Record operations as opcodes, operand indices and values in arrays.
+
+    Each node costs one byte of opcode, two 8-byte operand indices and an
+    8-byte value, plus an 8-byte adjoint once a reverse sweep has run.
+    """
+
+    def __init__(self):
+        """Initialise CompactTape."""
+        self.op = array("B")
+        self.arg0 = array("q")
+        self.arg1 = array("q")
+        self.val = array("d")
+        self.adj = array("d")
+
+    def __len__(self):
+        """Return the number of nodes on the tape."""
+        return len(self.op)
+
+    def __repr__(self):
+        """Representation of CompactTape."""
+        return self.__class__.__name__ + "(" + str(len(self)) + " nodes)"
+
+    @property
+    def nbytes(self):
+        """Return the number of bytes held by the tape arrays."""
+        return sum(a.itemsize * len(a) for a in
+                   (self.op, self.arg0, self.arg1, self.val, self.adj))
+
+    def push(self, op, arg0, arg1, val):
+        """Append a node to the tape and return its index."""
+        self.op.append(op)
+        self.arg0.append(arg0)
+        self.arg1.append(arg1)
+        self.val.append(val)
+        return len(self.op) - 1
+
+    def handle(self, index):
+        """Return a CompactFloat referring to node index."""
+        result = CompactFloat.__new__(CompactFloat)
+        result.tape = self
+        result.index = index
+        return result
+
+    def variable(self, val):
+        """Record an independent variable and return its handle."""
+        return self.handle(self.push(VAR, -1, -1, val))
+
+    def constant(self, val):
+        """Record a constant and return its handle."""
+        return self.handle(self.push(CONST, -1, -1, val))
+
+    def sweep(self, out):
+        """Run the tape backwards from node out, seeding its adjoint with 1."""
+        op, arg0, arg1, val = self.op, self.arg0, self.arg1, self.val
+        adj = array("d", bytes(8 * (out + 1)))
+        adj[out] = 1.0
+        for i in range(out, -1, -1):
+            g = adj[i]
+            o = op[i]
+            if g == 0.0 or o <= CONST:
+                continue
+            a = arg0[i]
+            if o == ADD:
+                adj[a] += g
+                adj[arg1[i]] += g
+            elif o == SUB:
+                adj[a] += g
+                adj[arg1[i]] -= g
+            elif o == MUL:
+                b = arg1[i]
+                adj[a] += val[b] * g
+                adj[b] += val[a] * g
+            elif o == DIV:
+                b = arg1[i]
+                adj[a] += g / val[b]
+                adj[b] -= g * val[i] / val[b]
+            elif o == POW:
+                b = arg1[i]
+                adj[a] += g * val[b] * val[a] ** (val[b] - 1)
+                if val[a] > 0:
+                    adj[b] += g * val[i] * math.log(val[a])
+            else:
+                adj[a] += UNARY_DERIVATIVES[o](val[a], val[i]) * g
+        self.adj = adj
+        return adj
+
+    def clear(self):
+        """Remove every node from the tape."""
+        for a in (self.op, self.arg0, self.arg1, self.val, self.adj):
+            del a[:]
+
+
+def _unary(op):
+    """Return a method recording the unary opcode op."""
+    def meth(self):
+        tape = self.tape
+        x = tape.val[self.index]
+        return tape.handle(tape.push(op, self.index, -1,
+                                     UNARY_FUNCTIONS[op](x)))
+    meth.__doc__ = "Implement " + UNARY_FUNCTIONS[op].__name__ + \
+        " for CompactFloat."
+    return meth
+
+
+class CompactFloat:
+    """Implement backward-propagation as an index into a CompactTape."""
+
+    __slots__ = ("tape", "index")
+
+    def __init__(self, val, tape):
+        """Record an independent variable with value val on tape."""
+        self.tape = tape
+        self.index = tape.push(VAR, -1, -1, val)
+
+    def __repr__(self):
+        """Representation of CompactFloat."""
+        return (self.__class__.__name__ + "(" + str(self.val) +
+                "," + str(self.adj) + ")")
+
+    @property
+    def val(self):
+        """Return the value recorded for this node."""
+        return self.tape.val[self.index]
+
+    @property
+    def adj(self):
+        """Return the adjoint of this node from the last reverse sweep."""
+        adj = self.tape.adj
+        return adj[self.index] if self.index < len(adj) else 0.0
+
+    def derivative(self, *vars):
+        """Return the derivative of CompactFloat by sweeping the arrays."""
+        adj = self.tape.sweep(self.index)
+        return tuple(adj[v.index] if v.index < len(adj) else 0.0
+                     for v in vars)
+
+    def _binary(self, op, other, val):
+        """Record the binary opcode op applied to self and other."""
+        tape = self.tape
+        return tape.handle(tape.push(op, self.index, other.index, val))
+
+    @deal_with_other_types
+    def __add__(self, other):
+        """Implement addition."""
+        return self._binary(ADD, other, self.val + other.val)
+
+    @deal_with_other_types
+    def __radd__(self, other):
+        """Reverse addition."""
+        return other + self
+
+    @deal_with_other_types
+    def __sub__(self, other):
+        """Implement subtraction."""
+        return self._binary(SUB, other, self.val - other.val)
+
+    @deal_with_other_types
+    def __rsub__(self, other):
+        """Reverse subtraction."""
+        return other - self
+
+    @deal_with_other_types
+    def __mul__(self, other):
+        """Implement multiplication."""
+        return self._binary(MUL, other, self.val * other.val)
+
+    @deal_with_other_types
+    def __rmul__(self, other):
+        """Reverse multiplication."""
+        return other * self
+
+    @deal_with_other_types
+    def __truediv__(self, other):
+        """Implement division."""
+        return self._binary(DIV, other, self.val / other.val)
+
+    @deal_with_other_types
+    def __rtruediv__(self, other):
+        """Reverse division."""
+        return other / self
+
+    @deal_with_other_types
+    def __pow__(self, other):
+        """Implement exponentiation."""
+        return self._binary(POW, other, self.val ** other.val)
+
+    @deal_with_other_types
+    def __rpow__(self, other):
+        """Reverse exponentiation."""
+        return other ** self
+
+    sin = _unary(SIN)
+    cos = _unary(COS)
+    tan = _unary(TAN)
+    exp = _unary(EXP)
+    log = _unary(LOG)
+    sinh = _unary(SINH)
+    cosh = _unary(COSH)
+    tanh = _unary(TANH)
+    asin = _unary(ASIN)
+    acos = _unary(ACOS)
+    atan = _unary(ATAN)
+    asinh = _unary(ASINH)
+    acosh = _unary(ACOSH)
+    atanh = _unary(ATANH)
@@ -0,0 +1,177 @@
+"""Compile a recorded tape into straight-line Python source."""
+import math
+from functools import lru_cache
+
+from .adjoint import (AdjFloat, RetraceError, GuardBlock, AddBlock, SubBlock,
+                      MulBlock, DivBlock, PowBlock, SinBlock, CosBlock,
+                      TanBlock, ExpBlock, LogBlock, SinhBlock, CoshBlock,
+                      TanhBlock, AsinBlock, AcosBlock, AtanBlock, AsinhBlock,
+                      AcoshBlock, AtanhBlock)
+
+# For each Block type, the source of its value and of the partial derivative
+# of the result with respect to each operand. {0} and {1} stand for the
+# operands and {r} for the result. An optional third entry is evaluated once
+# per Block before its partials, which can refer to its value as {p}.
+TEMPLATES = {
+    AddBlock: ("{0} + {1}", ("1", "1")),
+    SubBlock: ("{0} - {1}", ("1", "-1")),
+    MulBlock: ("{0} * {1}", ("{1}", "{0}")),
+    DivBlock: ("{0} / {1}", ("1 / {1}", "-{r} / {1}")),
+    PowBlock: ("{0} ** {1}", ("{1} * {0} ** ({1} - 1)",
+                             "({r} * log({0}) if {0} > 0 else 0)")),
+    SinBlock: ("sin({0})", ("cos({0})",)),
+    CosBlock: ("cos({0})", ("-sin({0})",)),
+    TanBlock: ("tan({0})", ("1 + {r} ** 2",)),
+    ExpBlock: ("exp({0})", ("{r}",)),
+    LogBlock: ("log({0})", ("1 / {0}",)),
+    SinhBlock: ("sinh({0})", ("cosh({0})",)),
+    CoshBlock: ("cosh({0})", ("sinh({0})",)),
+    TanhBlock: ("tanh({0})", ("1 - {r} ** 2",)),
+    AsinBlock: ("asin({0})", ("1 / sqrt(1 - {0} ** 2)",)),
+    AcosBlock: ("acos({0})", ("-1 / sqrt(1 - {0} ** 2)",)),
+    AtanBlock: ("atan({0})", ("1 / (1 + {0} ** 2)",)),
+    AsinhBlock: ("asinh({0})", ("1 / sqrt(1 + {0} ** 2)",)),
+    AcoshBlock: ("acosh({0})", ("1 / (sqrt({0} - 1) * sqrt({0} + 1))",)),
+    AtanhBlock: ("atanh({0})", ("1 / (1 - {0} ** 2)",))
+}
+
+NAMESPACE = {name: getattr(math, name) for name in
+             ("sin", "cos", "tan", "exp", "log", "sqrt", "sinh", "cosh",
+              "tanh", "asin", "acos", "atan", "asinh", "acosh", "atanh")}
+NAMESPACE["RetraceError"] = RetraceError
+
+COMPARISONS = {"lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+
+
+def structure(tape, inputs, output):
+    """Return the structure of a recording and the values of its constants.
+
+    Nodes are numbered inputs first, then constants (operands that are not
+    inputs and that no Block produced), then Block results in tape order.
+    The structure lists each Block as its type and operand numbers, plus the
+    comparison and outcome for guards, so recordings of the same
+    calculation at different inputs share a structure.
+    """
+    index = {id(x): i for i, x in enumerate(inputs)}
+    if len(index) != len(inputs):
+        raise ValueError("Inputs must be distinct AdjFloats")
+    results = {id(block.result) for block in tape}
+    constants = []
+    for o in [o for block in tape for o in block.ops] + [output]:
+        if id(o) not in index and id(o) not in results:
+            index[id(o)] = len(inputs) + len(constants)
+            constants.append(o.val if isinstance(o, AdjFloat) else o)
+    blocks = []
+    first = len(inputs) + len(constants)
+    for block in tape:
+        if type(block) not in TEMPLATES and type(block) is not GuardBlock:
+            raise TypeError(f"Cannot compile a {type(block).__name__}")
+        ops = tuple(index[id(o)] for o in block.ops)
+        if type(block) is GuardBlock:
+            blocks.append((GuardBlock, ops, block.function.__name__,
+                           block.result.val))
+        else:
+            blocks.append((type(block), ops))
+        index[id(block.result)] = first + len(blocks) - 1
+    return ((len(inputs), len(constants), tuple(blocks), index[id(output)]),
+            tuple(constants))
+
+
+@lru_cache(maxsize=256)
+def generate(struct):
+    """Return Python source for the value and gradient of a structure."""
+    n, n_constants, blocks, out = struct
+    first = n + n_constants
+    lines = ["def compiled(x, c):"]
+    if n:
+        lines.append("    " + "".join(f"v{i}, " for i in range(n)) + "= x")
+    if n_constants:
+        lines.append("    " + "".join(f"v{n + i}, "
+                                      for i in range(n_constants)) + "= c")
+    # Forward: keep the Blocks the output or a guard depends on.
+    needed = {out}
+    for k in range(len(blocks) - 1, -1, -1):
+        if first + k in needed or blocks[k][0] is GuardBlock:
+            needed.update(blocks[k][1])
+    active = set(range(n))
+    for k, b in enumerate(blocks):
+        args = [f"v{i}" for i in b[1]]
+        if b[0] is GuardBlock:
+            cond = f"{args[0]} {COMPARISONS[b[2]]} {args[1]}"
+            lines.append(f"    if {'not ' if b[3] else ''}({cond}):")
+            lines.append(f"        raise RetraceError('{b[2]} comparison "
+                         "changed outcome')")
+        elif first + k in needed:
+            lines.append(f"    v{first + k} = " +
+                         TEMPLATES[b[0]][0].format(*args))
+            if active.intersection(b[1]):
+                active.add(first + k)
+    # Reverse: only nodes that are active and feed the output.
+    assigned = {out}
+    lines.append(f"    a{out} = 1.0")
+    for k in range(len(blocks) - 1, -1, -1):
+        b = blocks[k]
+        r = first + k
+        if b[0] is GuardBlock or r not in assigned or r not in active:
+            continue
+        args = [f"v{i}" for i in b[1]]
+        if len(TEMPLATES[b[0]]) > 2:
+            lines.append(f"    p{r} = " +
+                         TEMPLATES[b[0]][2].format(*args, r=f"v{r}"))
+        for i, partial in zip(b[1], TEMPLATES[b[0]][1]):
+            if i not in active:
+                continue
+            partial = partial.format(*args, r=f"v{r}", p=f"p{r}")
+            term = (f"a{r}" if partial == "1" else
+                    f"-a{r}" if partial == "-1" else
+                    f"a{r} * ({partial})")
+            if i in assigned:
+                lines.append(f"    a{i} += {term}")
+            else:
+                lines.append(f"    a{i} = {term}")
+                assigned.add(i)
+    grads = "".join(f"a{i}, " if i in assigned else "0.0, "
+                    for i in range(n))
+    lines.append(f"    return v{out}, ({grads})")
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=256)
+def build(struct):
+    """Return the compiled function for a structure, cached by structure."""
+    namespace = dict(NAMESPACE)
+    exec(compile(generate(struct), "<compiled tape>", "exec"), namespace)
+    return namespace["compiled"]
+
+
+class CompiledTape:
+    """The value and gradient of a recording as one generated function.
+
+    Calling it with new input values runs straight-line code on local
+    floats in place of replaying Blocks and running derivative(). It raises
+    RetraceError if a recorded comparison changes outcome.
+    """
+
+    def __init__(self, tape, inputs, output):
+        """Initialise CompiledTape."""
+        self.structure, self.constants = structure(tape, inputs, output)
+        self.function = build(self.structure)
+
+    def __repr__(self):
+        """Representation of CompiledTape."""
+        return (self.__class__.__name__ + "(" + str(self.structure[0]) +
+                " inputs," + str(len(self.structure[2])) + " blocks)")
+
+    @property
+    def source(self):
+        """Return the generated source."""
+        return generate(self.structure)
+
+    def __call__(self, *xs):
+        """Return the value of the output at xs and its gradient."""
+        return self.function(xs, self.constants)
+
+
+def compile_tape(tape, inputs, output):
+    """Compile the recording of output from inputs on tape."""
+    return CompiledTape(tape, inputs, output)
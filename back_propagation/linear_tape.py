@@ -0,0 +1,135 @@
+"""A tape of local partial derivatives evaluated at record time."""
+from array import array
+from itertools import count
+
+from .adjoint import UNREACHED, AdjFloat, Tape
+
+# Each LinearTape numbers its slots from its own base, so a position read
+# off an AdjFloat tells which LinearTape, if any, it belongs to.
+_bases = count(1)
+
+
+class LinearTape(Tape):
+    """Record the local partial derivatives of each operation.
+
+    In place of its Block, each operation is stored as a flat tuple of its
+    operands' slots and the partial derivatives of its result by them,
+    evaluated when it is recorded. The reverse sweep is then a
+    multiply-accumulate loop over a list, with no elementary function calls
+    or method dispatch, and the tape keeps no operand AdjFloats alive. As
+    the partials are frozen, the tape cannot be replayed.
+
+    The result of the i-th operation is held in slot i and the k-th operand
+    not produced on the tape (an input or a constant) in slot -1 - k. The
+    slot is stored in the AdjFloat's position, offset by the tape's base;
+    values whose position belongs to another tape are kept in a dict.
+    """
+
+    def __init__(self):
+        """Initialise LinearTape."""
+        super().__init__()
+        self._base = next(_bases) << 32
+        self._ids = array("q")
+        self._leaf_ids = array("q")
+        self._others = {}
+
+    def append(self, block):
+        """Record the operand slots and partials of a Block, dropping it."""
+        if not hasattr(block, "partials"):
+            raise TypeError(f"Cannot record a {type(block).__name__} on a "
+                            f"{type(self).__name__}")
+        partials = block.partials()
+        # Only the edges to active operands are kept.
+        entry = ()
+        for x, p in zip(block.ops, partials):
+            if isinstance(x, AdjFloat):
+                entry += (self._slot(x, True), p)
+        n = self._len
+        block.result.position = self._base + n
+        self._ids.append(id(block.result))
+        if n < len(self.blocks):
+            self.blocks[n] = entry
+        else:
+            self.blocks.append(entry)
+        self._len = n + 1
+
+    def position_of(self, x):
+        """Return the position of the operation that produced x, or -1."""
+        i = getattr(x, "position", -1) - self._base
+        if 0 <= i < self._len and self._id(i) == id(x):
+            return i
+        return -1
+
+    def _id(self, i):
+        """Return the id of the result of the i-th operation."""
+        return self._ids[i]
+
+    def _slot(self, x, add=False):
+        """Return the slot of x, adding it as a leaf if add, else None."""
+        position = getattr(x, "position", None)
+        # Positions within 2 ** 31 of the base were given out by this tape.
+        owned = position is None or abs(position - self._base) < 1 << 31
+        if position is None:
+            pass
+        elif not owned:
+            if id(x) in self._others:
+                return self._others[id(x)][1]
+        elif position >= self._base:
+            i = position - self._base
+            if i < self._len and self._id(i) == id(x):
+                return i
+        else:
+            i = position - self._base
+            if -i <= len(self._leaf_ids) and self._leaf_ids[-1 - i] == id(x):
+                return i
+        if not add:
+            return None
+        slot = -1 - len(self._leaf_ids)
+        self._leaf_ids.append(id(x))
+        if owned:
+            x.position = self._base + slot
+        else:
+            self._others[id(x)] = (x, slot)
+        return slot
+
+    def rewind(self, position):
+        """Drop the operations recorded after position."""
+        super().rewind(position)
+        del self._ids[self._len:]
+        if not self._len:
+            del self._leaf_ids[:]
+            self._others = {}
+
+    def replay(self):
+        """Refuse to replay, since the partials were frozen when recorded."""
+        raise RuntimeError("A LinearTape cannot be replayed")
+
+    def sweep(self, seeds, vars, start=0):
+        """Run the tape backwards and return the adjoints of vars.
+
+        As Tape.sweep, but the adjoints live in a list indexed by slot
+        rather than on the AdjFloats.
+        """
+        end = max([self.position_of(output) for output, _ in seeds] + [-1])
+        adj = [UNREACHED] * (end + 1 + len(self._leaf_ids))
+        for output, seed in seeds:
+            i = self._slot(output)
+            if i is not None and i <= end:
+                adj[i] += seed
+        blocks = self.blocks
+        for i in range(end, start - 1, -1):
+            a = adj[i]
+            if a is not UNREACHED:
+                entry = blocks[i]
+                if len(entry) == 4:
+                    j, p, k, q = entry
+                    adj[j] += p * a
+                    adj[k] += q * a
+                elif len(entry) == 2:
+                    j, p = entry
+                    adj[j] += p * a
+                else:
+                    for m in range(0, len(entry), 2):
+                        adj[entry[m]] += entry[m + 1] * a
+        slots = [self._slot(v) for v in vars]
+        return tuple(0 if i is None or i > end else adj[i] for i in slots)
@@ -0,0 +1,245 @@
+"""Optimisation passes over a recorded tape.
+
+Each pass takes the list of recorded Blocks, the inputs and the outputs and
+returns a shorter list of Blocks and the outputs, which may have been
+replaced by equivalent values. Passes never modify the Blocks they are
+given; optimise copies the survivors onto a fresh tape, so the original
+recording stays usable.
+"""
+import copy
+
+from .adjoint import AdjFloat, AddBlock, Block, MulBlock, GuardBlock, Tape
+
+COMMUTATIVE = (AddBlock, MulBlock)
+
+# The most independent operands a preaccumulated subgraph may have.
+PREACCUMULATE_INPUTS = 2
+
+
+class PreaccumulatedBlock(Block):
+    """Log a subgraph of Blocks as one operation with a local Jacobian.
+
+    blocks are the subgraph's Blocks in recorded order, the last producing
+    the result, and ops the AdjFloats they use from outside it. The partial
+    derivatives of the result by the ops are accumulated once, by a reverse
+    sweep over the subgraph, so the tape's sweep crosses the subgraph with
+    one multiply-add per operand. Replaying recomputes the Blocks and the
+    partials.
+    """
+
+    def __init__(self, blocks, *ops):
+        """Initialise PreaccumulatedBlock."""
+        super().__init__(blocks[-1].result, *ops)
+        self.blocks = blocks
+        self.accumulate()
+
+    def accumulate(self):
+        """Compute the partial derivatives of the result by the ops."""
+        adj = {id(self.result): 1}
+        for block in reversed(self.blocks):
+            a = adj.pop(id(block.result), 0)
+            for o, p in zip(block.ops, block.partials()):
+                if isinstance(o, AdjFloat):
+                    adj[id(o)] = adj.get(id(o), 0) + p * a
+        self.jacobian = tuple(adj.get(id(o), 0) for o in self.ops)
+
+    def recompute(self):
+        """Recompute the subgraph's values and partial derivatives."""
+        for block in self.blocks:
+            block.recompute()
+        self.accumulate()
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return self.jacobian
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjFloat."""
+        adj = self.result.adj
+        for o, p in zip(self.ops, self.jacobian):
+            o.adj += p * adj
+
+
+def fold_constants(blocks, inputs, outputs):
+    """Drop Blocks whose operands do not depend on the inputs.
+
+    Their results keep the values computed when they were recorded and are
+    used from then on as constants.
+    """
+    active = {id(x) for x in inputs}
+    kept = []
+    for block in blocks:
+        if any(id(o) in active for o in block.ops):
+            kept.append(block)
+            active.add(id(block.result))
+    return kept, outputs
+
+
+def eliminate_common_subexpressions(blocks, inputs, outputs):
+    """Merge Blocks applying the same operation to the same operands.
+
+    Constants with equal values are merged first, and the operands of
+    additions and multiplications are taken in either order.
+    """
+    produced = set()
+
+    def add_results(blocks):
+        for block in blocks:
+            produced.add(id(block.result))
+            add_results(getattr(block, "blocks", ()))
+    add_results(blocks)
+    inputs = {id(x) for x in inputs}
+    replaced = {}
+    constants = {}
+
+    def substitute(x):
+        if id(x) in replaced:
+            return replaced[id(x)]
+        if id(x) in produced or id(x) in inputs:
+            return x
+        val = getattr(x, "val", x)
+        return constants.setdefault((type(val), repr(val)), x)
+
+    def rename(block):
+        """Return block, or a copy, with its operands substituted."""
+        if isinstance(block, PreaccumulatedBlock):
+            members = [rename(b) for b in block.blocks]
+            ops = []
+            for o in map(substitute, block.ops):
+                if all(o is not p for p in ops):
+                    ops.append(o)
+            if (any(m is not b for m, b in zip(members, block.blocks)) or
+                    len(ops) != len(block.ops) or
+                    any(o is not p for o, p in zip(ops, block.ops))):
+                block = PreaccumulatedBlock(members, *ops)
+            return block
+        ops = tuple(substitute(o) for o in block.ops)
+        if any(o is not p for o, p in zip(ops, block.ops)):
+            block = copy.copy(block)
+            block.ops = ops
+        return block
+    seen = {}
+    kept = []
+    for block in blocks:
+        block = rename(block)
+        key = tuple(id(o) for o in block.ops)
+        if isinstance(block, COMMUTATIVE):
+            key = tuple(sorted(key))
+        key = (type(block), getattr(block, "function", None)) + key
+        if isinstance(block, PreaccumulatedBlock):
+            # Subgraphs are not compared, so each is kept.
+            key += (id(block),)
+        if key in seen:
+            replaced[id(block.result)] = seen[key]
+            continue
+        seen[key] = block.result
+        kept.append(block)
+    return kept, [replaced.get(id(y), y) for y in outputs]
+
+
+def eliminate_dead_code(blocks, inputs, outputs):
+    """Drop Blocks that neither the outputs nor any guard depend on."""
+    needed = {id(y) for y in outputs}
+    kept = []
+    for block in reversed(blocks):
+        if id(block.result) in needed or type(block) is GuardBlock:
+            kept.append(block)
+            needed.update(id(o) for o in block.ops)
+    kept.reverse()
+    return kept, outputs
+
+
+def preaccumulate(blocks, inputs, outputs, max_inputs=PREACCUMULATE_INPUTS):
+    """Collapse chains and small subgraphs into PreaccumulatedBlocks.
+
+    A Block whose result is used by only one other Block, and is not an
+    output, is merged into that Block's subgraph as long as the subgraph
+    keeps at most max_inputs independent operands, so unary chains such as
+    exp(sin(tanh(x))) and scale-and-shift sequences become one edge.
+    Guards, and Blocks without partials() such as those of AdjArray, are
+    left alone.
+    """
+    produced = {id(block.result): i for i, block in enumerate(blocks)}
+    consumers = {id(y): {-1} for y in outputs}
+    for i, block in enumerate(blocks):
+        for o in block.ops:
+            consumers.setdefault(id(o), set()).add(i)
+
+    def absorbable(x):
+        return (id(x) in produced and len(consumers[id(x)]) == 1 and
+                type(blocks[produced[id(x)]]) is not GuardBlock and
+                hasattr(blocks[produced[id(x)]], "partials"))
+    absorbed = set()
+    kept = []
+    for i in range(len(blocks) - 1, -1, -1):
+        if i in absorbed:
+            continue
+        root = blocks[i]
+        if type(root) is GuardBlock or not hasattr(root, "partials"):
+            kept.append(root)
+            continue
+        members = {i}
+        ops = [o for o in root.ops if isinstance(o, AdjFloat)]
+        stack = list(ops)
+        while stack:
+            x = stack.pop()
+            if not absorbable(x) or produced[id(x)] in members:
+                continue
+            j = produced[id(x)]
+            new = [o for o in blocks[j].ops if isinstance(o, AdjFloat)]
+            trial = [o for o in ops if o is not x]
+            trial += [o for o in new if all(o is not p for p in trial)]
+            if len(trial) <= max_inputs:
+                members.add(j)
+                ops = trial
+                stack += new
+        if len(members) == 1:
+            kept.append(root)
+            continue
+        absorbed |= members
+        ops = [o for k, o in enumerate(ops)
+               if all(o is not p for p in ops[:k])]
+        kept.append(PreaccumulatedBlock([blocks[j] for j in sorted(members)],
+                                        *ops))
+    kept.reverse()
+    return kept, outputs
+
+
+PASSES = (("fold constants", fold_constants),
+          ("common subexpressions", eliminate_common_subexpressions),
+          ("dead code", eliminate_dead_code))
+
+
+def optimise(tape, inputs, outputs, passes=PASSES):
+    """Run optimisation passes over the recording of outputs from inputs.
+
+    Return a new tape, the outputs on it and a report listing, for each
+    pass, its name and the number of Blocks before and after it. Leaves of
+    the recording that are not among inputs are treated as constants.
+    The new tape can be replayed by setting the values of the inputs and
+    swept for the derivatives of the new outputs.
+    """
+    blocks = list(tape)
+    report = []
+    for name, run in passes:
+        before = len(blocks)
+        blocks, outputs = run(blocks, inputs, outputs)
+        report.append((name, before, len(blocks)))
+    new = Tape()
+    results = {}
+    for block in blocks:
+        new.append(_copy(block, results))
+    return new, [results.get(id(y), y) for y in outputs], report
+
+
+def _copy(block, results):
+    """Copy block and its result, renaming its ops by results."""
+    block = copy.copy(block)
+    block.ops = tuple(results.get(id(o), o) for o in block.ops)
+    if isinstance(block, PreaccumulatedBlock):
+        block.blocks = [_copy(b, results) for b in block.blocks]
+        block.result = block.blocks[-1].result
+        return block
+    result = copy.copy(block.result)
+    results[id(block.result)] = block.result = result
+    return block
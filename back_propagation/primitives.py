@@ -0,0 +1,183 @@
+"""User-defined functions with hand-written derivative rules.
+
+A primitive is taped as one Block however much work its function does, and
+propagates tangents through Dfloats in one step. Its rule is given once, as
+one of
+
+- derivative(*xs): the partial derivatives of the result by each of xs,
+  or a single value for a function of one argument,
+- jvp(xs, dxs): the tangent of the result given the tangents of xs,
+- vjp(xs, y, adj): the adjoints of xs given the result y and its adjoint,
+
+and the other uses are derived from it. For forward-over-reverse (as in
+drivers.hvp) the rule must itself accept Dfloats.
+
+Primitives made by primitive() are registered by name in PRIMITIVES, and
+with compilable their Block type is added to compile_tape's templates.
+Both registrations last as long as the process, so make primitives once,
+at module level, rather than inside loops.
+"""
+import inspect
+from itertools import count
+
+import numpy as np
+
+from forward_propagation.tangent_linear import Dfloat, _split
+
+from .adjoint import AdjFloat, Block, get_tape, value
+from .compiler import NAMESPACE, TEMPLATES
+
+# The primitives made so far, by name.
+PRIMITIVES = {}
+
+_names = count()
+
+
+class PrimitiveBlock(Block):
+    """Log a primitive onto the tape.
+
+    Each Primitive makes its own subclass, with the primitive as function.
+    """
+
+    function = None
+
+    def partials(self):
+        """Return the partial derivatives of the result by the ops."""
+        return self.function.partials([value(o) for o in self.ops],
+                                      self.result.val)
+
+    def compute_adjoint(self):
+        """Pass the result of the chain rule back to AdjFloat."""
+        primitive = self.function
+        xs = [value(o) for o in self.ops]
+        if primitive.vjp is not None:
+            adjs = primitive.vjp(xs, self.result.val, self.result.adj)
+        else:
+            adjs = [p * self.result.adj
+                    for p in primitive.partials(xs, self.result.val)]
+        for o, a in zip(self.ops, adjs):
+            if isinstance(o, AdjFloat):
+                o.adj += a
+
+
+class Primitive:
+    """A function taped as one Block, with a hand-written derivative.
+
+    Called with any AdjFloat argument it records one Block of its own
+    block_type; with Dfloats it returns a Dfloat by one tangent rule; with
+    numbers it calls function. Other arguments are passive.
+    """
+
+    def __init__(self, function, derivative=None, jvp=None, vjp=None,
+                 name=None, compilable=False):
+        """Initialise Primitive."""
+        if derivative is None and jvp is None and vjp is None:
+            raise ValueError("A primitive needs a derivative, jvp or vjp")
+        name = name or function.__name__
+        if not name.isidentifier():
+            raise ValueError(f"Give the primitive {function!r} a name")
+        self.function = function
+        self.derivative = derivative
+        self.jvp = jvp
+        self.vjp = vjp
+        self.__name__ = name
+        self.__doc__ = function.__doc__
+        self.block_type = type(
+            self.__name__.title().replace("_", "") + "Block",
+            (PrimitiveBlock,),
+            {"__doc__": f"Log a {self.__name__} operation onto the tape.",
+             "function": self})
+        if compilable:
+            self._register_template()
+
+    def __repr__(self):
+        """Representation of Primitive."""
+        return self.__class__.__name__ + "(" + self.__name__ + ")"
+
+    def __call__(self, *args):
+        """Evaluate the primitive, taping or differentiating it as needed."""
+        if any(isinstance(x, AdjFloat) for x in args):
+            result = AdjFloat(self(*[value(x) for x in args]), 0)
+            get_tape().append(self.block_type(result, *args))
+            return result
+        if any(isinstance(x, Dfloat) for x in args):
+            xs, dxs = zip(*[_split(x) for x in args])
+            y = self.function(*xs)
+            return Dfloat(y, self.tangent(xs, dxs, y))
+        return self.function(*args)
+
+    def partials(self, xs, y):
+        """Return the partial derivatives at xs, where the result is y."""
+        if self.derivative is not None:
+            partials = self.derivative(*xs)
+            if not isinstance(partials, (tuple, list, np.ndarray)):
+                partials = (partials,)
+            return tuple(partials)
+        if self.vjp is not None:
+            return tuple(self.vjp(xs, y, 1))
+        return tuple(self.jvp(xs, [float(i == j) for j in range(len(xs))])
+                     for i in range(len(xs)))
+
+    def tangent(self, xs, dxs, y):
+        """Return the tangent of the result at xs given the tangents dxs."""
+        if self.jvp is not None:
+            return self.jvp(xs, dxs)
+        return sum(p * dx for p, dx in zip(self.partials(xs, y), dxs))
+
+    def _register_template(self):
+        """Let compile_tape generate calls to the primitive and derivative.
+
+        The partials are evaluated once per Block. Only functions of a
+        fixed number of positional arguments with a derivative (not a jvp
+        or vjp, which need the result) can be compiled.
+        """
+        if self.derivative is None:
+            raise ValueError("Only a primitive with a derivative compiles")
+        try:
+            parameters = inspect.signature(self.function).parameters.values()
+        except (TypeError, ValueError):
+            parameters = None
+        if parameters is None or any(
+                p.kind not in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+                for p in parameters):
+            raise ValueError("Only a function of a fixed number of "
+                             "positional arguments compiles")
+        n = len(parameters)
+        name = f"{self.__name__}_{next(_names)}"
+        NAMESPACE[name] = self.function
+        NAMESPACE[name + "_partials"] = lambda *xs: self.partials(xs, None)
+        args = ", ".join(f"{{{i}}}" for i in range(n))
+        TEMPLATES[self.block_type] = (
+            f"{name}({args})",
+            tuple(f"{{p}}[{i}]" for i in range(n)),
+            f"{name}_partials({args})")
+
+
+def _qualified_name(function):
+    """Return the module and qualified name of function."""
+    return (getattr(function, "__module__", None),
+            getattr(function, "__qualname__", None))
+
+
+def primitive(function=None, *, derivative=None, jvp=None, vjp=None,
+              name=None, compilable=False, override=False):
+    """Make function a Primitive and register it by name.
+
+    Used as a decorator, give the rule by keyword, e.g.
+    ``@primitive(derivative=lambda x: 2 * x)``. Lambdas need a name. A
+    name already registered raises ValueError unless the new function has
+    the same module and qualified name as the old, as when a module is
+    reloaded or a notebook cell run again, or override is set.
+    """
+    if function is None:
+        return lambda function: primitive(
+            function, derivative=derivative, jvp=jvp, vjp=vjp, name=name,
+            compilable=compilable, override=override)
+    name = name or function.__name__
+    if (name in PRIMITIVES and not override and
+            _qualified_name(PRIMITIVES[name].function) !=
+            _qualified_name(function)):
+        raise ValueError(f"A primitive called {name} is already registered")
+    result = Primitive(function, derivative, jvp, vjp, name, compilable)
+    PRIMITIVES[name] = result
+    return result
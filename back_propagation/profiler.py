@@ -0,0 +1,193 @@
+"""Runtime statistics of the tapes recorded and swept by a calculation.
+
+The Profiler works by wrapping methods of Tape, Block and AdjFloat while it
+is active and restoring them when it exits, so nothing is measured, and
+nothing costs anything, outside a ``with Profiler()`` statement.
+"""
+import sys
+import time
+import weakref
+from collections import Counter
+from contextvars import ContextVar
+
+from .adjoint import AdjFloat, Block, Tape
+
+# The profiler of the current context, so that, like the current tape, each
+# thread and asyncio task is profiled only where it entered a profiler.
+_profiling = ContextVar("profiler", default=None)
+
+
+def _subclasses(cls):
+    """Return cls and all its subclasses."""
+    classes = [cls]
+    for sub in cls.__subclasses__():
+        classes += _subclasses(sub)
+    return classes
+
+
+def tape_bytes(tape):
+    """Return the approximate number of bytes held by a tape's records.
+
+    Each Block is counted with its attributes, its tuple of operands and its
+    result; other records, such as LinearTape entries, with their items.
+    """
+    size = sys.getsizeof(tape.blocks)
+    for entry in tape:
+        if isinstance(entry, Block):
+            size += (sys.getsizeof(entry) + sys.getsizeof(entry.__dict__) +
+                     sys.getsizeof(entry.ops) + sys.getsizeof(entry.result))
+        else:
+            size += sys.getsizeof(entry) + sum(sys.getsizeof(item)
+                                               for item in entry)
+    return size
+
+
+class Profiler:
+    """Collect statistics of the tapes used while the profiler is active.
+
+    While active, the profiler counts the Blocks recorded by type, times
+    the reverse sweeps (and with time_blocks the compute_adjoint of each
+    Block type) and tracks the number of AdjFloats created since it started
+    that are still alive. Only the context that entered the profiler, and
+    asyncio tasks started from it, is measured: other threads keep their
+    own tapes and are not counted, although they run the wrapped methods
+    and pay a small check per operation. Only one profiler can be active
+    at a time.
+
+    Recording is not timed on its own: the time of the ``with`` statement
+    outside the sweeps, which includes running the user's calculation, is
+    reported as outside_sweep_s.
+    """
+
+    _active = None
+
+    def __init__(self, time_blocks=False):
+        """Initialise Profiler."""
+        self.time_blocks = time_blocks
+        self.counts = Counter()
+        self.block_time = Counter()
+        self.tapes = weakref.WeakSet()
+        self.live = set()
+        self.peak_live = 0
+        self.sweeps = 0
+        self.sweep_time = 0.0
+        self.total_time = 0.0
+        self._start = None
+        self._token = None
+        self._patched = []
+
+    def __repr__(self):
+        """Representation of Profiler."""
+        return (self.__class__.__name__ + "(" + str(sum(self.counts.values()))
+                + " blocks," + str(self.sweeps) + " sweeps)")
+
+    def _patch(self, owner, name, wrapper):
+        """Replace owner.name by wrapper(original) until the profiler exits."""
+        original = owner.__dict__.get(name)
+        self._patched.append((owner, name, original))
+        setattr(owner, name, wrapper(getattr(owner, name, None)))
+
+    def __enter__(self):
+        """Start profiling."""
+        if Profiler._active is not None:
+            raise RuntimeError("Another Profiler is already active")
+        Profiler._active = self
+        self._token = _profiling.set(self)
+        for cls in _subclasses(Tape):
+            if "append" in cls.__dict__:
+                self._patch(cls, "append", self._wrap_append)
+            if "sweep" in cls.__dict__:
+                self._patch(cls, "sweep", self._wrap_sweep)
+        self._patch(AdjFloat, "__init__", self._wrap_init)
+        self._patch(AdjFloat, "__del__", self._wrap_del)
+        if self.time_blocks:
+            for cls in _subclasses(Block):
+                if "compute_adjoint" in cls.__dict__:
+                    self._patch(cls, "compute_adjoint", self._wrap_adjoint)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        """Stop profiling and restore the wrapped methods."""
+        self.total_time += time.perf_counter() - self._start
+        for owner, name, original in reversed(self._patched):
+            if original is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, original)
+        self._patched = []
+        self.live = set()
+        _profiling.reset(self._token)
+        Profiler._active = None
+
+    def _wrap_append(self, append):
+        """Count each Block appended and remember the tape."""
+        def fn(tape, block):
+            if _profiling.get() is self:
+                self.counts[type(block).__name__] += 1
+                self.tapes.add(tape)
+            append(tape, block)
+        return fn
+
+    def _wrap_sweep(self, sweep):
+        """Time each reverse sweep."""
+        def fn(tape, *args, **kwargs):
+            if _profiling.get() is not self:
+                return sweep(tape, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return sweep(tape, *args, **kwargs)
+            finally:
+                self.sweeps += 1
+                self.sweep_time += time.perf_counter() - start
+        return fn
+
+    def _wrap_adjoint(self, compute_adjoint):
+        """Time compute_adjoint, by Block type."""
+        def fn(block):
+            if _profiling.get() is not self:
+                return compute_adjoint(block)
+            start = time.perf_counter()
+            compute_adjoint(block)
+            self.block_time[type(block).__name__] += \
+                time.perf_counter() - start
+        return fn
+
+    def _wrap_init(self, init):
+        """Track the AdjFloats created."""
+        def fn(x, *args):
+            init(x, *args)
+            if _profiling.get() is not self:
+                return
+            self.live.add(id(x))
+            if len(self.live) > self.peak_live:
+                self.peak_live = len(self.live)
+        return fn
+
+    def _wrap_del(self, _):
+        """Stop tracking AdjFloats when they are freed."""
+        def fn(x):
+            self.live.discard(id(x))
+        return fn
+
+    def report(self):
+        """Return the statistics collected so far as a dict.
+
+        outside_sweep_s is the time of the ``with`` statement spent
+        outside sweeps, running as well as recording the calculation, and
+        tape_bytes the size of the tapes still alive.
+        """
+        total = self.total_time
+        if self._start is not None and Profiler._active is self:
+            total += time.perf_counter() - self._start
+        return {
+            "blocks": dict(self.counts),
+            "nodes": sum(self.counts.values()),
+            "tape_bytes": sum(tape_bytes(tape) for tape in self.tapes),
+            "total_s": total,
+            "outside_sweep_s": total - self.sweep_time,
+            "sweep_s": self.sweep_time,
+            "sweeps": self.sweeps,
+            "sweep_s_by_block": dict(self.block_time),
+            "peak_live_adjfloats": self.peak_live
+        }
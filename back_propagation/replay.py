@@ -0,0 +1,79 @@
+"""Record a calculation once and replay its tape at new inputs."""
+from .adjoint import AdjFloat, RetraceError, Tape
+from .optimise import optimise
+
+
+class Trace:
+    """Re-evaluate and differentiate a function by replaying its tape.
+
+    f takes its inputs as positional numbers and returns an AdjFloat, a
+    number or a sequence of them. The first call records f on a private
+    tape with the inputs marked as independent; later calls only overwrite
+    the inputs' values and replay the recorded Blocks, so no user code runs
+    and no Blocks are allocated. If a comparison recorded as a guard
+    changes outcome at the new inputs, f is recorded again.
+
+    passes are optimisation passes (see optimise.PASSES) run over each
+    recording before it is replayed; report holds their last report.
+    """
+
+    def __init__(self, f, passes=()):
+        """Initialise Trace."""
+        self.f = f
+        self.passes = passes
+        self.report = []
+        self.tape = None
+        self.inputs = ()
+        self.outputs = []
+        self.scalar = True
+        self.recordings = 0
+
+    def __repr__(self):
+        """Representation of Trace."""
+        return (self.__class__.__name__ + "(" +
+                getattr(self.f, "__name__", repr(self.f)) + "," +
+                str(self.tape) + ")")
+
+    def record(self, *xs):
+        """Record f at xs on a fresh tape."""
+        self.tape = Tape()
+        with self.tape:
+            self.inputs = tuple(AdjFloat(x, 0) for x in xs)
+            y = self.f(*self.inputs)
+        self.scalar = not isinstance(y, (tuple, list))
+        self.outputs = [y] if self.scalar else list(y)
+        if self.passes:
+            self.tape, self.outputs, self.report = optimise(
+                self.tape, self.inputs, self.outputs, self.passes)
+        self.recordings += 1
+
+    def replay(self, *xs):
+        """Bring the tape up to date with xs, recording again if needed."""
+        if self.tape is None or len(xs) != len(self.inputs):
+            self.record(*xs)
+            return
+        for x, v in zip(self.inputs, xs):
+            x.val = v
+        try:
+            self.tape.replay()
+        except RetraceError:
+            self.record(*xs)
+
+    def values(self):
+        """Return the current values of the outputs."""
+        values = [y.val if isinstance(y, AdjFloat) else y
+                  for y in self.outputs]
+        return values[0] if self.scalar else values
+
+    def __call__(self, *xs):
+        """Return the value of f at xs."""
+        self.replay(*xs)
+        return self.values()
+
+    def gradient(self, *xs, output=0):
+        """Return the value of f at xs and the gradient of one output."""
+        self.replay(*xs)
+        y = self.outputs[output]
+        if not isinstance(y, AdjFloat):
+            return self.values(), tuple(0 for _ in xs)
+        return self.values(), self.tape.derivative(y, *self.inputs)
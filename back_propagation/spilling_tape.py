@@ -0,0 +1,252 @@
+"""A linearised tape that spills to a temporary file past a memory budget."""
+import tempfile
+from array import array
+from bisect import bisect_right
+from numbers import Number
+
+from .adjoint import UNREACHED, AdjFloat
+from .linear_tape import LinearTape
+
+# Bytes of records a SpillingTape holds in memory before spilling them.
+BUDGET = 64 << 20
+
+
+class SpillingTape(LinearTape):
+    """Record local partial derivatives, streaming them to disk as it goes.
+
+    Operations are linearised as on a LinearTape, but stored as four flat
+    arrays: the end of each operation's edges, the slots of its operands,
+    the partials by them and the id of its result. Once the arrays take
+    budget bytes they are written to a temporary file in directory as one
+    segment and recording carries on in fresh arrays. The reverse sweep
+    reads the segments back in reverse order, each with one sequential
+    read, so the records in memory never exceed about twice the budget.
+
+    Only the records are bounded: the tape still holds the id of each leaf
+    (input or constant) in memory, and a sweep holds an adjoint per slot (8
+    bytes each for scalar seeds), so resident memory still grows with the
+    length of the recording, at a small fraction of a LinearTape's. Partial
+    derivatives must be floats, so a SpillingTape cannot carry Dfloat
+    values, and it cannot be rewound into spilled segments.
+    """
+
+    def __init__(self, budget=BUDGET, directory=None):
+        """Initialise SpillingTape."""
+        super().__init__()
+        self.budget = budget
+        self.directory = directory
+        self._file = None
+        # The file offset, first operation, operations and edges of each
+        # spilled segment.
+        self._segments = []
+        self._first = 0
+        self._new_segment()
+
+    def __repr__(self):
+        """Representation of SpillingTape."""
+        return (self.__class__.__name__ + "(" + str(len(self)) + " blocks," +
+                str(len(self._segments)) + " spilled segments)")
+
+    def _new_segment(self):
+        """Start recording into empty arrays."""
+        self._ends = array("q")
+        self._slots = array("q")
+        self._partials = array("d")
+        self._ids = array("q")
+
+    def _segment_bytes(self):
+        """Return the size of the records held in memory."""
+        return 16 * (len(self._ends) + len(self._slots))
+
+    def append(self, block):
+        """Record the operand slots and partials of a Block, dropping it."""
+        if not hasattr(block, "partials"):
+            raise TypeError(f"Cannot record a {type(block).__name__} on a "
+                            f"{type(self).__name__}")
+        slots, partials = self._slots, self._partials
+        for x, p in zip(block.ops, block.partials()):
+            if isinstance(x, AdjFloat):
+                partials.append(p)
+                slots.append(self._slot(x, True))
+        n = self._len
+        block.result.position = self._base + n
+        self._ids.append(id(block.result))
+        self._ends.append(len(slots))
+        self._len = n + 1
+        if self._segment_bytes() >= self.budget:
+            self.spill()
+
+    def spill(self):
+        """Write the records held in memory to the file as a segment."""
+        if not self._ends:
+            return
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=self.directory)
+        f = self._file
+        f.seek(0, 2)
+        self._segments.append((f.tell(), self._first, len(self._ends),
+                               len(self._slots)))
+        self._ends.tofile(f)
+        self._slots.tofile(f)
+        self._partials.tofile(f)
+        self._ids.tofile(f)
+        self._first = self._len
+        self._new_segment()
+
+    def _read(self, segment):
+        """Return the arrays of a segment, or of the records in memory."""
+        if segment is None:
+            return self._ends, self._slots, self._partials
+        offset, _, n, edges = segment
+        f = self._file
+        f.seek(offset)
+        ends, slots, partials = array("q"), array("q"), array("d")
+        ends.fromfile(f, n)
+        slots.fromfile(f, edges)
+        partials.fromfile(f, edges)
+        return ends, slots, partials
+
+    def _read_items(self, offset, typecode, n):
+        """Return n items of typecode read from the file at offset."""
+        items = array(typecode)
+        self._file.seek(offset)
+        items.fromfile(self._file, n)
+        return items
+
+    def _segment_of(self, i):
+        """Return the spilled segment holding the i-th operation."""
+        firsts = [segment[1] for segment in self._segments]
+        return self._segments[bisect_right(firsts, i) - 1]
+
+    def _id(self, i):
+        """Return the id of the result of the i-th operation."""
+        if i >= self._first:
+            return self._ids[i - self._first]
+        offset, first, n, edges = self._segment_of(i)
+        return self._read_items(offset + 8 * (n + 2 * edges + i - first),
+                                "q", 1)[0]
+
+    def _segments_from(self):
+        """Return the first operation of every segment and the segment.
+
+        The records held in memory come last, as the segment None.
+        """
+        return ([(segment[1], segment) for segment in self._segments] +
+                [(self._first, None)])
+
+    def __iter__(self):
+        """Iterate over the recorded operations as flat tuples, in order."""
+        for _, segment in self._segments_from():
+            ends, slots, partials = self._read(segment)
+            begin = 0
+            for end in ends:
+                entry = ()
+                for k in range(begin, end):
+                    entry += (slots[k], partials[k])
+                yield entry
+                begin = end
+
+    def __getitem__(self, i):
+        """Return the i-th recorded operation as a flat tuple.
+
+        For a spilled operation only its own records are read.
+        """
+        if not -self._len <= i < self._len:
+            raise IndexError("tape index out of range")
+        i %= self._len
+        if i >= self._first:
+            ends, slots, partials = self._read(None)
+            k = i - self._first
+            begin, end = ends[k - 1] if k else 0, ends[k]
+            slots, partials = slots[begin:end], partials[begin:end]
+        else:
+            offset, first, n, edges = self._segment_of(i)
+            k = i - first
+            if k:
+                begin, end = self._read_items(offset + 8 * (k - 1), "q", 2)
+            else:
+                begin, end = 0, self._read_items(offset, "q", 1)[0]
+            offset += 8 * (n + begin)
+            slots = self._read_items(offset, "q", end - begin)
+            partials = self._read_items(offset + 8 * edges, "d",
+                                        end - begin)
+        entry = ()
+        for j, p in zip(slots, partials):
+            entry += (j, p)
+        return entry
+
+    def __reversed__(self):
+        """Iterate over the recorded operations in reverse order.
+
+        Each spilled segment is read once, last first.
+        """
+        for _, segment in reversed(self._segments_from()):
+            ends, slots, partials = self._read(segment)
+            for k in range(len(ends) - 1, -1, -1):
+                entry = ()
+                for m in range(ends[k - 1] if k else 0, ends[k]):
+                    entry += (slots[m], partials[m])
+                yield entry
+
+    def rewind(self, position):
+        """Drop the operations recorded after position."""
+        if position < self._first:
+            raise RuntimeError(
+                "Cannot rewind a SpillingTape into its spilled segments")
+        k = position - self._first
+        if k < len(self._ends):
+            edges = self._ends[k - 1] if k else 0
+            del self._ends[k:]
+            del self._slots[edges:]
+            del self._partials[edges:]
+            del self._ids[k:]
+        self._len = min(position, self._len)
+        if not self._len:
+            del self._leaf_ids[:]
+            self._others = {}
+
+    def clear(self):
+        """Drop every recorded operation and the spilled segments."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._segments = []
+        self._first = 0
+        self._new_segment()
+        self.rewind(0)
+
+    def sweep(self, seeds, vars, start=0):
+        """Run the tape backwards and return the adjoints of vars.
+
+        As LinearTape.sweep, reading the spilled segments back from the
+        file, last first. Scalar seeds keep the adjoints in an array of
+        floats; vector seeds, as from jacobian, in a list.
+        """
+        end = max([self.position_of(output) for output, _ in seeds] + [-1])
+        size = end + 1 + len(self._leaf_ids)
+        scalar = all(isinstance(seed, Number) for _, seed in seeds)
+        if scalar:
+            adj = array("d", bytes(8 * size))
+        else:
+            adj = [UNREACHED] * size
+        for output, seed in seeds:
+            i = self._slot(output)
+            if i is not None and i <= end:
+                adj[i] += seed
+        last = end
+        for first, segment in reversed(self._segments_from()):
+            if end < start:
+                break
+            if first > end:
+                continue
+            ends, slots, partials = self._read(segment)
+            for i in range(end, max(start, first) - 1, -1):
+                a = adj[i]
+                if (a == 0.0) if scalar else (a is UNREACHED):
+                    continue
+                k = i - first
+                for m in range(ends[k - 1] if k else 0, ends[k]):
+                    adj[slots[m]] += partials[m] * a
+            end = first - 1
+        slots = [self._slot(v) for v in vars]
+        return tuple(0 if i is None or i > last else adj[i] for i in slots)
@@ -0,0 +1,189 @@
+"""A binary file format for tapes, swept in reverse through numpy.memmap.
+
+A tape file holds a header, the node numbers of the inputs and outputs,
+and one fixed-size record per node: the CompactTape opcode, the numbers of
+up to two operands (-1 for none), the value and, optionally, the partial
+derivatives by the operands. Nodes are numbered inputs first, then
+constants and results in the order they were recorded, so every operand
+precedes the node using it and the reverse sweep reads the records
+backwards, one chunk at a time.
+"""
+import struct
+from array import array
+
+import numpy as np
+
+from .adjoint import (GuardBlock, AddBlock, SubBlock, MulBlock, DivBlock,
+                      PowBlock, SinBlock, CosBlock, TanBlock, ExpBlock,
+                      LogBlock, SinhBlock, CoshBlock, TanhBlock, AsinBlock,
+                      AcosBlock, AtanBlock, AsinhBlock, AcoshBlock,
+                      AtanhBlock)
+from .compact_tape import (VAR, CONST, ADD, SUB, MUL, DIV, POW, SIN, COS,
+                           TAN, EXP, LOG, SINH, COSH, TANH, ASIN, ACOS, ATAN,
+                           ASINH, ACOSH, ATANH, CompactTape, partials)
+
+MAGIC = b"ADTAPE01"
+
+# Magic, number of nodes, of inputs and of outputs, and whether the
+# partials are stored.
+HEADER = struct.Struct("<8sQQQ?")
+
+NODE = np.dtype([("op", "u1"), ("arg0", "<i8"), ("arg1", "<i8"),
+                 ("val", "<f8")])
+NODE_PARTIALS = np.dtype(NODE.descr + [("partial0", "<f8"),
+                                       ("partial1", "<f8")])
+
+OPCODES = {
+    AddBlock: ADD, SubBlock: SUB, MulBlock: MUL, DivBlock: DIV,
+    PowBlock: POW, SinBlock: SIN, CosBlock: COS, TanBlock: TAN,
+    ExpBlock: EXP, LogBlock: LOG, SinhBlock: SINH, CoshBlock: COSH,
+    TanhBlock: TANH, AsinBlock: ASIN, AcosBlock: ACOS, AtanBlock: ATAN,
+    AsinhBlock: ASINH, AcoshBlock: ACOSH, AtanhBlock: ATANH
+}
+
+# Records read per step of the reverse sweep.
+CHUNK = 1 << 16
+
+
+def _nodes(tape, inputs, outputs):
+    """Return the node columns of a Tape and the outputs' node numbers."""
+    index = {id(x): i for i, x in enumerate(inputs)}
+    n = len(inputs)
+    op, arg0, arg1 = [VAR] * n, [-1] * n, [-1] * n
+    val = [x.val for x in inputs]
+
+    def number(x):
+        if id(x) not in index:
+            index[id(x)] = len(op)
+            op.append(CONST)
+            arg0.append(-1)
+            arg1.append(-1)
+            val.append(getattr(x, "val", x))
+        return index[id(x)]
+    for block in tape:
+        if type(block) is GuardBlock:
+            continue
+        if type(block) not in OPCODES:
+            raise TypeError(f"Cannot save a {type(block).__name__}")
+        args = [number(o) for o in block.ops] + [-1]
+        index[id(block.result)] = len(op)
+        op.append(OPCODES[type(block)])
+        arg0.append(args[0])
+        arg1.append(args[1])
+        val.append(block.result.val)
+    return (op, arg0, arg1, val), [number(y) for y in outputs]
+
+
+def save_tape(path, tape, inputs, outputs, store_partials=False):
+    """Write the recording of outputs from inputs on tape to path.
+
+    tape is a Tape, with inputs and outputs AdjFloats (or numbers among the
+    outputs), or a CompactTape with CompactFloats. With store_partials the
+    partial derivatives are evaluated now and saved, so sweeping the file
+    reads it strictly sequentially and computes no elementary functions.
+    """
+    if isinstance(tape, CompactTape):
+        columns = tape.op, tape.arg0, tape.arg1, tape.val
+        inputs = [x.index for x in inputs]
+        outputs = [y.index for y in outputs]
+    else:
+        columns, outputs = _nodes(tape, inputs, outputs)
+        inputs = range(len(inputs))
+    nodes = np.zeros(len(columns[0]),
+                     NODE_PARTIALS if store_partials else NODE)
+    for name, column in zip(("op", "arg0", "arg1", "val"), columns):
+        nodes[name] = column
+    if store_partials and len(nodes):
+        op, arg0, arg1, val = columns
+        nodes["partial0"], nodes["partial1"] = zip(*[
+            partials(o, val[a], val[b], r) if o > CONST else (0.0, 0.0)
+            for o, a, b, r in zip(op, arg0, arg1, val)])
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(nodes), len(inputs), len(outputs),
+                            store_partials))
+        f.write(np.asarray(inputs, dtype="<i8").tobytes())
+        f.write(np.asarray(outputs, dtype="<i8").tobytes())
+        f.write(nodes.tobytes())
+
+
+class MappedTape:
+    """A saved tape, memory-mapped from disk and swept in place.
+
+    The records are read through numpy.memmap, so the tape need not fit in
+    memory as Python objects; only the adjoints, one float per node, are
+    held in memory, plus the values when the partials were not stored.
+    """
+
+    def __init__(self, path):
+        """Initialise MappedTape."""
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a tape file")
+        _, n, n_inputs, n_outputs, self.stored_partials = HEADER.unpack(header)
+        self.path = path
+        offset = HEADER.size
+        self.inputs = np.fromfile(path, "<i8", n_inputs, offset=offset)
+        offset += 8 * n_inputs
+        self.outputs = np.fromfile(path, "<i8", n_outputs, offset=offset)
+        offset += 8 * n_outputs
+        dtype = NODE_PARTIALS if self.stored_partials else NODE
+        self.nodes = np.memmap(path, dtype, "r", offset, (n,))
+
+    def __repr__(self):
+        """Representation of MappedTape."""
+        return (self.__class__.__name__ + "(" + str(self.path) + "," +
+                str(len(self)) + " nodes)")
+
+    def __len__(self):
+        """Return the number of nodes."""
+        return len(self.nodes)
+
+    def value(self, output=0):
+        """Return the value of an output."""
+        return float(self.nodes["val"][self.outputs[output]])
+
+    def derivative(self, output=0):
+        """Return the gradient of an output by the inputs."""
+        return self.sweep(((output, 1.0),))
+
+    def sweep(self, seeds, chunk=CHUNK):
+        """Run the file backwards and return the adjoints of the inputs.
+
+        seeds pairs output numbers with the adjoints they start from.
+        """
+        end = max([int(self.outputs[o]) for o, _ in seeds] + [-1])
+        stored = self.stored_partials
+        adj = array("d", bytes(8 * (end + 1)))
+        for o, seed in seeds:
+            adj[self.outputs[o]] += seed
+        if not stored:
+            val = array("d", self.nodes["val"][:end + 1].tobytes())
+        for stop in range(end + 1, 0, -chunk):
+            begin = max(stop - chunk, 0)
+            records = self.nodes[begin:stop]
+            op = records["op"].tolist()
+            arg0 = records["arg0"].tolist()
+            arg1 = records["arg1"].tolist()
+            if stored:
+                p0 = records["partial0"].tolist()
+                p1 = records["partial1"].tolist()
+            for k in range(stop - begin - 1, -1, -1):
+                g = adj[begin + k]
+                o = op[k]
+                if g == 0.0 or o <= CONST:
+                    continue
+                a, b = arg0[k], arg1[k]
+                if stored:
+                    da, db = p0[k], p1[k]
+                else:
+                    da, db = partials(o, val[a], val[b], val[begin + k])
+                adj[a] += da * g
+                if b >= 0:
+                    adj[b] += db * g
+        return np.array([adj[i] if i <= end else 0.0 for i in self.inputs])
+
+
+def load_tape(path):
+    """Memory-map the tape saved at path."""
+    return MappedTape(path)
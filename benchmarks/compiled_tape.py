@@ -0,0 +1,44 @@
+"""Compare compiled tapes with the interpreted derivative() sweep.
+
+Run from the repository root with ``python -m benchmarks.compiled_tape``.
+"""
+import sys
+import timeit
+
+from back_propagation import AdjFloat, Tape, Trace, compile_tape
+from forward_propagation import sin, exp, tanh
+
+
+def model(*xs):
+    """Evaluate a chain of smooth operations over every input."""
+    y = 0
+    for i, x in enumerate(xs):
+        y = y + tanh(x * (i % 5 + 1)) * exp(-1 * x * x) + sin(y) / (2 + x * x)
+    return y
+
+
+def main(sizes=(10, 100, 1000), repeat=20):
+    """Print value-and-gradient times of each approach for each size."""
+    print(f"{'inputs':>7} {'blocks':>7} {'derivative s':>13} "
+          f"{'replay s':>10} {'compiled s':>11} {'speedup':>8}")
+    for n in sizes:
+        point = [0.1 * (i % 7) + 0.05 for i in range(n)]
+        with Tape() as tape:
+            xs = [AdjFloat(p, 0) for p in point]
+            y = model(*xs)
+        compiled = compile_tape(tape, xs, y)
+        trace = Trace(model)
+        trace.gradient(*point)
+        interpreted = timeit.timeit(lambda: tape.derivative(y, *xs),
+                                    number=repeat) / repeat
+        replayed = timeit.timeit(lambda: trace.gradient(*point),
+                                 number=repeat) / repeat
+        generated = timeit.timeit(lambda: compiled(*point),
+                                  number=repeat) / repeat
+        print(f"{n:>7} {len(tape):>7} {interpreted:>13.6f} "
+              f"{replayed:>10.6f} {generated:>11.6f} "
+              f"{interpreted / generated:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(tuple(int(a) for a in sys.argv[1:]) or (10, 100, 1000))
@@ -0,0 +1,152 @@
+"""Throughput and memory of both modes on standard problems, as JSON.
+
+Run from the repository root with
+``python -m benchmarks.suite [output.json] [--scale N] [--repeat N]``.
+Each problem is a scalar function of n inputs evaluated at several sizes;
+for each size the suite records:
+
+- function_s: the time of one evaluation on plain floats,
+- nodes: the number of Blocks taped by one AdjFloat evaluation,
+- dfloat_nodes_per_s: taped nodes per second of Dfloat evaluation in one
+  direction, i.e. nodes over the Dfloat run time; Dfloat operations on
+  passive values, which are not taped, are not counted,
+- record_nodes_per_s and sweep_nodes_per_s: AdjFloat recording and
+  reverse-sweep rates,
+- bytes_per_node: the peak memory traced while recording, per node,
+- gradient_ratio: the cost of the gradient (recording plus sweep) over
+  the cost of the function.
+
+Times are the best of repeat runs.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from back_propagation import AdjFloat, Tape
+from forward_propagation import Dfloat, tanh
+
+
+def rosenbrock(*x):
+    """Evaluate the extended Rosenbrock function of an even number of x."""
+    y = 0
+    for i in range(0, len(x) - 1, 2):
+        y = y + 100 * (x[i + 1] - x[i] ** 2) ** 2 + (1 - x[i]) ** 2
+    return y
+
+
+def mlp(*w):
+    """Evaluate the loss of a one-hidden-layer tanh network.
+
+    The weights are those of a network with four inputs and len(w) // 5
+    hidden units, fitted to a fixed batch of eight points.
+    """
+    hidden = len(w) // 5
+    loss = 0
+    for p in range(8):
+        x = [((p * 7 + k * 3) % 11) / 11 - 0.5 for k in range(4)]
+        out = 0
+        for h in range(hidden):
+            a = sum(w[h * 4 + k] * x[k] for k in range(4))
+            out = out + w[hidden * 4 + h] * tanh(a)
+        loss = loss + (out - x[0] * x[1]) ** 2
+    return loss / 8
+
+
+def heat(*u, steps=20, r=0.25):
+    """Step the explicit heat equation from u and return the energy."""
+    u = list(u)
+    for _ in range(steps):
+        u = [u[i] + r * ((u[i - 1] if i else 0) - 2 * u[i] +
+                         (u[i + 1] if i < len(u) - 1 else 0))
+             for i in range(len(u))]
+    return sum(v * v for v in u)
+
+
+PROBLEMS = {
+    "rosenbrock": (rosenbrock, (10, 100, 1000)),
+    "mlp": (mlp, (20, 80, 320)),
+    "heat": (heat, (10, 50, 250))
+}
+
+
+def best(run, repeat):
+    """Return the least time of repeat calls of run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure(f, n, repeat):
+    """Return the measurements of f with n inputs."""
+    point = [0.3 + 0.4 * ((i * 37) % 11) / 11 for i in range(n)]
+    function_s = best(lambda: f(*point), repeat)
+    dfloat_s = best(lambda: f(*(Dfloat(x, float(i == 0))
+                                for i, x in enumerate(point))), repeat)
+
+    def record():
+        with Tape() as tape:
+            xs = [AdjFloat(x, 0) for x in point]
+            y = f(*xs)
+        return tape, xs, y
+    record_s = best(record, repeat)
+    tracemalloc.start()
+    tape, xs, y = record()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    sweep_s = best(lambda: tape.derivative(y, *xs), repeat)
+    nodes = len(tape)
+    return {
+        "inputs": n,
+        "nodes": nodes,
+        "function_s": function_s,
+        "dfloat_nodes_per_s": nodes / dfloat_s,
+        "record_nodes_per_s": nodes / record_s,
+        "sweep_nodes_per_s": nodes / sweep_s,
+        "bytes_per_node": peak / nodes,
+        "gradient_ratio": (record_s + sweep_s) / function_s
+    }
+
+
+def run(scale=1, repeat=5, problems=PROBLEMS):
+    """Return the results of every problem at every size, times scale."""
+    results = []
+    for name, (f, sizes) in problems.items():
+        for n in sizes:
+            result = {"problem": name}
+            result.update(measure(f, n * scale, repeat))
+            results.append(result)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results
+    }
+
+
+def main(argv=None):
+    """Run the suite and write its JSON to a file or standard output."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", nargs="?", help="JSON file to write")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="multiply every problem size by this")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs per measurement, keeping the best")
+    args = parser.parse_args(argv)
+    report = run(args.scale, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the list-of-Blocks tape, LinearTape and CompactTape.
+
+Run from the repository root with ``python -m benchmarks.tape_memory``.
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from back_propagation import (AdjFloat, CompactFloat, CompactTape,
+                              LinearTape, Tape, sin)
+
+
+def record(x, n):
+    """Record n nodes of a mixed arithmetic/transcendental chain."""
+    y = x
+    for _ in range(n // 4):
+        y = sin(y * x + 1) / 2
+    return y
+
+
+def measure(make, n):
+    """Return bytes per node, record time and sweep time for one design.
+
+    make(n) records n nodes and returns a reverse sweep callable and the
+    number of nodes on its tape.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    sweep, nodes = make(n)
+    recorded = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    sweep()
+    swept = time.perf_counter() - start
+    return size / nodes, recorded, swept
+
+
+def make_blocks(n):
+    """Record n nodes on the AdjFloat tape."""
+    with Tape() as tape:
+        x = AdjFloat(0.5, 0)
+        y = record(x, n)
+    return lambda: tape.derivative(y, x), len(tape)
+
+
+def make_linear(n):
+    """Record n nodes on a LinearTape."""
+    with LinearTape() as tape:
+        x = AdjFloat(0.5, 0)
+        y = record(x, n)
+    return lambda: tape.derivative(y, x), len(tape)
+
+
+def make_compact(n):
+    """Record n nodes on a CompactTape."""
+    tape = CompactTape()
+    x = CompactFloat(0.5, tape)
+    y = record(x, n)
+    return lambda: y.derivative(x), len(tape)
+
+
+def main(sizes=(10 ** 4, 10 ** 5, 10 ** 6)):
+    """Print bytes per node and timings for each design and size."""
+    print(f"{'design':>8} {'nodes':>9} {'bytes/node':>11} "
+          f"{'record s':>9} {'sweep s':>9}")
+    for n in sizes:
+        for name, make in (("blocks", make_blocks),
+                           ("linear", make_linear),
+                           ("compact", make_compact)):
+            per_node, recorded, swept = measure(make, n)
+            print(f"{name:>8} {n:>9} {per_node:>11.1f} "
+                  f"{recorded:>9.3f} {swept:>9.3f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(a) for a in sys.argv[1:]) or (10 ** 4, 10 ** 5, 10 ** 6))
@@ -0,0 +1,4 @@
+from .modes import (grad, jacobian, jvp, vjp, hvp, choose_mode, # noqa F401
+                    forward_jacobian, reverse_jacobian) # noqa F401
+from .sparse import sparse_jacobian, sparsity, colour_columns # noqa F401
+from .batch import gradient_many # noqa F401
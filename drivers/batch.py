@@ -0,0 +1,48 @@
+"""Gradients of one function at many independent points, in parallel.
+
+Each worker process has its own current tape, so the points can be split
+between processes safely. Within a chunk the function is recorded once and
+its tape replayed at every point (see Trace), recording again only when a
+comparison changes outcome.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from back_propagation import Trace
+
+# Chunks handed to each worker: a few per worker balance the load, while
+# chunks of many points keep the cost of pickling small against the work.
+CHUNKS_PER_WORKER = 4
+
+
+def gradient_chunk(f, points):
+    """Return the gradients of f at each row of points."""
+    trace = Trace(f)
+    grads = np.zeros(np.shape(points))
+    for i, x in enumerate(points):
+        grads[i] = trace.gradient(*x)[1]
+    return grads
+
+
+def gradient_many(f, points, workers=None):
+    """Return the gradients of the scalar function f at many points.
+
+    points is an array with one point per row, and the gradients are
+    returned in an array of the same shape. The rows are split into chunks
+    evaluated by a pool of worker processes (by default one per CPU), so f
+    must be picklable, e.g. defined at module level. With one worker, or
+    fewer points than workers, everything runs in this process.
+    """
+    points = np.asarray(points, dtype=float)
+    if points.ndim == 1:
+        points = points[:, None]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(points) < workers:
+        return gradient_chunk(f, points)
+    chunks = np.array_split(points, min(len(points),
+                                        workers * CHUNKS_PER_WORKER))
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(gradient_chunk, [f] * len(chunks), chunks))
+    return np.concatenate(results)
@@ -0,0 +1,171 @@
+"""Derivatives of plain Python functions in forward or reverse mode.
+
+A function f takes its inputs as positional numbers and returns either a
+number or a sequence of numbers. Forward mode (Dfloat with one tangent
+direction per input) costs one pass whatever the number of outputs, while
+reverse mode (AdjFloat) costs one recording plus one sweep per output, so
+the cheaper mode is chosen from the numbers of inputs and outputs.
+
+f should use the elementary functions of forward_propagation, which accept
+numbers, Dfloats and AdjFloats alike. Nesting the two, AdjFloats holding
+Dfloat values, gives Hessian-vector products.
+"""
+import numpy as np
+
+from back_propagation import AdjFloat, Tape
+from forward_propagation import Dfloat, variables
+
+MODES = ("auto", "forward", "reverse")
+
+# Below this many outputs, one scalar sweep per output beats one sweep with
+# NumPy vector adjoints, whose per-Block overhead is several times larger.
+VECTOR_SWEEP_OUTPUTS = 8
+
+
+def _as_list(y):
+    """Return the outputs of a function as a list and whether it was one."""
+    if isinstance(y, (tuple, list, np.ndarray)):
+        return list(y), False
+    return [y], True
+
+
+def _value(y):
+    """Return the primal value of an active or passive output."""
+    if isinstance(y, Dfloat):
+        return y.x
+    if isinstance(y, AdjFloat):
+        return y.val
+    return y
+
+
+def _tangent(y):
+    """Return the tangent of a value that may be a plain number."""
+    return y.dx if isinstance(y, Dfloat) else 0.
+
+
+def record(f, xs):
+    """Run f on AdjFloats on a fresh tape.
+
+    Return the tape, the input AdjFloats, the list of outputs and whether f
+    returned a single number.
+    """
+    with Tape() as tape:
+        inputs = tuple(AdjFloat(x, 0) for x in xs)
+        outputs, scalar = _as_list(f(*inputs))
+    return tape, inputs, outputs, scalar
+
+
+def choose_mode(n_inputs, n_outputs, mode="auto"):
+    """Return "forward" or "reverse" for a function of the given shape."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, not {mode!r}")
+    if mode == "auto":
+        return "forward" if n_outputs >= n_inputs else "reverse"
+    return mode
+
+
+def forward_jacobian(f, xs, seeds=None):
+    """Return the outputs of f and its Jacobian from one vector pass.
+
+    seeds holds the tangent of each input as a row, the identity by default;
+    otherwise the product of the Jacobian with seeds is returned.
+    """
+    if seeds is None:
+        inputs = variables(*xs)
+    else:
+        inputs = tuple(Dfloat(x, dx) for x, dx in zip(xs, seeds))
+    outputs, scalar = _as_list(f(*inputs))
+    jac = np.zeros((len(outputs), len(xs) if seeds is None else
+                    np.shape(seeds)[1]))
+    for i, y in enumerate(outputs):
+        if isinstance(y, Dfloat):
+            jac[i] = y.dx
+    return [_value(y) for y in outputs], jac, scalar
+
+
+def reverse_jacobian(f, xs):
+    """Return the outputs of f and its Jacobian from one recording.
+
+    A few outputs are swept one at a time; from VECTOR_SWEEP_OUTPUTS on, a
+    single sweep with vector adjoints is cheaper.
+    """
+    tape, inputs, outputs, scalar = record(f, xs)
+    if len(outputs) >= VECTOR_SWEEP_OUTPUTS:
+        jac = tape.jacobian(outputs, inputs)
+    else:
+        jac = np.zeros((len(outputs), len(xs)))
+        for i, y in enumerate(outputs):
+            if isinstance(y, AdjFloat):
+                jac[i] = tape.derivative(y, *inputs)
+    return [_value(y) for y in outputs], jac, scalar
+
+
+def jacobian(f, mode="auto"):
+    """Return a function computing the Jacobian of f as an array.
+
+    With mode "auto" the number of outputs is found by evaluating f once
+    on plain numbers the first time it is called; forward mode is used when
+    there are at least as many outputs as inputs and reverse mode
+    otherwise.
+    """
+    n_outputs = {}
+
+    def jac(*xs):
+        if mode == "auto" and len(xs) not in n_outputs:
+            n_outputs[len(xs)] = len(_as_list(f(*xs))[0])
+        if choose_mode(len(xs), n_outputs.get(len(xs)), mode) == "forward":
+            return forward_jacobian(f, xs)[1]
+        return reverse_jacobian(f, xs)[1]
+    jac.__doc__ = f"Jacobian of {getattr(f, '__name__', f)}."
+    return jac
+
+
+def grad(f, mode="auto"):
+    """Return a function computing the gradient of the scalar function f."""
+    def gradient(*xs):
+        if choose_mode(len(xs), 1, mode) == "forward":
+            return forward_jacobian(f, xs)[1][0]
+        return reverse_jacobian(f, xs)[1][0]
+    gradient.__doc__ = f"Gradient of {getattr(f, '__name__', f)}."
+    return gradient
+
+
+def jvp(f, xs, v):
+    """Return f(xs) and the Jacobian-vector product J v from one pass."""
+    outputs, scalar = _as_list(f(*(Dfloat(x, dx) for x, dx in zip(xs, v))))
+    values = [_value(y) for y in outputs]
+    tangents = [_tangent(y) for y in outputs]
+    if scalar:
+        return values[0], tangents[0]
+    return np.array(values), np.array(tangents)
+
+
+def hvp(f, xs, v):
+    """Return the gradient of f at xs and the Hessian-vector product H v.
+
+    This is forward over reverse: f is recorded on AdjFloats whose values
+    are Dfloats carrying the direction v, so the one reverse sweep also
+    differentiates the gradient along v, at a small multiple of the cost of
+    the gradient and independently of the number of inputs.
+    """
+    tape, inputs, outputs, scalar = record(f, [Dfloat(x, dx)
+                                              for x, dx in zip(xs, v)])
+    if not scalar:
+        raise ValueError("hvp needs a scalar function")
+    if not isinstance(outputs[0], AdjFloat):
+        return np.zeros(len(xs)), np.zeros(len(xs))
+    adjs = tape.derivative(outputs[0], *inputs)
+    return (np.array([_value(a) for a in adjs], dtype=float),
+            np.array([_tangent(a) for a in adjs], dtype=float))
+
+
+def vjp(f, xs, u):
+    """Return f(xs) and the vector-Jacobian product u^T J from one sweep."""
+    tape, inputs, outputs, scalar = record(f, xs)
+    if scalar:
+        u = (u,)
+    seeds = tuple((y, w) for y, w in zip(outputs, u)
+                  if isinstance(y, AdjFloat))
+    cotangent = np.array(tape.sweep(seeds, inputs), dtype=float)
+    values = [_value(y) for y in outputs]
+    return (values[0] if scalar else np.array(values)), cotangent
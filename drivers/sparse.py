@@ -0,0 +1,100 @@
+"""Sparse Jacobians by column colouring and compressed forward seeds.
+
+Columns of the Jacobian that have no nonzero row in common can share one
+tangent direction: seeding each input with the unit vector of its colour
+gives, in one forward pass with as many directions as colours, a compressed
+Jacobian from which every nonzero is read back directly.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from back_propagation import GuardBlock, RetraceError
+from .modes import record, forward_jacobian
+
+
+def sparsity(f, xs):
+    """Return the sparsity pattern of the Jacobian of f at xs.
+
+    f is traced once on AdjFloats and the inputs each result depends on are
+    propagated through the recorded Blocks. The pattern is that of this
+    evaluation, so branches taken at other inputs may differ.
+    """
+    return _pattern(*record(f, xs)[:3])
+
+
+def _pattern(tape, inputs, outputs):
+    """Return the sparsity pattern of outputs by inputs recorded on tape."""
+    deps = {id(x): {j} for j, x in enumerate(inputs)}
+    for block in tape:
+        if type(block) is not GuardBlock:
+            deps[id(block.result)] = set().union(
+                *(deps.get(id(o), ()) for o in block.ops))
+    rows, cols = [], []
+    for i, y in enumerate(outputs):
+        for j in sorted(deps.get(id(y), ())):
+            rows.append(i)
+            cols.append(j)
+    return csr_matrix((np.ones(len(rows), dtype=bool), (rows, cols)),
+                      shape=(len(outputs), len(inputs)))
+
+
+def colour_columns(pattern):
+    """Return a colour for each column so columns sharing a row differ.
+
+    Columns are coloured greedily, those with most nonzeros first, each
+    with the least colour none of the columns it shares a row with has.
+    """
+    pattern = csr_matrix(pattern)
+    columns = pattern.tocsc()
+    colours = np.full(pattern.shape[1], -1)
+    order = np.argsort(-np.diff(columns.indptr), kind="stable")
+    for j in order:
+        used = set()
+        for i in columns.indices[columns.indptr[j]:columns.indptr[j + 1]]:
+            row = pattern.indices[pattern.indptr[i]:pattern.indptr[i + 1]]
+            used.update(colours[row])
+        colour = 0
+        while colour in used:
+            colour += 1
+        colours[j] = colour
+    return colours
+
+
+def sparse_jacobian(f):
+    """Return a function computing the Jacobian of f as a sparse matrix.
+
+    The first call for a number of inputs finds the sparsity pattern and
+    colours its columns; every call then costs one forward pass with one
+    tangent direction per colour instead of one per input.
+
+    The pattern holds only for the branches f took when it was found. If
+    that recording has guards (comparisons of inputs), later calls replay
+    it first, and find the pattern again when a comparison comes out
+    differently; branches on anything else are not detected.
+    """
+    cache = {}
+
+    def jac(*xs):
+        entry = cache.get(len(xs))
+        if entry is not None and entry[2] is not None:
+            tape, inputs = entry[2]
+            for x, v in zip(inputs, xs):
+                x.val = v
+            try:
+                tape.replay()
+            except RetraceError:
+                entry = None
+        if entry is None:
+            tape, inputs, outputs, _ = record(f, xs)
+            pattern = _pattern(tape, inputs, outputs).tocoo()
+            guarded = any(type(block) is GuardBlock for block in tape)
+            entry = cache[len(xs)] = (pattern, colour_columns(pattern),
+                                      (tape, inputs) if guarded else None)
+        pattern, colours, _ = entry
+        seeds = np.eye(colours.max() + 1 if len(xs) else 0)[colours]
+        compressed = forward_jacobian(f, xs, seeds)[1]
+        rows, cols = pattern.row, pattern.col
+        return csr_matrix((compressed[rows, colours[cols]], (rows, cols)),
+                          shape=pattern.shape)
+    jac.__doc__ = f"Sparse Jacobian of {getattr(f, '__name__', f)}."
+    return jac
@@ -1,3 +1,6 @@
 from .tangent_linear import (Dfloat, sin, cos, tan, exp, log, sinh, cosh, # noqa F401
                               tanh, asin, acos, atan, asinh, acosh, # noqa F401
-                              atanh) # noqa F401
+                              atanh, sqrt, variables, fsum, prod, # noqa F401
+                              dot, polyval) # noqa F401
+from .dual_array import DualArray # noqa F401
+from .taylor import TaylorFloat, taylor # noqa F401
@@ -0,0 +1,108 @@
+"""Tangent-linear algorithmic differentiation over batches of points."""
+import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+
+def _power(x, y, dx, dy, r):
+    """Return the tangent of x ** y."""
+    if not np.any(dy):
+        return y * x ** (y - 1) * dx
+    logx = np.log(x, out=np.zeros(np.broadcast(x, y).shape), where=x > 0)
+    return r * (dy * logx + y * dx / x)
+
+
+# Tangent rule of each supported ufunc, given the primal operands, their
+# tangents and the primal result r.
+UNARY_RULES = {
+    np.negative: lambda x, dx, r: -dx,
+    np.positive: lambda x, dx, r: dx,
+    np.sqrt: lambda x, dx, r: dx / (2 * r),
+    np.square: lambda x, dx, r: 2 * x * dx,
+    np.sin: lambda x, dx, r: dx * np.cos(x),
+    np.cos: lambda x, dx, r: -dx * np.sin(x),
+    np.tan: lambda x, dx, r: dx * (1 + r ** 2),
+    np.exp: lambda x, dx, r: dx * r,
+    np.log: lambda x, dx, r: dx / x,
+    np.sinh: lambda x, dx, r: dx * np.cosh(x),
+    np.cosh: lambda x, dx, r: dx * np.sinh(x),
+    np.tanh: lambda x, dx, r: dx * (1 - r ** 2),
+    np.arcsin: lambda x, dx, r: dx / np.sqrt(1 - x ** 2),
+    np.arccos: lambda x, dx, r: -dx / np.sqrt(1 - x ** 2),
+    np.arctan: lambda x, dx, r: dx / (1 + x ** 2),
+    np.arcsinh: lambda x, dx, r: dx / np.sqrt(1 + x ** 2),
+    np.arccosh: lambda x, dx, r: dx / np.sqrt(x ** 2 - 1),
+    np.arctanh: lambda x, dx, r: dx / (1 - x ** 2)
+}
+
+BINARY_RULES = {
+    np.add: lambda x, y, dx, dy, r: dx + dy,
+    np.subtract: lambda x, y, dx, dy, r: dx - dy,
+    np.multiply: lambda x, y, dx, dy, r: y * dx + x * dy,
+    np.true_divide: lambda x, y, dx, dy, r: (dx - r * dy) / y,
+    np.power: _power
+}
+
+
+class DualArray(NDArrayOperatorsMixin):
+    """Implement forward-propagation differentiation on arrays of points.
+
+    x holds the primal values and dx the tangents, one per element. NumPy
+    ufuncs such as np.sin and the arithmetic operators act on both arrays
+    at once, so the Python-level cost is per operation, not per point.
+    """
+
+    def __init__(self, x, dx):
+        """Initialise DualArray."""
+        self.x = np.asarray(x, dtype=float)
+        self.dx = np.asarray(dx, dtype=float)
+
+    def __repr__(self):
+        """Representation of DualArray."""
+        return (self.__class__.__name__ + "(" + str(self.x) +
+                "," + str(self.dx) + ")")
+
+    def __len__(self):
+        """Return the number of points along the first axis."""
+        return len(self.x)
+
+    def __getitem__(self, key):
+        """Return a slice of the points."""
+        return type(self)(self.x[key],
+                          np.broadcast_to(self.dx, self.x.shape)[key])
+
+    @property
+    def shape(self):
+        """Return the shape of the primal array."""
+        return self.x.shape
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """Apply ufunc to the primal values and propagate the tangents."""
+        if kwargs.get("out") is not None:
+            return NotImplemented
+        xs, dxs = [], []
+        for i in inputs:
+            if isinstance(i, DualArray):
+                xs.append(i.x)
+                dxs.append(i.dx)
+            elif isinstance(i, (int, float, np.ndarray, np.number)):
+                xs.append(i)
+                dxs.append(0.)
+            else:
+                return NotImplemented
+        if method == "reduce" and ufunc is np.add:
+            dx = np.broadcast_to(dxs[0], np.shape(xs[0]))
+            return type(self)(ufunc.reduce(xs[0], **kwargs),
+                              ufunc.reduce(dx, **kwargs))
+        if method != "__call__" or kwargs:
+            return NotImplemented
+        if ufunc in UNARY_RULES:
+            r = ufunc(xs[0])
+            return type(self)(r, UNARY_RULES[ufunc](xs[0], dxs[0], r))
+        if ufunc in BINARY_RULES:
+            r = ufunc(*xs)
+            return type(self)(r, BINARY_RULES[ufunc](*xs, *dxs, r))
+        return NotImplemented
+
+    def sum(self, axis=None):
+        """Sum the points along axis."""
+        return np.add.reduce(self, axis=axis)
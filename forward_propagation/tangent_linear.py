@@ -3,6 +3,10 @@ import math
 from functools import wraps
 from numbers import Number
 
+import numpy as np
+
+from .dual_array import DualArray
+
 
 def deal_with_other_types(meth):
     """Cast the second argument of a method to Dfloat when needed."""
@@ -19,8 +23,20 @@ def deal_with_other_types(meth):
     return fn
 
 
+def is_zero(dx):
+    """Return whether the tangent dx is zero in every direction."""
+    if isinstance(dx, Number):
+        return dx == 0
+    return not dx.any()
+
+
 class Dfloat:
-    """Implement forward-propagation differentiation."""
+    """Implement forward-propagation differentiation.
+
+    The tangent dx is either a number or a NumPy array holding one entry per
+    tangent direction, in which case every rule propagates all directions
+    at once.
+    """
 
     def __init__(self, x, dx):
         """Initialise Dfloat."""
@@ -77,6 +93,9 @@ class Dfloat:
     @deal_with_other_types
     def __pow__(self, other):
         """Implement exponentiation."""
+        if is_zero(other.dx):
+            return type(self)(self.x ** other.x, other.x *
+                              self.x ** (other.x - 1) * self.dx)
         return type(self)(self.x ** other.x, (self.x ** other.x) * (other.dx
                           * log(self.x) + (other.x * self.dx) / self.x))
 
@@ -85,115 +104,302 @@ class Dfloat:
         """Reverse exponentiation."""
         return other ** self
 
+    @deal_with_other_types
+    def __lt__(self, other):
+        """Implement less than on the primal values."""
+        return self.x < other.x
+
+    @deal_with_other_types
+    def __le__(self, other):
+        """Implement less than or equal on the primal values."""
+        return self.x <= other.x
+
+    @deal_with_other_types
+    def __gt__(self, other):
+        """Implement greater than on the primal values."""
+        return self.x > other.x
+
+    @deal_with_other_types
+    def __ge__(self, other):
+        """Implement greater than or equal on the primal values."""
+        return self.x >= other.x
+
+
+def variables(*xs):
+    """Return a Dfloat for each of xs seeded with its own tangent direction.
+
+    The i-th Dfloat has the i-th unit vector as dx, so the dx of any result
+    is its gradient with respect to xs.
+    """
+    seeds = np.eye(len(xs))
+    return tuple(Dfloat(x, dx) for x, dx in zip(xs, seeds))
+
+
+def sqrt(x):
+    """Define sqrt for Dfloat and DualArray, else x.sqrt(), math or ** 0.5."""
+    if isinstance(x, Dfloat):
+        r = math.sqrt(x.x)
+        return Dfloat(r, x.dx / (2 * r))
+    elif isinstance(x, DualArray):
+        return np.sqrt(x)
+    elif hasattr(x, "sqrt"):
+        return x.sqrt()
+    elif isinstance(x, Number):
+        return math.sqrt(x)
+    else:
+        return x ** 0.5
+
 
 def sin(x):
-    """Define sin for Dfloat, else use math.sin."""
+    """Define sin for Dfloat and DualArray, else use x.sin() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.sin(x.x), x.dx * math.cos(x.x))
+    elif isinstance(x, DualArray):
+        return np.sin(x)
+    elif hasattr(x, "sin"):
+        return x.sin()
     else:
         return math.sin(x)
 
 
 def cos(x):
-    """Define cos for Dfloat, else use math.cos."""
+    """Define cos for Dfloat and DualArray, else use x.cos() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.cos(x.x), -x.dx * math.sin(x.x))
+    elif isinstance(x, DualArray):
+        return np.cos(x)
+    elif hasattr(x, "cos"):
+        return x.cos()
     else:
         return math.cos(x)
 
 
 def tan(x):
-    """Define tan for Dfloat, else use math.tan."""
+    """Define tan for Dfloat and DualArray, else use x.tan() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.tan(x.x), x.dx * (1 + (math.tan(x.x))**2))
+    elif isinstance(x, DualArray):
+        return np.tan(x)
+    elif hasattr(x, "tan"):
+        return x.tan()
     else:
         return math.tan(x)
 
 
 def exp(x):
-    """Define exp for Dfloat, else use math.exp."""
+    """Define exp for Dfloat and DualArray, else use x.exp() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.exp(x.x), x.dx * math.exp(x.x))
+    elif isinstance(x, DualArray):
+        return np.exp(x)
+    elif hasattr(x, "exp"):
+        return x.exp()
     else:
         return math.exp(x)
 
 
 def log(x):
-    """Define log for Dfloat, else use math.log."""
+    """Define log for Dfloat and DualArray, else use x.log() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.log(x.x), x.dx / x.x)
+    elif isinstance(x, DualArray):
+        return np.log(x)
+    elif hasattr(x, "log"):
+        return x.log()
     else:
         return math.log(x)
 
 
 def sinh(x):
-    """Define sinh for Dfloat, else use math.sinh."""
+    """Define sinh for Dfloat and DualArray, else use x.sinh() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.sinh(x.x), x.dx * math.cosh(x.x))
+    elif isinstance(x, DualArray):
+        return np.sinh(x)
+    elif hasattr(x, "sinh"):
+        return x.sinh()
     else:
         return math.sinh(x)
 
 
 def cosh(x):
-    """Define cosh for Dfloat, else use math.cosh."""
+    """Define cosh for Dfloat and DualArray, else use x.cosh() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.cosh(x.x), x.dx * math.sinh(x.x))
+    elif isinstance(x, DualArray):
+        return np.cosh(x)
+    elif hasattr(x, "cosh"):
+        return x.cosh()
     else:
         return math.cosh(x)
 
 
 def tanh(x):
-    """Define tanh for Dfloat, else use math.tanh."""
+    """Define tanh for Dfloat and DualArray, else use x.tanh() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.tanh(x.x), x.dx / (math.cosh(x.x))**2)
+    elif isinstance(x, DualArray):
+        return np.tanh(x)
+    elif hasattr(x, "tanh"):
+        return x.tanh()
     else:
         return math.tanh(x)
 
 
 def asin(x):
-    """Define asin for Dfloat, else use math.asin."""
+    """Define asin for Dfloat and DualArray, else use x.asin() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.asin(x.x), x.dx / math.sqrt(1 - (x.x**2)))
+    elif isinstance(x, DualArray):
+        return np.arcsin(x)
+    elif hasattr(x, "asin"):
+        return x.asin()
     else:
         return math.asin(x)
 
 
 def acos(x):
-    """Define acos for Dfloat, else use math.acos."""
+    """Define acos for Dfloat and DualArray, else use x.acos() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.acos(x.x), - x.dx / math.sqrt(1 - (x.x**2)))
+    elif isinstance(x, DualArray):
+        return np.arccos(x)
+    elif hasattr(x, "acos"):
+        return x.acos()
     else:
         return math.acos(x)
 
 
 def atan(x):
-    """Define atan for Dfloat, else use math.atan."""
+    """Define atan for Dfloat and DualArray, else use x.atan() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.atan(x.x), x.dx / (1 + (x.x**2)))
+    elif isinstance(x, DualArray):
+        return np.arctan(x)
+    elif hasattr(x, "atan"):
+        return x.atan()
     else:
         return math.atan(x)
 
 
 def asinh(x):
-    """Define asinh for Dfloat, else use math.asinh."""
+    """Define asinh for Dfloat and DualArray, else use x.asinh() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.asinh(x.x), x.dx / math.sqrt(1 + (x.x**2)))
+    elif isinstance(x, DualArray):
+        return np.arcsinh(x)
+    elif hasattr(x, "asinh"):
+        return x.asinh()
     else:
         return math.asinh(x)
 
 
 def acosh(x):
-    """Define acosh for Dfloat, else use math.acosh."""
+    """Define acosh for Dfloat and DualArray, else use x.acosh() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.acosh(x.x),
                       x.dx / (math.sqrt(x.x - 1) * math.sqrt(x.x + 1)))
+    elif isinstance(x, DualArray):
+        return np.arccosh(x)
+    elif hasattr(x, "acosh"):
+        return x.acosh()
     else:
         return math.acosh(x)
 
 
 def atanh(x):
-    """Define atanh for Dfloat, else use math.atanh."""
+    """Define atanh for Dfloat and DualArray, else use x.atanh() or math."""
     if isinstance(x, Dfloat):
         return Dfloat(math.atanh(x.x), x.dx / (1 - (x.x**2)))
+    elif isinstance(x, DualArray):
+        return np.arctanh(x)
+    elif hasattr(x, "atanh"):
+        return x.atanh()
     else:
         return math.atanh(x)
+
+
+def _split(x):
+    """Return the value and tangent of a Dfloat or a passive number."""
+    if isinstance(x, Dfloat):
+        return x.x, x.dx
+    return x, 0
+
+
+def _products_of_others(xs):
+    """Return, for each of xs, the product of all the others."""
+    others = [1] * len(xs)
+    left = 1
+    for i, x in enumerate(xs):
+        others[i] = left
+        left = left * x
+    right = 1
+    for i in range(len(xs) - 1, -1, -1):
+        others[i] = others[i] * right
+        right = right * xs[i]
+    return others
+
+
+def fsum(xs):
+    """Define a fused sum of xs for Dfloat, else use math.fsum or sum."""
+    xs = list(xs)
+    if any(isinstance(x, Dfloat) for x in xs):
+        vals, dxs = zip(*[_split(x) for x in xs])
+        return Dfloat(math.fsum(vals), sum(dxs))
+    elif all(isinstance(x, Number) for x in xs):
+        return math.fsum(xs)
+    else:
+        return sum(xs)
+
+
+def prod(xs):
+    """Define a fused product of xs for Dfloat, else multiply in turn."""
+    xs = list(xs)
+    if any(isinstance(x, Dfloat) for x in xs):
+        vals, dxs = zip(*[_split(x) for x in xs])
+        others = _products_of_others(vals)
+        return Dfloat(math.prod(vals),
+                      sum(dx * p for dx, p in zip(dxs, others)))
+    result = 1
+    for x in xs:
+        result = result * x
+    return result
+
+
+def dot(xs, ys):
+    """Define a fused dot product of xs and ys for Dfloat, else sum them."""
+    xs, ys = list(xs), list(ys)
+    if len(xs) != len(ys):
+        raise ValueError("dot needs sequences of the same length")
+    if any(isinstance(x, Dfloat) for x in xs + ys):
+        xs, dxs = zip(*[_split(x) for x in xs])
+        ys, dys = zip(*[_split(y) for y in ys])
+        return Dfloat(math.fsum(x * y for x, y in zip(xs, ys)),
+                      sum(dx * y + x * dy
+                          for x, dx, y, dy in zip(xs, dxs, ys, dys)))
+    elif all(isinstance(x, Number) for x in xs + ys):
+        return math.fsum(x * y for x, y in zip(xs, ys))
+    else:
+        return sum(x * y for x, y in zip(xs, ys))
+
+
+def polyval(p, x):
+    """Define a fused polynomial evaluation for Dfloat, else use Horner.
+
+    p holds the coefficients from the highest power down, as in
+    numpy.polyval.
+    """
+    p = list(p)
+    if isinstance(x, Dfloat) or any(isinstance(c, Dfloat) for c in p):
+        x, dx = _split(x)
+        result = slope = tangent = 0
+        for c in p:
+            c, dc = _split(c)
+            slope = slope * x + result
+            tangent = tangent * x + dc
+            result = result * x + c
+        return Dfloat(result, slope * dx + tangent)
+    result = 0
+    for c in p:
+        result = result * x + c
+    return result
@@ -0,0 +1,271 @@
+"""Higher-order forward propagation with truncated Taylor series."""
+import math
+from functools import wraps
+from numbers import Number
+
+from .tangent_linear import exp, log
+
+
+def deal_with_other_types(meth):
+    """Cast the second argument of a method to TaylorFloat when needed."""
+    @wraps(meth)
+    def fn(self, other):
+        if not isinstance(other, TaylorFloat):
+            if isinstance(other, Number):
+                other = self.constant(other)
+            else:
+                raise TypeError(
+                    (f"Can only operate on a TaylorFloat or a Number, "
+                     f"not a {type(other).__name__}"))
+        return meth(self, other)
+    return fn
+
+
+def _integrate(r, a, u, sign=1):
+    """Fill in r, where r' = sign * a' / u, from its constant term.
+
+    This is the recurrence shared by the inverse functions: k r_k u_0 is
+    sign * k a_k less the terms of (r' u) already known.
+    """
+    for k in range(1, len(a)):
+        s = sign * k * a[k] - sum(j * r[j] * u[k - j] for j in range(1, k))
+        r.append(s / (k * u[0]))
+    return r
+
+
+class TaylorFloat:
+    """Implement forward propagation of truncated Taylor series.
+
+    c holds the Taylor coefficients of a value along a line, so c[k] is its
+    k-th derivative divided by k!. Every rule is the usual recurrence on
+    coefficients, so each operation costs O(d^2) at order d rather than the
+    O(2^d) of nesting Dfloats.
+    """
+
+    def __init__(self, c):
+        """Initialise TaylorFloat."""
+        self.c = list(c)
+
+    def __repr__(self):
+        """Representation of TaylorFloat."""
+        return self.__class__.__name__ + "(" + str(self.c) + ")"
+
+    @property
+    def order(self):
+        """Return the highest order of the coefficients held."""
+        return len(self.c) - 1
+
+    def constant(self, x):
+        """Return the number x as a TaylorFloat of the same order."""
+        return type(self)([x] + [0.] * self.order)
+
+    def derivatives(self):
+        """Return the derivatives of order 0 to the order held."""
+        return [math.factorial(k) * c for k, c in enumerate(self.c)]
+
+    @deal_with_other_types
+    def __add__(self, other):
+        """Implement addition."""
+        return type(self)([a + b for a, b in zip(self.c, other.c)])
+
+    @deal_with_other_types
+    def __radd__(self, other):
+        """Reverse addition."""
+        return self + other
+
+    @deal_with_other_types
+    def __sub__(self, other):
+        """Implement subtraction."""
+        return type(self)([a - b for a, b in zip(self.c, other.c)])
+
+    @deal_with_other_types
+    def __rsub__(self, other):
+        """Reverse subtraction."""
+        return other - self
+
+    def __neg__(self):
+        """Implement negation."""
+        return type(self)([-a for a in self.c])
+
+    @deal_with_other_types
+    def __mul__(self, other):
+        """Implement multiplication."""
+        a, b = self.c, other.c
+        return type(self)([sum(a[j] * b[k - j] for j in range(k + 1))
+                           for k in range(min(len(a), len(b)))])
+
+    @deal_with_other_types
+    def __rmul__(self, other):
+        """Reverse multiplication."""
+        return self * other
+
+    @deal_with_other_types
+    def __truediv__(self, other):
+        """Implement division."""
+        a, b = self.c, other.c
+        q = []
+        for k in range(min(len(a), len(b))):
+            q.append((a[k] - sum(q[j] * b[k - j] for j in range(k))) / b[0])
+        return type(self)(q)
+
+    @deal_with_other_types
+    def __rtruediv__(self, other):
+        """Reverse division."""
+        return other / self
+
+    @deal_with_other_types
+    def __pow__(self, other):
+        """Implement exponentiation.
+
+        A constant exponent uses the power recurrence, or repeated squaring
+        for a whole power of a series about zero; otherwise x ** y is
+        exp(y * log(x)).
+        """
+        if any(other.c[1:]):
+            return exp(other * log(self))
+        a, p = self.c, other.c[0]
+        if a[0] == 0 and p == int(p) and p >= 0:
+            result, base, p = self.constant(1.), self, int(p)
+            while p:
+                if p & 1:
+                    result = result * base
+                base, p = base * base, p >> 1
+            return result
+        r = [a[0] ** p]
+        for k in range(1, len(a)):
+            r.append(sum((p * j - (k - j)) * a[j] * r[k - j]
+                         for j in range(1, k + 1)) / (k * a[0]))
+        return type(self)(r)
+
+    @deal_with_other_types
+    def __rpow__(self, other):
+        """Reverse exponentiation."""
+        return other ** self
+
+    @deal_with_other_types
+    def __lt__(self, other):
+        """Implement less than on the constant terms."""
+        return self.c[0] < other.c[0]
+
+    @deal_with_other_types
+    def __le__(self, other):
+        """Implement less than or equal on the constant terms."""
+        return self.c[0] <= other.c[0]
+
+    @deal_with_other_types
+    def __gt__(self, other):
+        """Implement greater than on the constant terms."""
+        return self.c[0] > other.c[0]
+
+    @deal_with_other_types
+    def __ge__(self, other):
+        """Implement greater than or equal on the constant terms."""
+        return self.c[0] >= other.c[0]
+
+    def _sincos(self, s, c, sign):
+        """Return sin and cos, or sinh and cosh for sign 1.
+
+        s and c are the constant terms; s' = c a' and c' = sign s a'.
+        """
+        a = self.c
+        s, c = [s], [c]
+        for k in range(1, len(a)):
+            s.append(sum(j * a[j] * c[k - j] for j in range(1, k + 1)) / k)
+            c.append(sign * sum(j * a[j] * s[k - j]
+                                for j in range(1, k + 1)) / k)
+        return type(self)(s), type(self)(c)
+
+    def _tan(self, r, sign):
+        """Return tan, or tanh for sign -1, from its constant term r."""
+        a = self.c
+        r, v = [r], [1 + sign * r * r]
+        for k in range(1, len(a)):
+            r.append(sum(j * a[j] * v[k - j] for j in range(1, k + 1)) / k)
+            v.append(sign * sum(r[j] * r[k - j] for j in range(k + 1)))
+        return type(self)(r)
+
+    def sqrt(self):
+        """Implement sqrt."""
+        a = self.c
+        r = [math.sqrt(a[0])]
+        for k in range(1, len(a)):
+            r.append((a[k] - sum(r[j] * r[k - j] for j in range(1, k))) /
+                     (2 * r[0]))
+        return type(self)(r)
+
+    def sin(self):
+        """Implement sin."""
+        return self._sincos(math.sin(self.c[0]), math.cos(self.c[0]), -1)[0]
+
+    def cos(self):
+        """Implement cos."""
+        return self._sincos(math.sin(self.c[0]), math.cos(self.c[0]), -1)[1]
+
+    def tan(self):
+        """Implement tan."""
+        return self._tan(math.tan(self.c[0]), 1)
+
+    def exp(self):
+        """Implement exp."""
+        a = self.c
+        r = [math.exp(a[0])]
+        for k in range(1, len(a)):
+            r.append(sum(j * a[j] * r[k - j] for j in range(1, k + 1)) / k)
+        return type(self)(r)
+
+    def log(self):
+        """Implement log."""
+        a = self.c
+        r = [math.log(a[0])]
+        for k in range(1, len(a)):
+            r.append((a[k] - sum(j * r[j] * a[k - j]
+                                 for j in range(1, k)) / k) / a[0])
+        return type(self)(r)
+
+    def sinh(self):
+        """Implement sinh."""
+        return self._sincos(math.sinh(self.c[0]), math.cosh(self.c[0]), 1)[0]
+
+    def cosh(self):
+        """Implement cosh."""
+        return self._sincos(math.sinh(self.c[0]), math.cosh(self.c[0]), 1)[1]
+
+    def tanh(self):
+        """Implement tanh."""
+        return self._tan(math.tanh(self.c[0]), -1)
+
+    def asin(self):
+        """Implement asin, whose derivative is 1 / sqrt(1 - x ** 2)."""
+        u = (1 - self * self).sqrt()
+        return type(self)(_integrate([math.asin(self.c[0])], self.c, u.c))
+
+    def acos(self):
+        """Implement acos, whose derivative is -1 / sqrt(1 - x ** 2)."""
+        u = (1 - self * self).sqrt()
+        return type(self)(_integrate([math.acos(self.c[0])], self.c, u.c,
+                                     -1))
+
+    def atan(self):
+        """Implement atan, whose derivative is 1 / (1 + x ** 2)."""
+        u = 1 + self * self
+        return type(self)(_integrate([math.atan(self.c[0])], self.c, u.c))
+
+    def asinh(self):
+        """Implement asinh, whose derivative is 1 / sqrt(1 + x ** 2)."""
+        u = (1 + self * self).sqrt()
+        return type(self)(_integrate([math.asinh(self.c[0])], self.c, u.c))
+
+    def acosh(self):
+        """Implement acosh, whose derivative is 1 / sqrt(x ** 2 - 1)."""
+        u = (self * self - 1).sqrt()
+        return type(self)(_integrate([math.acosh(self.c[0])], self.c, u.c))
+
+    def atanh(self):
+        """Implement atanh, whose derivative is 1 / (1 - x ** 2)."""
+        u = 1 - self * self
+        return type(self)(_integrate([math.atanh(self.c[0])], self.c, u.c))
+
+
+def taylor(x, order):
+    """Return x as an independent variable carrying order coefficients."""
+    return TaylorFloat(([x, 1.] + [0.] * (order - 1))[:order + 1])
@@ -1,7 +1,7 @@
 """Pytests for AdjFloat and other adjoint methods."""
 from back_propagation import (AdjFloat, sin, cos, tan, exp, log, # noqa F401
                               sinh, cosh, tanh, asin, acos, atan, # noqa F401
-                              asinh, acosh, atanh, clear_tape) # noqa F401
+                              asinh, acosh, atanh, clear_tape, Tape) # noqa F401
 import pytest
 import math
 from numpy import allclose
@@ -166,3 +166,19 @@ def test_inv(f9, y9):
     """Test arcsin, arccos, arctan, arsinh, arcosh and artanh on AdjFloat."""
     clear_tape()
     assert allclose(f9, y9)
+
+
+def test_passive_values():
+    """Test that passive operations return floats and tape nothing."""
+    with Tape() as tape:
+        c = sin(3.0) * 2 + exp(1)
+        assert type(c) is float and len(tape) == 0
+        x = AdjFloat(0.5, 0)
+        y = (c - x) / 4 + 2 ** x - 3 / x + x ** 2
+        assert len(tape) == 8
+        assert all(isinstance(o, (AdjFloat, float, int))
+                   for block in tape for o in block.ops)
+        assert sum(isinstance(o, AdjFloat) for block in tape
+                   for o in block.ops) == 11
+        expected = -1 / 4 + math.log(2) * 2 ** 0.5 + 3 / 0.25 + 1
+        assert allclose(y.derivative(x), expected)
@@ -0,0 +1,71 @@
+"""Pytests for AdjArray."""
+from back_propagation import (AdjFloat, AdjArray, Tape, sin, cos, tan, # noqa F401
+                              exp, log, sinh, cosh, tanh, asin, acos, # noqa F401
+                              atan, asinh, acosh, atanh) # noqa F401
+import numpy as np
+import pytest
+from numpy import allclose
+
+a = np.array([0.2, 0.4, 0.6, 0.8])
+b = np.array([1.5, 2.0, 2.5, 3.0])
+
+
+def elementwise(f, *arrays):
+    """Differentiate f one element at a time with AdjFloat."""
+    grads = []
+    for vals in zip(*arrays):
+        with Tape():
+            xs = [AdjFloat(v, 0) for v in vals]
+            grads.append(f(*xs).derivative(*xs))
+    return tuple(np.array(g) for g in zip(*grads))
+
+
+def test_type_error():
+    """Test for type error."""
+    with pytest.raises(TypeError):
+        AdjArray(a, 0) + "frog"
+
+
+@pytest.mark.parametrize(
+    "f", (
+        lambda x, y: x + y * 2 - 1,
+        lambda x, y: 3 / x - y / (x * 4),
+        lambda x, y: (x + y) ** (y - 1) + 2 ** x + x ** 3,
+        lambda x, y: sin(x * y) + cos(x / y) + tan(x - y),
+        lambda x, y: exp(x * y) * log(sin(x)),
+        lambda x, y: sinh(x) * cosh(y) / tanh(x * y),
+        lambda x, y: asin(x) + acos(x / y) + atan(y),
+        lambda x, y: asinh(x) * acosh(y) + atanh(x / 2)
+    )
+)
+def test_matches_adjfloat(f):
+    """Test that AdjArray reproduces elementwise AdjFloat derivatives."""
+    with Tape() as tape:
+        x, y = AdjArray(a, 0), AdjArray(b, 0)
+        dx, dy = f(x, y).sum().derivative(x, y)
+    assert allclose((dx, dy), elementwise(f, a, b))
+    assert len(tape) < 20
+
+
+def test_broadcasting():
+    """Test broadcasting against scalars, rows and AdjFloats."""
+    with Tape():
+        x = AdjArray(np.arange(6.0).reshape(2, 3), 0)
+        row = AdjArray([1.0, 2.0, 3.0], 0)
+        s = AdjFloat(2.0, 0)
+        y = (x * row + s * x + np.ones(3)).sum()
+        dx, drow, ds = y.derivative(x, row, s)
+    assert allclose(dx, np.array([[3, 4, 5], [3, 4, 5]]))
+    assert allclose(drow, [3, 5, 7])
+    assert allclose(ds, 15)
+
+
+def test_one_block_per_operation():
+    """Test that the tape length does not depend on the array size."""
+    with Tape() as tape:
+        x = AdjArray(np.linspace(0.1, 0.9, 10 ** 5), 0)
+        y = exp(sin(x) * x).sum()
+        assert len(tape) == 4
+        dx, = y.derivative(x)
+    v = np.linspace(0.1, 0.9, 10 ** 5)
+    assert allclose(dx, np.exp(np.sin(v) * v) * (np.cos(v) * v + np.sin(v)))
@@ -0,0 +1,33 @@
+"""Pytests for gradients at many points."""
+from drivers import gradient_many, grad
+from forward_propagation import sin, exp
+import numpy as np
+import pytest
+from numpy import allclose
+
+
+def branchy(x, y):
+    """Evaluate a function whose branch depends on the point."""
+    if x < y:
+        return sin(x) * y
+    return exp(x - y) + x * y
+
+
+def square(x):
+    """Evaluate a function of one input."""
+    return x * x
+
+
+@pytest.mark.parametrize("workers", (1, 2, 3))
+def test_gradient_many(workers):
+    """Test gradients at many points against one at a time."""
+    points = np.random.default_rng(0).uniform(-1, 1, (50, 2))
+    grads = gradient_many(branchy, points, workers=workers)
+    assert grads.shape == (50, 2)
+    assert allclose(grads, [grad(branchy)(*p) for p in points])
+
+
+def test_one_input():
+    """Test a flat array of points of a function of one input."""
+    assert allclose(gradient_many(square, [1, 2, 3], workers=2),
+                    [[2], [4], [6]])
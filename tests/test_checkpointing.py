@@ -0,0 +1,62 @@
+"""Pytests for binomial checkpointing."""
+from back_propagation import AdjFloat, Tape, Revolve, recomputations
+from back_propagation.checkpointing import split
+from forward_propagation import sin, cos, exp
+from functools import lru_cache
+import pytest
+from numpy import allclose
+
+
+def step(state):
+    """Advance a damped nonlinear oscillator by one explicit Euler step."""
+    x, v, k = state
+    return [x + 0.1 * v, v - 0.1 * (k * sin(x) + 0.2 * v), k]
+
+
+def objective(state):
+    """Measure the final state."""
+    return state[0] ** 2 + exp(cos(state[1]))
+
+
+def taped_gradient(state, steps):
+    """Differentiate the loop by keeping every step on one tape."""
+    with Tape() as tape:
+        inputs = [AdjFloat(s, 0) for s in state]
+        state = inputs
+        for _ in range(steps):
+            state = step(state)
+        y = objective(state)
+    return y.val, tape.derivative(y, *inputs)
+
+
+@lru_cache(maxsize=None)
+def cheapest(steps, snaps):
+    """Return the fewest recomputations by searching every split."""
+    if steps <= 1:
+        return 0
+    if snaps == 0:
+        return steps * (steps - 1) // 2
+    return min(m + cheapest(steps - m, snaps - 1) + cheapest(m, snaps)
+               for m in range(1, steps))
+
+
+@pytest.mark.parametrize("steps, snaps", ((0, 2), (1, 0), (7, 0), (30, 2),
+                                          (50, 3), (100, 5)))
+def test_gradient(steps, snaps):
+    """Test the checkpointed gradient against the fully taped one."""
+    revolve = Revolve(step, snaps)
+    value, gradient = revolve.gradient((0.3, 0.1, 2.0), steps, objective)
+    expected = taped_gradient((0.3, 0.1, 2.0), steps)
+    assert allclose(value, expected[0])
+    assert allclose(gradient, expected[1])
+    assert revolve.peak <= snaps
+    assert revolve.taped == steps
+    assert revolve.advances == recomputations(steps, snaps)
+
+
+@pytest.mark.parametrize("snaps", (1, 2, 3, 4))
+def test_schedule_is_optimal(snaps):
+    """Test that the binomial split needs the fewest recomputations."""
+    for steps in range(2, 80):
+        assert 1 <= split(steps, snaps) < steps
+        assert recomputations(steps, snaps) == cheapest(steps, snaps)
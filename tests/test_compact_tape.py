@@ -0,0 +1,66 @@
+"""Pytests for CompactTape and CompactFloat."""
+from back_propagation import (AdjFloat, CompactTape, CompactFloat, sin, # noqa F401
+                              cos, tan, exp, log, sinh, cosh, tanh, asin, # noqa F401
+                              acos, atan, asinh, acosh, atanh) # noqa F401
+import math
+import pytest
+from numpy import allclose
+
+
+def both(f, *vals):
+    """Differentiate f with AdjFloat and with CompactFloat."""
+    xs = [AdjFloat(v, 0) for v in vals]
+    expected = f(*xs).derivative(*xs)
+    tape = CompactTape()
+    ys = [CompactFloat(v, tape) for v in vals]
+    return f(*ys).derivative(*ys), expected
+
+
+def test_type_error():
+    """Test for type error."""
+    with pytest.raises(TypeError):
+        CompactFloat(1, CompactTape()) + "frog"
+
+
+def test_two_tapes():
+    """Test that handles from different tapes cannot be combined."""
+    with pytest.raises(ValueError):
+        CompactFloat(1, CompactTape()) + CompactFloat(2, CompactTape())
+
+
+@pytest.mark.parametrize(
+    "f, vals", (
+        (lambda x, y: x + y * 2 - 1, (2, 3)),
+        (lambda x, y: 3 / x - y / (x * 4), (2, 3)),
+        (lambda x, y: (x + y) ** (y - 1) + 2 ** x + x ** 3, (2, 3)),
+        (lambda x, y: sin(x * y) + cos(x / y) + tan(x - y), (2, 3)),
+        (lambda x, y: exp(x * y) * log(sin(x)), (2, 3)),
+        (lambda x, y: sinh(x) * cosh(y) / tanh(x * y), (0.5, 1.5)),
+        (lambda x, y: asin(x) + acos(x * y) + atan(y), (0.5, 0.25)),
+        (lambda x, y: asinh(x) * acosh(y + 1) + atanh(x / 2), (0.5, 1.5)),
+        (lambda x, y: x * x * x, (-2, 0))
+    )
+)
+def test_matches_adjfloat(f, vals):
+    """Test that the compact tape reproduces the AdjFloat derivatives."""
+    compact, expected = both(f, *vals)
+    assert allclose(compact, expected)
+
+
+def test_handles():
+    """Test values and adjoints read back through handles."""
+    tape = CompactTape()
+    x = CompactFloat(2, tape)
+    y = exp(x) * 3
+    assert allclose((y.val, y.derivative(x)[0], x.adj),
+                    (3 * math.exp(2), 3 * math.exp(2), 3 * math.exp(2)))
+    assert len(tape) == 4
+    assert tape.nbytes == 4 * 25 + 8 * 4
+
+
+def test_clear():
+    """Test that clear empties the tape."""
+    tape = CompactTape()
+    CompactFloat(1, tape) + 1
+    tape.clear()
+    assert len(tape) == 0 and tape.nbytes == 0
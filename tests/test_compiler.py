@@ -0,0 +1,75 @@
+"""Pytests for compiling tapes to Python source."""
+from back_propagation import (AdjFloat, Tape, RetraceError, compile_tape, # noqa F401
+                              sin, cos, tan, exp, log, sinh, cosh, tanh, # noqa F401
+                              asin, acos, atan, asinh, acosh, atanh) # noqa F401
+import pytest
+from numpy import allclose
+
+
+def record(f, *vals):
+    """Record f at vals and return the tape, inputs and output."""
+    with Tape() as tape:
+        xs = [AdjFloat(v, 0) for v in vals]
+        y = f(*xs)
+    return tape, xs, y
+
+
+functions = (
+    lambda x, y: x + y * 2 - 1,
+    lambda x, y: 3 / x - y / (x * 4),
+    lambda x, y: (x + y) ** (y - 1) + 2 ** x + x ** 3,
+    lambda x, y: sin(x * y) + cos(x / y) + tan(x - y),
+    lambda x, y: exp(x * y) * log(sin(x)),
+    lambda x, y: sinh(x) * cosh(y) / tanh(x * y),
+    lambda x, y: asin(x) + acos(x / y) + atan(y),
+    lambda x, y: asinh(x) * acosh(y) + atanh(x / 2),
+    lambda x, y: x,
+    lambda x, y: x * x * 0 + 5
+)
+
+
+@pytest.mark.parametrize("f", functions)
+def test_matches_derivative(f):
+    """Test the compiled function against derivative() at a new point."""
+    compiled = compile_tape(*record(f, 0.3, 1.7))
+    tape, xs, y = record(f, 0.6, 1.2)
+    value, gradient = compiled(0.6, 1.2)
+    assert allclose(value, y.val if isinstance(y, AdjFloat) else y)
+    assert allclose(gradient, tape.derivative(y, *xs))
+
+
+def test_cache():
+    """Test that recordings with the same structure share a function."""
+    f = functions[4]
+    first = compile_tape(*record(f, 0.3, 1.7))
+    second = compile_tape(*record(f, 0.9, 2.0))
+    assert first.function is second.function
+    assert "sin(v" in first.source
+
+
+def test_guards():
+    """Test that compiled guards detect a changed branch."""
+    compiled = compile_tape(*record(lambda x, y: x * y if x < y else x - y,
+                                    1, 2))
+    assert allclose(compiled(2, 3)[1], (3, 2))
+    with pytest.raises(RetraceError):
+        compiled(3, 2)
+
+
+def test_uncompilable():
+    """Test for type error on Blocks without a template."""
+    from back_propagation import AdjArray
+    with Tape() as tape:
+        x = AdjArray([1.0, 2.0], 0)
+        y = (x * x).sum()
+    with pytest.raises(TypeError):
+        compile_tape(tape, [x], y)
+
+
+def test_negative_base():
+    """Test that a power of a negative base compiles like the sweep."""
+    tape, xs, y = record(lambda x, y: x ** y, -2.0, 3.0)
+    value, gradient = compile_tape(tape, xs, y)(-2.0, 3.0)
+    assert allclose(value, y.val)
+    assert allclose(gradient, tape.derivative(y, *xs))
+    assert allclose(gradient, (12.0, 0))
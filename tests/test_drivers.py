@@ -0,0 +1,114 @@
+"""Pytests for the grad, jacobian, jvp, vjp and hvp drivers."""
+from drivers import grad, jacobian, jvp, vjp, hvp, choose_mode
+from forward_propagation import sin, cos, exp, log
+import math
+import pytest
+from numpy import allclose
+
+
+def scalar(x, y, z):
+    """Evaluate a scalar function of three inputs."""
+    return x * y + sin(z) * exp(x) - log(y)
+
+
+def vector(x):
+    """Evaluate a function of one input with three outputs."""
+    return (x ** 2, cos(x), 3)
+
+
+def square(x, y):
+    """Evaluate a function of two inputs with two outputs."""
+    return [x * y, x / y]
+
+
+@pytest.mark.parametrize(
+    "n_inputs, n_outputs, mode, expected", (
+        (3, 1, "auto", "reverse"),
+        (1, 3, "auto", "forward"),
+        (2, 2, "auto", "forward"),
+        (3, 1, "forward", "forward")
+    )
+)
+def test_choose_mode(n_inputs, n_outputs, mode, expected):
+    """Test that the cheaper mode is chosen."""
+    assert choose_mode(n_inputs, n_outputs, mode) == expected
+
+
+def test_bad_mode():
+    """Test for value error on an unknown mode."""
+    with pytest.raises(ValueError):
+        grad(scalar, mode="sideways")(1, 2, 3)
+
+
+@pytest.mark.parametrize("mode", ("auto", "forward", "reverse"))
+def test_grad(mode):
+    """Test grad in every mode."""
+    expected = (2 + math.sin(3) * math.exp(1), 1 - 1/2,
+                math.cos(3) * math.exp(1))
+    assert allclose(grad(scalar, mode)(1, 2, 3), expected)
+
+
+@pytest.mark.parametrize("mode", ("auto", "forward", "reverse"))
+def test_jacobian(mode):
+    """Test jacobian in every mode, including a constant output."""
+    assert allclose(jacobian(vector, mode)(2), [[4], [-math.sin(2)], [0]])
+    assert allclose(jacobian(square, mode)(2, 4), [[4, 2], [1/4, -1/8]])
+
+
+def test_jvp_vjp():
+    """Test Jacobian-vector and vector-Jacobian products."""
+    value, tangent = jvp(square, (2, 4), (1, 2))
+    assert allclose(value, (8, 1/2)) and allclose(tangent, (8, 0))
+    value, cotangent = vjp(square, (2, 4), (1, 2))
+    assert allclose(value, (8, 1/2)) and allclose(cotangent, (4.5, 1.75))
+    value, cotangent = vjp(scalar, (1, 2, 3), 2)
+    assert allclose(cotangent, 2 * grad(scalar)(1, 2, 3))
+
+
+def test_vector_sweep():
+    """Test a reverse Jacobian with enough outputs for a vector sweep."""
+    def many(x, y):
+        return [x * y * k + sin(x) for k in range(10)]
+    expected = [[2 * k + math.cos(1), k] for k in range(10)]
+    assert allclose(jacobian(many, "reverse")(1, 2), expected)
+
+
+def rosenbrock(x, y):
+    """Evaluate the Rosenbrock function."""
+    return (1 - x) ** 2 + 100 * (y - x ** 2) ** 2
+
+
+def hessian_rosenbrock(x, y):
+    """Return the Hessian of the Rosenbrock function."""
+    return [[2 - 400 * (y - x ** 2) + 800 * x ** 2, -400 * x],
+            [-400 * x, 200]]
+
+
+def hessian_scalar(x, y, z):
+    """Return the Hessian of scalar."""
+    e = math.exp(x)
+    return [[math.sin(z) * e, 1, math.cos(z) * e],
+            [1, 1 / y ** 2, 0],
+            [math.cos(z) * e, 0, -math.sin(z) * e]]
+
+
+@pytest.mark.parametrize(
+    "f, hessian, xs, v", (
+        (rosenbrock, hessian_rosenbrock, (1.5, 0.5), (1, 0)),
+        (rosenbrock, hessian_rosenbrock, (-0.5, 2), (0.3, -2)),
+        (scalar, hessian_scalar, (0.5, 2, 1), (1, 2, 3))
+    )
+)
+def test_hvp(f, hessian, xs, v):
+    """Test forward-over-reverse Hessian-vector products."""
+    gradient, hv = hvp(f, xs, v)
+    assert allclose(gradient, grad(f)(*xs))
+    assert allclose(hv, [sum(h * w for h, w in zip(row, v))
+                         for row in hessian(*xs)])
+
+
+def test_hvp_branches():
+    """Test that comparisons and negative bases work on nested values."""
+    def f(x, y):
+        return x ** 3 * y if x < y else x * y
+    assert allclose(hvp(f, (-2, 1), (1, 1))[1], [6 * -2 + 12, 12])
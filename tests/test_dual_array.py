@@ -0,0 +1,58 @@
+"""Pytests for DualArray."""
+from forward_propagation import (Dfloat, DualArray, sin, cos, tan, exp, log,
+                                 sinh, cosh, tanh, asin, acos, atan, asinh,
+                                 acosh, atanh)
+import numpy as np
+import pytest
+from numpy import allclose
+
+a = np.linspace(0.1, 0.7, 7)
+b = np.linspace(1.5, 2.5, 7)
+
+
+def pointwise(f, xs, ys):
+    """Evaluate f one point at a time with Dfloat, seeding x."""
+    results = [f(Dfloat(x, 1), Dfloat(y, 0)) for x, y in zip(xs, ys)]
+    return [r.x for r in results], [r.dx for r in results]
+
+
+def test_type_error():
+    """Test for type error."""
+    with pytest.raises(TypeError):
+        DualArray(a, 1) + "frog"
+
+
+@pytest.mark.parametrize(
+    "f", (
+        lambda x, y: x + y * 2 - 1,
+        lambda x, y: 3 / x - y / (x * 4),
+        lambda x, y: (x + y) ** (y - 1) + 2 ** x + x ** 3,
+        lambda x, y: sin(x * y) + cos(x / y) + tan(x - y),
+        lambda x, y: exp(x * y) * log(sin(x)),
+        lambda x, y: sinh(x) * cosh(y) / tanh(x * y),
+        lambda x, y: asin(x) + acos(x / y) + atan(y),
+        lambda x, y: asinh(x) * acosh(y) + atanh(x / 2)
+    )
+)
+def test_matches_dfloat(f):
+    """Test that DualArray matches Dfloat evaluated point by point."""
+    result = f(DualArray(a, 1), DualArray(b, 0))
+    assert allclose((result.x, result.dx), pointwise(f, a, b))
+
+
+def test_numpy_ufuncs():
+    """Test that NumPy ufuncs and reductions propagate tangents."""
+    x = DualArray(a, np.ones_like(a))
+    y = np.sqrt(np.exp(-x) * np.arctan(x)) + np.ones_like(a)
+    expected = pointwise(lambda x, y: (exp(-1 * x) * atan(x)) ** 0.5 + 1,
+                         a, b)
+    assert allclose((y.x, y.dx), expected)
+    total = y.sum()
+    assert allclose((total.x, total.dx), (sum(expected[0]),
+                                          sum(expected[1])))
+
+
+def test_indexing():
+    """Test indexing a DualArray with a scalar tangent."""
+    x = DualArray(a, 2)[1:3]
+    assert allclose((x.x, x.dx), (a[1:3], (2, 2)))
@@ -0,0 +1,106 @@
+"""Pytests for LinearTape."""
+from back_propagation import (AdjArray, AdjFloat, LinearTape, Tape, sin, cos,
+                              tan, exp, log, sinh, cosh, tanh, asin, acos,
+                              atan, asinh, acosh, atanh)
+import gc
+import pytest
+from numpy import allclose
+
+
+def mixed(x, y):
+    """Evaluate a function using every elementary operation."""
+    u = (sin(x) * cos(y) + tan(x / 4) - exp(y / 3) + log(y) ** 2 +
+         sinh(x) * cosh(y) / tanh(y))
+    v = asin(x / 3) + acos(y / 4) + atan(x * y) + asinh(x - y)
+    w = acosh(y + 1) * atanh(x / 5) + (x + 1) ** y - 2 ** x
+    return u * v - w / 3
+
+
+def derivatives(tape_type, f, xs):
+    """Return the value and gradient of f recorded on a tape_type."""
+    with tape_type() as tape:
+        inputs = [AdjFloat(x, 0) for x in xs]
+        y = f(*inputs)
+        return y.val, tape.derivative(y, *inputs)
+
+
+@pytest.mark.parametrize(
+    "f, xs", (
+        (mixed, (0.7, 1.3)),
+        (mixed, (-1.2, 2.5)),
+        (lambda x, y: x * x * y - x / y, (3, -2)),
+        (lambda x, y: (0 - x) ** 3 + y ** x, (2, 0.5))
+    )
+)
+def test_against_blocks(f, xs):
+    """Test that the linearised tape matches the Block tape."""
+    assert allclose(derivatives(LinearTape, f, xs)[1],
+                    derivatives(Tape, f, xs)[1])
+
+
+def test_no_operands_kept():
+    """Test that the tape keeps neither intermediates nor constants alive."""
+    def chain(x):
+        for _ in range(100):
+            x = sin(x * 2 + 1)
+        return x
+    with LinearTape() as tape:
+        x = AdjFloat(0.5, 0)
+        y = chain(x)
+    assert not any(isinstance(o, AdjFloat)
+                   for entry in tape for o in gc.get_referents(entry))
+    assert allclose(tape.derivative(y, x), derivatives(Tape, chain, (0.5,))[1])
+
+
+def test_jacobian_and_seeds():
+    """Test vector adjoints, an input as an output and a constant output."""
+    with LinearTape() as tape:
+        x, y = AdjFloat(0.5, 0), AdjFloat(2.0, 0)
+        outputs = [x * y, sin(x) + y, x, 3]
+        jac = tape.jacobian(outputs, [x, y])
+    assert allclose(jac, [[2, 0.5], [0.8775825618903728, 1], [1, 0],
+                          [0, 0]])
+
+
+def test_start_and_rewind():
+    """Test the start marker and that clearing drops the leaves."""
+    with LinearTape() as tape:
+        x = AdjFloat(2, 0)
+        u = x * x
+        start = tape.position()
+        y = u * 3
+        assert tape.derivative(y, u, x, start=start) == (3, 0)
+        tape.rewind(start)
+        assert len(tape) == 1
+        tape.clear()
+        z = x * 5
+        assert tape.derivative(z, x) == (5,)
+
+
+def test_values_from_other_tapes():
+    """Test operands produced on a Block tape and on another LinearTape."""
+    with Tape():
+        a = AdjFloat(1.5, 0)
+        b = a * a
+    with LinearTape() as first:
+        c = b * 4
+    with LinearTape() as second:
+        d = c * b
+    assert second.derivative(d, b, c) == (c.val, b.val)
+    assert first.derivative(c, b) == (4,)
+
+
+def test_replay():
+    """Test that replaying is refused."""
+    with LinearTape() as tape:
+        AdjFloat(1, 0) * 2
+    with pytest.raises(RuntimeError):
+        tape.replay()
+
+
+def test_arrays_refused():
+    """Test that AdjArray operations cannot be recorded."""
+    with LinearTape():
+        x = AdjArray([1.0, 2.0], 0)
+        with pytest.raises(TypeError, match="ArrayMulBlock on a LinearTape"):
+            x * 2
@@ -0,0 +1,136 @@
+"""Pytests for the tape optimisation passes."""
+from back_propagation import (AdjArray, AdjFloat, Tape, Trace, PASSES,
+                              optimise, sin, exp, log, tanh, preaccumulate,
+                              PreaccumulatedBlock,
+                              eliminate_common_subexpressions)
+import math
+import numpy as np
+import pytest
+from numpy import allclose
+
+
+def wasteful(x, y):
+    """Evaluate a function with constant, repeated and unused work."""
+    k = sin(AdjFloat(2, 0)) * 3
+    u = sin(x) * y + y * sin(x)
+    exp(x) + y
+    if x < y:
+        u = u * k
+    return u + x * 2 + log(y) * 2
+
+
+def record(f, *xs):
+    """Record f at xs, returning the tape, inputs and output."""
+    with Tape() as tape:
+        inputs = [AdjFloat(x, 0) for x in xs]
+        y = f(*inputs)
+    return tape, inputs, y
+
+
+def test_report():
+    """Test the Blocks each pass removes."""
+    tape, inputs, y = record(wasteful, 0.5, 1.5)
+    new, outputs, report = optimise(tape, inputs, [y])
+    assert report == [("fold constants", 16, 14),
+                      ("common subexpressions", 14, 12),
+                      ("dead code", 12, 10)]
+    assert len(new) == 10 and len(tape) == 16
+
+
+@pytest.mark.parametrize("point", ((0.5, 1.5), (0.2, 3.0)))
+def test_derivatives_unchanged(point):
+    """Test values and derivatives of the optimised tape and the original."""
+    tape, inputs, y = record(wasteful, 0.5, 1.5)
+    new, (z,), _ = optimise(tape, inputs, [y])
+    for x, v in zip(inputs, point):
+        x.val = v
+    tape.replay()
+    new.replay()
+    assert allclose(z.val, y.val)
+    assert allclose(new.derivative(z, *inputs), tape.derivative(y, *inputs))
+
+
+def test_passes_in_isolation():
+    """Test each pass on its own and an output that is a constant."""
+    tape, inputs, y = record(lambda x: [x * 1 + 1 * x, sin(AdjFloat(1, 0))],
+                             2.0)
+    for (name, run), expected in zip(PASSES, (3, 3, 4)):
+        new, outputs, report = optimise(tape, inputs, y, ((name, run),))
+        assert len(new) == expected
+        assert allclose(outputs[1].val, y[1].val)
+
+
+def test_trace_with_passes():
+    """Test that Trace replays the optimised tape and retraces on guards."""
+    trace = Trace(wasteful, PASSES)
+    trace(0.5, 1.5)
+    assert len(trace.tape) == trace.report[-1][2] == 10
+    value, gradient = trace.gradient(2.5, 1.5)
+    tape, inputs, y = record(wasteful, 2.5, 1.5)
+    assert trace.recordings == 2
+    assert allclose(value, y.val)
+    assert allclose(gradient, tape.derivative(y, *inputs))
+
+
+def chains(x, y):
+    """Evaluate a function of unary chains and small subgraphs."""
+    u = exp(sin(tanh(x))) * 3 + 1
+    v = sin(x * y) + exp(x) * y
+    if u > v:
+        v = v * 2
+    return u * v + log(y) / 2
+
+
+@pytest.mark.parametrize("point", ((0.5, 1.5), (0.9, 1.5), (1.2, 0.4)))
+def test_preaccumulate(point):
+    """Test derivatives of a preaccumulated tape, after replaying it."""
+    tape, inputs, y = record(chains, 0.5, 1.5)
+    new, (z,), report = optimise(tape, inputs, [y],
+                                 (("preaccumulate", preaccumulate),))
+    assert report == [("preaccumulate", 16, 7)]
+    assert all(len(block.ops) <= 2 for block in new)
+    for x, v in zip(inputs, point):
+        x.val = v
+    tape.replay()
+    new.replay()
+    assert allclose(z.val, y.val)
+    assert allclose(new.derivative(z, *inputs), tape.derivative(y, *inputs))
+
+
+def test_preaccumulate_chain():
+    """Test that a long unary chain becomes one Block."""
+    def chain(x):
+        for _ in range(50):
+            x = exp(sin(tanh(x))) * 0.5 + 0.1
+        return x
+    tape, inputs, y = record(chain, 0.3)
+    new, (z,), _ = optimise(tape, inputs, [y],
+                            PASSES + (("preaccumulate", preaccumulate),))
+    assert len(tape) == 250 and len(new) == 1
+    assert type(new[0]) is PreaccumulatedBlock
+    assert new[0].ops == tuple(inputs)
+    assert allclose(new.derivative(z, *inputs), tape.derivative(y, *inputs))
+
+
+def test_preaccumulate_then_cse():
+    """Test common subexpressions merged inside preaccumulated Blocks."""
+    passes = (("preaccumulate", preaccumulate),
+              ("common subexpressions", eliminate_common_subexpressions))
+    trace = Trace(lambda x, y: exp(sin(x * y)) + exp(sin(x * y)), passes)
+    trace(0.2, 0.3)
+    value, gradient = trace.gradient(1.1, -0.4)
+    slope = 2 * math.exp(math.sin(-0.44)) * math.cos(-0.44)
+    assert allclose(value, 2 * math.exp(math.sin(-0.44)))
+    assert allclose(gradient, (-0.4 * slope, 1.1 * slope))
+
+
+def test_preaccumulate_arrays():
+    """Test that AdjArray Blocks are left out of preaccumulation."""
+    with Tape() as tape:
+        t = AdjFloat(0.4, 0)
+        x = AdjArray(np.arange(3.0), 0)
+        y = (x * exp(sin(t))).sum()
+    new, (z,), report = optimise(tape, [t, x], [y],
+                                 (("preaccumulate", preaccumulate),))
+    assert report == [("preaccumulate", 4, 3)]
+    assert allclose(new.derivative(z, t, x)[0], tape.derivative(y, t, x)[0])
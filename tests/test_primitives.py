@@ -0,0 +1,136 @@
+"""Pytests for user-defined primitives."""
+from back_propagation import (AdjFloat, LinearTape, Primitive, PRIMITIVES,
+                              Tape, Trace, compile_tape, primitive, sin, exp)
+from drivers import hvp
+from forward_propagation import Dfloat, variables
+import forward_propagation as tl
+import math
+import pytest
+from numpy import allclose, interp
+
+
+@primitive(derivative=lambda x, y: (tl.cos(x) * y, tl.sin(x)),
+           compilable=True)
+def wave(x, y):
+    """Return sin(x) * y."""
+    return math.sin(x) * y
+
+
+def _table_vjp(xs, y, adj):
+    (x,) = xs
+    i = min(max(int(x), 0), 3)
+    return ((TABLE[i + 1] - TABLE[i]) * adj,)
+
+
+TABLE = [0.0, 1.0, 4.0, 9.0, 16.0]
+lookup = primitive(lambda x: float(interp(x, range(5), TABLE)),
+                   vjp=_table_vjp, name="lookup")
+softplus = Primitive(lambda x: math.log1p(math.exp(x)),
+                     jvp=lambda xs, dxs: dxs[0] / (1 + math.exp(-xs[0])),
+                     name="softplus")
+
+
+def f(x, y):
+    """Evaluate a function using the primitives."""
+    return wave(x, y) * softplus(y) + lookup(x * 2) + wave(x, 2)
+
+
+def by_hand(x, y):
+    """Evaluate f with the primitives written out."""
+    return (math.sin(x) * y * math.log1p(math.exp(y)) +
+            float(interp(x * 2, range(5), TABLE)) + math.sin(x) * 2)
+
+
+def gradient_by_hand(x, y):
+    """Return the gradient of f."""
+    s = 1 / (1 + math.exp(-y))
+    slope = TABLE[int(x * 2) + 1] - TABLE[int(x * 2)]
+    sp = math.log1p(math.exp(y))
+    return (math.cos(x) * y * sp + 2 * slope + 2 * math.cos(x),
+            math.sin(x) * sp + math.sin(x) * y * s)
+
+
+@pytest.mark.parametrize("tape_type", (Tape, LinearTape))
+@pytest.mark.parametrize("point", ((0.3, 0.7), (1.2, -0.5)))
+def test_adjoint(tape_type, point):
+    """Test that each primitive is one node with the right derivative."""
+    with tape_type() as tape:
+        inputs = [AdjFloat(v, 0) for v in point]
+        y = f(*inputs)
+    assert len(tape) == 8
+    assert allclose(y.val, by_hand(*point))
+    assert allclose(tape.derivative(y, *inputs), gradient_by_hand(*point))
+
+
+@pytest.mark.parametrize("point", ((0.3, 0.7), (1.2, -0.5)))
+def test_tangent_linear(point):
+    """Test the primitives on Dfloats."""
+    y = f(*variables(*point))
+    assert allclose(y.x, by_hand(*point))
+    assert allclose(y.dx, gradient_by_hand(*point))
+    assert f(*point) == by_hand(*point)
+
+
+def test_hvp():
+    """Test forward over reverse with a rule that accepts Dfloats."""
+    def g(x, y):
+        return wave(x, y) * wave(y, x)
+
+    def g_by_hand(x, y):
+        return sin(x) * y * sin(y) * x
+    point, v = (0.4, 1.1), (1.0, -0.5)
+    assert allclose(hvp(g, point, v), hvp(g_by_hand, point, v))
+
+
+def test_replay_and_compile():
+    """Test replaying and compiling a tape holding a primitive."""
+    trace = Trace(lambda x, y: wave(exp(x), y))
+    trace(0.3, 0.7)
+    value, gradient = trace.gradient(0.5, 1.5)
+    assert allclose(value, math.sin(math.exp(0.5)) * 1.5)
+    with Tape() as tape:
+        inputs = [AdjFloat(0.5, 0), AdjFloat(1.5, 0)]
+        y = wave(exp(inputs[0]), inputs[1])
+    compiled = compile_tape(tape, inputs, y)
+    assert allclose(compiled(0.5, 1.5)[1], gradient)
+    assert compiled.source.count("_partials(") == 1
+    with pytest.raises(TypeError):
+        with Tape() as tape:
+            x = AdjFloat(0.5, 0)
+            compile_tape(tape, [x], softplus(x))
+
+
+def test_registry():
+    """Test the registry, the Block types and a primitive with no rule."""
+    assert PRIMITIVES["wave"] is wave and PRIMITIVES["lookup"] is lookup
+    assert wave.block_type.__name__ == "WaveBlock"
+    assert wave.__doc__ == "Return sin(x) * y."
+    with pytest.raises(ValueError):
+        primitive(math.sin)
+    with pytest.raises(ValueError):
+        Primitive(math.sin)
+    with pytest.raises(ValueError, match="already registered"):
+        primitive(math.sin, derivative=math.cos, name="wave")
+    with pytest.raises(ValueError, match="name"):
+        primitive(lambda x: x, derivative=lambda x: 1)
+    with pytest.raises(ValueError, match="derivative"):
+        Primitive(math.exp, jvp=lambda xs, dxs: math.exp(xs[0]) * dxs[0],
+                  compilable=True)
+    assert "<lambda>" not in PRIMITIVES
+
+
+def test_redefine():
+    """Test redefining a primitive, as when a notebook cell runs again."""
+    made = []
+    for power in (3, 4):
+        @primitive(derivative=lambda x, power=power: power * x ** (power - 1))
+        def power_of(x, power=power):
+            """Return a power of x."""
+            return x ** power
+        made.append(power_of)
+    assert PRIMITIVES["power_of"] is made[1] and made[1](2.0) == 16.0
+    with pytest.raises(ValueError, match="already registered"):
+        primitive(math.exp, derivative=math.exp, name="power_of")
+    square = primitive(lambda x: x * x, derivative=lambda x: 2 * x,
+                       name="power_of", override=True)
+    assert PRIMITIVES.pop("power_of") is square
@@ -0,0 +1,90 @@
+"""Pytests for Profiler."""
+from back_propagation import (AdjFloat, LinearTape, Profiler, Tape, sin, exp,
+                              tape_bytes)
+from back_propagation.adjoint import MulBlock
+import threading
+import pytest
+
+
+def f(x, y):
+    """Evaluate a small function."""
+    return sin(x * y) + exp(x) * y
+
+
+def record(tape_type, xs=(0.5, 1.5)):
+    """Record f on a tape_type and return the tape, inputs and output."""
+    with tape_type() as tape:
+        inputs = [AdjFloat(x, 0) for x in xs]
+        y = f(*inputs)
+    return tape, inputs, y
+
+
+@pytest.mark.parametrize("tape_type", (Tape, LinearTape))
+def test_counts(tape_type):
+    """Test that the report counts the Blocks, sweeps and live values."""
+    with Profiler() as profiler:
+        tape, inputs, y = record(tape_type)
+        tape.derivative(y, *inputs)
+    report = profiler.report()
+    assert report["blocks"] == {"MulBlock": 2, "SinBlock": 1,
+                                "ExpBlock": 1, "AddBlock": 1}
+    assert report["nodes"] == 5
+    assert report["sweeps"] == 1
+    assert report["tape_bytes"] == tape_bytes(tape) > 0
+    # A LinearTape keeps no intermediate results alive.
+    assert 3 <= report["peak_live_adjfloats"] <= 7
+    assert 0 < report["sweep_s"] < report["total_s"]
+    assert report["outside_sweep_s"] + report["sweep_s"] == \
+        pytest.approx(report["total_s"])
+    assert report["sweep_s_by_block"] == {}
+
+
+def test_block_times():
+    """Test that time_blocks times the sweep of each Block type."""
+    with Profiler(time_blocks=True) as profiler:
+        tape, inputs, y = record(Tape)
+        tape.derivative(y, *inputs)
+    times = profiler.report()["sweep_s_by_block"]
+    assert set(times) == {"MulBlock", "SinBlock", "ExpBlock", "AddBlock"}
+
+
+def test_live_adjfloats():
+    """Test that the peak of live AdjFloats drops freed values."""
+    with Profiler() as profiler:
+        tape, inputs, y = record(Tape)
+        del tape, inputs, y
+        record(Tape)
+    assert profiler.report()["peak_live_adjfloats"] == 7
+
+
+def test_restored():
+    """Test that exiting restores every wrapped method."""
+    before = (Tape.__dict__["append"], Tape.__dict__["sweep"],
+              LinearTape.__dict__["sweep"], AdjFloat.__init__,
+              MulBlock.__dict__["compute_adjoint"])
+    with Profiler(time_blocks=True):
+        assert Tape.__dict__["append"] is not before[0]
+        with pytest.raises(RuntimeError):
+            with Profiler():
+                pass
+    assert before == (Tape.__dict__["append"], Tape.__dict__["sweep"],
+                      LinearTape.__dict__["sweep"], AdjFloat.__init__,
+                      MulBlock.__dict__["compute_adjoint"])
+    assert not hasattr(AdjFloat, "__del__")
+    with Profiler() as profiler:
+        pass
+    assert profiler.report()["nodes"] == 0
+
+
+def test_other_threads():
+    """Test that tapes recorded by other threads are not counted."""
+    def work():
+        tape, inputs, y = record(Tape)
+        tape.derivative(y, *inputs)
+    with Profiler() as profiler:
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        record(Tape)
+    report = profiler.report()
+    assert report["nodes"] == 5 and report["sweeps"] == 0
@@ -0,0 +1,90 @@
+"""Pytests for the fused n-ary reductions in both modes."""
+import back_propagation as adj
+import forward_propagation as tl
+from back_propagation import AdjFloat, LinearTape, Tape
+from drivers import grad, hvp
+from forward_propagation import Dfloat, variables
+import math
+import pytest
+from numpy import allclose
+
+
+def fused(x, y, z):
+    """Evaluate a function using every fused reduction."""
+    return (adj.fsum([x, y * z, 2, z]) * adj.prod([x, y, 3, z]) +
+            adj.dot([x, y, z], [z, 1.5, x * y]) -
+            adj.polyval([x, -2, y, 0.5], z))
+
+
+def unfused(x, y, z):
+    """Evaluate fused with the builtin operations."""
+    return ((x + y * z + 2 + z) * (x * y * 3 * z) +
+            (x * z + y * 1.5 + z * x * y) -
+            (((x * z - 2) * z + y) * z + 0.5))
+
+
+@pytest.mark.parametrize("tape_type", (Tape, LinearTape))
+@pytest.mark.parametrize("point", ((0.5, 1.5, -0.7), (2.0, 0.0, 1.3)))
+def test_adjoint(tape_type, point):
+    """Test values, gradients and tape length of the fused reductions."""
+    with tape_type() as tape:
+        inputs = [AdjFloat(v, 0) for v in point]
+        y = fused(*inputs)
+    assert len(tape) == 9
+    assert allclose(y.val, unfused(*point))
+    assert allclose(tape.derivative(y, *inputs), grad(unfused)(*point))
+
+
+@pytest.mark.parametrize("point", ((0.5, 1.5, -0.7), (2.0, 0.0, 1.3)))
+def test_tangent_linear(point):
+    """Test the fused reductions on Dfloat against the builtin operations."""
+    def fused_tl(x, y, z):
+        return (tl.fsum([x, y * z, 2, z]) * tl.prod([x, y, 3, z]) +
+                tl.dot([x, y, z], [z, 1.5, x * y]) -
+                tl.polyval([x, -2, y, 0.5], z))
+    y = fused_tl(*variables(*point))
+    expected = unfused(*variables(*point))
+    assert allclose(y.x, expected.x)
+    assert allclose(y.dx, expected.dx)
+
+
+def test_hvp():
+    """Test forward over reverse through the fused Blocks."""
+    point, v = (0.5, 1.5, -0.7), (1.0, -2.0, 0.5)
+    g, hv = hvp(fused, point, v)
+    g0, hv0 = hvp(unfused, point, v)
+    assert allclose(g, g0) and allclose(hv, hv0)
+
+
+def test_passive():
+    """Test reductions of numbers only, which record nothing."""
+    with Tape() as tape:
+        assert adj.fsum([0.1] * 10) == math.fsum([0.1] * 10) == 1.0
+        assert adj.prod([2, 3, 4]) == 24
+        assert adj.dot([1, 2], [3, 4]) == 11
+        assert adj.polyval([1, 0, -1], 3) == 8
+        assert adj.fsum([]) == 0 and adj.prod([]) == 1
+    assert len(tape) == 0
+    y = tl.fsum([Dfloat(1, 1), 2, Dfloat(3, 0.5)])
+    assert allclose((y.x, y.dx), (6, 1.5))
+
+
+def test_replay():
+    """Test that the fused Blocks recompute when replayed."""
+    with Tape() as tape:
+        inputs = [AdjFloat(v, 0) for v in (0.5, 1.5, -0.7)]
+        y = fused(*inputs)
+    for x, v in zip(inputs, (1.1, -0.3, 0.9)):
+        x.val = v
+    tape.replay()
+    assert allclose(y.val, unfused(1.1, -0.3, 0.9))
+    assert allclose(tape.derivative(y, *inputs),
+                    grad(unfused)(1.1, -0.3, 0.9))
+
+
+def test_dot_lengths():
+    """Test that dot refuses sequences of different lengths."""
+    with pytest.raises(ValueError):
+        adj.dot([AdjFloat(1, 0)], [1, 2])
+    with pytest.raises(ValueError):
+        tl.dot([Dfloat(1, 0)], [1, 2])
@@ -0,0 +1,81 @@
+"""Pytests for replaying recorded tapes."""
+from back_propagation import (AdjArray, AdjFloat, Tape, Trace, # noqa F401
+                              RetraceError, sin, exp, log) # noqa F401
+import math
+import numpy as np
+import pytest
+from numpy import allclose
+
+
+def smooth(x, y):
+    """Evaluate a branch-free function."""
+    return sin(x * y) + exp(x) / y - log(y) * 2
+
+
+def branching(x, y):
+    """Evaluate a function that branches on its inputs."""
+    if x > y:
+        return x * x - y
+    return 3 * x + y * y
+
+
+def test_replay_tape():
+    """Test that replaying a tape updates every recorded value."""
+    with Tape() as tape:
+        x = AdjFloat(1.0, 0)
+        y = exp(x * 2) + x
+    x.val = 0.5
+    tape.replay()
+    assert allclose(y.val, math.exp(1) + 0.5)
+    assert allclose(tape.derivative(y, x), 2 * math.exp(1) + 1)
+
+
+def test_replay_arrays():
+    """Test that replaying recomputes AdjArray values."""
+    with Tape() as tape:
+        x = AdjArray([0.5, 1.0], 0)
+        s = AdjFloat(2.0, 0)
+        y = (sin(x) * s).sum()
+    x.val = np.array([1.5, -0.5])
+    s.val = 3.0
+    tape.replay()
+    assert allclose(y.val, 3 * (math.sin(1.5) + math.sin(-0.5)))
+    dx, ds = tape.derivative(y, x, s)
+    assert allclose(dx, 3 * np.cos([1.5, -0.5]))
+    assert allclose(ds, math.sin(1.5) + math.sin(-0.5))
+
+
+def test_guard_failure():
+    """Test that a changed comparison stops the replay."""
+    with Tape() as tape:
+        x = AdjFloat(1.0, 0)
+        assert x < 2
+    x.val = 3.0
+    with pytest.raises(RetraceError):
+        tape.replay()
+
+
+@pytest.mark.parametrize(
+    "point", ((0.5, 1.5), (1.0, 2.0), (-0.3, 0.7), (2.5, 3.5))
+)
+def test_replay_matches_recording(point):
+    """Test values and gradients of a replayed tape against a fresh one."""
+    trace = Trace(smooth)
+    trace(0.1, 0.2)
+    blocks = list(trace.tape)
+    value, gradient = trace.gradient(*point)
+    fresh = Trace(smooth).gradient(*point)
+    assert allclose(value, fresh[0]) and allclose(gradient, fresh[1])
+    assert trace.recordings == 1
+    assert all(a is b for a, b in zip(blocks, trace.tape))
+
+
+def test_retrace_on_branch_change():
+    """Test that Trace records again when a guard fails."""
+    trace = Trace(branching)
+    for point, value, gradient, recordings in (((3, 1), 8, (6, -1), 1),
+                                               ((4, 2), 14, (8, -1), 1),
+                                               ((1, 3), 12, (3, 6), 2)):
+        result = trace.gradient(*point)
+        assert allclose(result[0], value) and allclose(result[1], gradient)
+        assert trace.recordings == recordings
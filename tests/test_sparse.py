@@ -0,0 +1,73 @@
+"""Pytests for sparse Jacobians by column colouring."""
+from drivers import jacobian, sparse_jacobian, sparsity, colour_columns
+from forward_propagation import sin, exp
+import numpy as np
+import pytest
+from numpy import allclose
+
+
+def banded(*x):
+    """Evaluate a nonlinear tridiagonal system."""
+    n = len(x)
+    return [(x[i - 1] if i else 0) - 2 * x[i] + sin(x[i]) +
+            (x[i + 1] * x[i] if i < n - 1 else 0) for i in range(n)]
+
+
+def blocks(*x):
+    """Evaluate independent blocks of two inputs and three outputs."""
+    out = []
+    for i in range(0, len(x), 2):
+        out += [x[i] * x[i + 1], exp(x[i]), x[i + 1] ** 2]
+    return out
+
+
+def dense_columns(x, y, z):
+    """Evaluate a function whose first row is dense."""
+    return [x + y + z, 2 * x, y * z if y < z else z]
+
+
+@pytest.mark.parametrize(
+    "f, xs, colours", (
+        (banded, np.linspace(0, 1, 20), 3),
+        (blocks, np.linspace(-1, 1, 12), 2),
+        (dense_columns, (1., 2., 3.), 3)
+    )
+)
+def test_sparse_jacobian(f, xs, colours):
+    """Test the sparse Jacobian against the dense one."""
+    jac = sparse_jacobian(f)(*xs)
+    assert allclose(jac.toarray(), jacobian(f)(*xs))
+    assert colour_columns(sparsity(f, xs)).max() + 1 == colours
+
+
+def test_pattern():
+    """Test the detected pattern, including passive and constant outputs."""
+    pattern = sparsity(lambda x, y: [x * 2, 3, y + 1 - y, x * y], (1, 2))
+    assert (pattern.toarray() == [[1, 0], [0, 0], [0, 1], [1, 1]]).all()
+
+
+def test_colouring_is_valid():
+    """Test that no two columns sharing a row share a colour."""
+    pattern = sparsity(banded, np.ones(30))
+    colours = colour_columns(pattern)
+    for row in pattern.toarray():
+        used = colours[row]
+        assert len(set(used)) == len(used)
+
+
+def test_reuse():
+    """Test that later calls reuse the colouring at new inputs."""
+    jac = sparse_jacobian(banded)
+    jac(*np.zeros(8))
+    xs = np.linspace(1, 2, 8)
+    assert allclose(jac(*xs).toarray(), jacobian(banded)(*xs))
+
+
+def test_branch_changes_pattern():
+    """Test that a branch taken differently finds the pattern again."""
+    def f(x, y):
+        return [x * y if x < y else x, y]
+    jac = sparse_jacobian(f)
+    assert allclose(jac(3.0, 2.0).toarray(), [[1, 0], [0, 1]])
+    assert allclose(jac(1.0, 2.0).toarray(), [[2, 1], [0, 1]])
+    assert allclose(jac(1.5, 2.0).toarray(), [[2, 1.5], [0, 1]])
@@ -0,0 +1,97 @@
+"""Pytests for SpillingTape."""
+from back_propagation import (AdjArray, AdjFloat, LinearTape, SpillingTape,
+                              Tape, sin, exp, fsum)
+from forward_propagation import Dfloat
+import pytest
+from numpy import allclose
+
+
+def long(x, y):
+    """Evaluate a long calculation of two inputs."""
+    for i in range(200):
+        x, y = sin(x * y) + y / 3, exp(x / 50) * 0.9 + i % 3
+    return fsum([x, y, x * y])
+
+
+def derivatives(tape, f, xs):
+    """Return the tape, inputs, output and gradient of f recorded on it."""
+    with tape:
+        inputs = [AdjFloat(x, 0) for x in xs]
+        y = f(*inputs)
+        return tape, inputs, y, tape.derivative(y, *inputs)
+
+
+@pytest.mark.parametrize("budget", (64, 1000, 1 << 20))
+def test_against_linear_tape(budget, tmp_path):
+    """Test that spilling leaves the records and derivatives unchanged."""
+    tape, _, _, gradient = derivatives(SpillingTape(budget, tmp_path), long,
+                                       (0.3, 0.7))
+    linear, _, _, expected = derivatives(LinearTape(), long, (0.3, 0.7))
+    assert allclose(gradient, expected)
+    assert allclose(gradient, derivatives(Tape(), long, (0.3, 0.7))[3])
+    assert list(tape) == list(linear)
+    assert list(reversed(tape)) == list(reversed(linear))
+    assert [tape[i] for i in range(len(tape))] == list(linear)
+    assert tape[-1] == linear[-1]
+    assert len(tape._ids) == len(tape) - tape._first
+    assert len(tape._segments) == {64: 801, 1000: 57, 1 << 20: 0}[budget]
+
+
+def test_start_jacobian_and_rewind():
+    """Test sweeping part of the tape, vector seeds and rewinding."""
+    with SpillingTape(budget=100) as tape:
+        x, y = AdjFloat(0.5, 0), AdjFloat(2.0, 0)
+        u = sin(x) * y
+        for _ in range(20):
+            u = u * 1.01 + x
+        tape.spill()
+        start = tape.position()
+        v = u * u + y
+        assert allclose(tape.derivative(v, u, x, start=start),
+                        (2 * u.val, 0))
+        jac = tape.jacobian([v, x, 3], [x, y])
+        assert allclose(jac[1:], [[1, 0], [0, 0]])
+        tape.rewind(start)
+        assert len(tape) == start
+        w = u * 2
+        assert tape.derivative(w, u) == (2,)
+        with pytest.raises(RuntimeError):
+            tape.rewind(1)
+        tape.clear()
+        assert len(tape) == 0 and not tape._segments
+        z = x * 5
+        assert tape.derivative(z, x) == (5,)
+
+
+def test_dfloat_values():
+    """Test that partials which are not floats are refused."""
+    with SpillingTape():
+        with pytest.raises(TypeError):
+            sin(AdjFloat(Dfloat(1, 1), 0))
+
+
+def test_arrays_refused():
+    """Test that AdjArray operations cannot be recorded."""
+    with SpillingTape():
+        x = AdjArray([1.0, 2.0], 0)
+        with pytest.raises(TypeError, match="on a SpillingTape"):
+            x * 2
+
+
+def test_spilled_results():
+    """Test differentiating by results whose ids were spilled."""
+    with SpillingTape(budget=64) as tape:
+        x = AdjFloat(0.5, 0)
+        u = sin(x) * 3
+        y = u
+        for _ in range(50):
+            y = y * 1.01 + x
+    assert tape.position_of(u) == 1 and tape._first > 1
+    assert tape.position_of(AdjFloat(0.5, 0)) == -1
+    with LinearTape() as linear:
+        x2 = AdjFloat(0.5, 0)
+        u2 = sin(x2) * 3
+        y2 = u2
+        for _ in range(50):
+            y2 = y2 * 1.01 + x2
+    assert allclose(tape.derivative(y, u, x), linear.derivative(y2, u2, x2))
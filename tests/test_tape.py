@@ -0,0 +1,135 @@
+"""Pytests for Tape and the context-scoped current tape."""
+from back_propagation import AdjFloat, Tape, get_tape, clear_tape, sin
+import asyncio
+import math
+from concurrent.futures import ThreadPoolExecutor
+from numpy import allclose
+
+
+def test_clear_tape():
+    """Test that clear_tape empties the current tape."""
+    with Tape() as tape:
+        x = AdjFloat(2, 0)
+        x * x + 1
+        assert len(tape) == 2
+        clear_tape()
+        assert len(tape) == 0 and list(tape) == []
+
+
+def test_storage_reuse():
+    """Test that a cleared tape reuses its slots and drops its Blocks."""
+    with Tape() as tape:
+        x = AdjFloat(2, 0)
+        for _ in range(10):
+            x = x + 1
+        storage = tape.blocks
+        tape.clear()
+        assert all(b is None for b in storage)
+        y = AdjFloat(1, 0)
+        z = sin(y) * 2
+        assert tape.blocks is storage and len(storage) == 10
+        assert len(tape) == 2
+        assert allclose(z.derivative(y), 2 * math.cos(1))
+
+
+def test_nesting():
+    """Test that with statements restore the previous tape."""
+    outer = get_tape()
+    with Tape() as t1:
+        with Tape() as t2:
+            AdjFloat(1, 0) + 1
+            assert get_tape() is t2
+        assert get_tape() is t1
+        assert len(t1) == 0 and len(t2) == 1
+    assert get_tape() is outer
+
+
+def work(a):
+    """Differentiate a small function on a private tape."""
+    with Tape() as tape:
+        x = AdjFloat(a, 0)
+        y = x
+        for _ in range(100):
+            y = y * x / x
+        y = y * x
+        return len(tape), tape.derivative(y, x)[0]
+
+
+def test_threads():
+    """Test that threads record on independent tapes."""
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(work, range(1, 17)))
+    assert results == [(201, 2 * a) for a in range(1, 17)]
+
+
+def test_tasks():
+    """Test that asyncio tasks record on independent tapes."""
+    async def task(a):
+        with Tape() as tape:
+            x = AdjFloat(a, 0)
+            y = x * x
+            await asyncio.sleep(0)
+            y = y * x
+            await asyncio.sleep(0)
+            return len(tape), y.derivative(x)[0]
+
+    async def main():
+        return await asyncio.gather(*(task(a) for a in range(1, 9)))
+
+    assert asyncio.run(main()) == [(2, 3 * a ** 2) for a in range(1, 9)]
+
+
+def test_rewind():
+    """Test rewinding the tape to a marker."""
+    with Tape() as tape:
+        x = AdjFloat(2, 0)
+        y = x * x
+        mark = tape.position()
+        for _ in range(5):
+            sin(y) * x
+        tape.rewind(mark)
+        assert len(tape) == 1 and tape.blocks[1] is None
+        z = y + 1
+        assert tape.position_of(z) == 1
+        assert allclose(z.derivative(x), 4)
+
+
+def test_start_marker():
+    """Test that values recorded before start are treated as independent."""
+    with Tape() as tape:
+        x = AdjFloat(2, 0)
+        y = x * x
+        mark = tape.position()
+        z = y * 3 + x
+        assert allclose(z.derivative(y, x), (3, 13))
+        assert allclose(z.derivative(y, x, start=mark), (3, 1))
+
+
+def test_only_reachable_blocks():
+    """Test that the sweep skips Blocks that cannot reach the output."""
+    visited = []
+    with Tape() as tape:
+        x = AdjFloat(0.5, 0)
+        y = sin(x) * 2
+        for i in range(10):
+            x * i
+        z = y + x
+        for block in tape:
+            def spy(block=block, compute=block.compute_adjoint):
+                visited.append(block)
+                compute()
+            block.compute_adjoint = spy
+        assert allclose(z.derivative(x), 2 * math.cos(0.5) + 1)
+    assert [type(b).__name__ for b in visited] == ["AddBlock", "MulBlock",
+                                                   "SinBlock"]
+
+
+def test_vector_adjoints():
+    """Test a Jacobian block from one sweep with vector adjoints."""
+    with Tape() as tape:
+        x, y = AdjFloat(0.5, 0), AdjFloat(2.0, 0)
+        u = sin(x * y)
+        outputs = [u * y, u / x + y ** 3, x - y, 4, x]
+        jac = tape.jacobian(outputs, [x, y])
+        rows = [tape.derivative(o, x, y) for o in outputs[:3]]
+    assert allclose(jac, rows + [(0, 0), (1, 0)])
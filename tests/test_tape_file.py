@@ -0,0 +1,49 @@
+"""Pytests for saving tapes and sweeping them from disk."""
+from back_propagation import (AdjFloat, CompactFloat, CompactTape, Tape,
+                              save_tape, load_tape, sin, exp, log, tanh,
+                              acosh, atan)
+import pytest
+from numpy import allclose
+
+
+def f(x, y):
+    """Evaluate a function of two inputs using most rules."""
+    u = sin(x * y) + exp(x / y) - log(y) * tanh(x)
+    return u ** 2 + acosh(y + 1) - atan(x) + y ** x - (x - y) / 3
+
+
+@pytest.mark.parametrize("store_partials", (False, True))
+@pytest.mark.parametrize("chunk", (1, 7, 1 << 16))
+def test_sweep_from_disk(tmp_path, store_partials, chunk):
+    """Test sweeps of a saved Tape against sweeps in memory."""
+    with Tape() as tape:
+        x, y = AdjFloat(0.7, 0), AdjFloat(1.9, 0)
+        z = f(x, y)
+        if x < y:
+            w = z * x
+        expected = [tape.derivative(z, x, y), tape.derivative(w, x, y)]
+    save_tape(tmp_path / "f.tape", tape, [x, y], [z, w, 4, y],
+              store_partials)
+    mapped = load_tape(tmp_path / "f.tape")
+    assert allclose(mapped.value(1), w.val)
+    assert allclose([mapped.sweep(((0, 1.0),), chunk),
+                     mapped.sweep(((1, 1.0),), chunk)], expected)
+    assert allclose(mapped.derivative(2), [0, 0])
+    assert allclose(mapped.derivative(3), [0, 1])
+
+
+def test_compact_tape(tmp_path):
+    """Test saving a CompactTape."""
+    tape = CompactTape()
+    x, y = CompactFloat(0.7, tape), CompactFloat(1.9, tape)
+    z = f(x, y)
+    save_tape(tmp_path / "f.tape", tape, [x, y], [z], True)
+    assert allclose(load_tape(tmp_path / "f.tape").derivative(),
+                    z.derivative(x, y))
+
+
+def test_bad_file(tmp_path):
+    """Test for value error on a file that is not a tape."""
+    (tmp_path / "f.tape").write_bytes(b"not a tape at all" * 4)
+    with pytest.raises(ValueError):
+        load_tape(tmp_path / "f.tape")
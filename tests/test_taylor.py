@@ -0,0 +1,64 @@
+"""Pytests for TaylorFloat."""
+from forward_propagation import (TaylorFloat, taylor, sin, cos, tan, exp, log,
+                                 sinh, cosh, tanh, asin, acos, atan, asinh,
+                                 acosh, atanh, sqrt)
+import math
+import pytest
+from numpy import allclose
+
+
+@pytest.mark.parametrize(
+    "f, x, coefficients", (
+        (lambda x: 1 / (1 - x), 0, [1, 1, 1, 1, 1, 1, 1]),
+        (lambda x: log(1 + x), 0, [0, 1, -1/2, 1/3, -1/4, 1/5, -1/6]),
+        (exp, 0, [1 / math.factorial(k) for k in range(7)]),
+        (sin, 0, [0, 1, 0, -1/6, 0, 1/120, 0]),
+        (cos, 0, [1, 0, -1/2, 0, 1/24, 0, -1/720]),
+        (tan, 0, [0, 1, 0, 1/3, 0, 2/15, 0]),
+        (sinh, 0, [0, 1, 0, 1/6, 0, 1/120, 0]),
+        (cosh, 0, [1, 0, 1/2, 0, 1/24, 0, 1/720]),
+        (tanh, 0, [0, 1, 0, -1/3, 0, 2/15, 0]),
+        (asin, 0, [0, 1, 0, 1/6, 0, 3/40, 0]),
+        (acos, 0, [math.pi / 2, -1, 0, -1/6, 0, -3/40, 0]),
+        (atan, 0, [0, 1, 0, -1/3, 0, 1/5, 0]),
+        (asinh, 0, [0, 1, 0, -1/6, 0, 3/40, 0]),
+        (atanh, 0, [0, 1, 0, 1/3, 0, 1/5, 0]),
+        (lambda x: sqrt(1 + x), 0, [1, 1/2, -1/8, 1/16, -5/128, 7/256,
+                                    -21/1024]),
+        (lambda x: (1 + x) ** 0.5, 0, [1, 1/2, -1/8, 1/16, -5/128, 7/256,
+                                       -21/1024]),
+        (lambda x: x ** 3, 0, [0, 0, 0, 1, 0, 0, 0]),
+        (lambda x: x ** -1, -1, [-1, -1, -1, -1, -1, -1, -1]),
+        (lambda x: exp(x) * sin(x), 0, [0, 1, 1, 1/3, 0, -1/30, -1/90]),
+        (lambda x: 2 ** x, 0, [math.log(2) ** k / math.factorial(k)
+                               for k in range(7)])
+    )
+)
+def test_series(f, x, coefficients):
+    """Test the Taylor coefficients of known series to sixth order."""
+    assert allclose(f(taylor(x, 6)).c, coefficients)
+
+
+def test_derivatives():
+    """Test derivatives against closed forms, including x ** y."""
+    x = 2.
+    y = acosh(taylor(x, 2))
+    assert allclose(y.derivatives(),
+                    [math.acosh(x), 1 / math.sqrt(3), -x / 3 ** 1.5])
+    y = taylor(x, 3) ** taylor(x, 3)
+    d = x ** x * (math.log(x) + 1)
+    assert allclose(y.derivatives()[:3],
+                    [x ** x, d, d * (math.log(x) + 1) + x ** x / x])
+
+
+def test_constants_and_comparisons():
+    """Test that numbers mix in and comparisons use the constant term."""
+    x = taylor(1, 3)
+    assert allclose((3 - 2 * x / 4).c, [2.5, -0.5, 0, 0])
+    assert x < 2 and not x > 1 and x >= 1
+
+
+def test_bad_type():
+    """Test for type error on an unsupported operand."""
+    with pytest.raises(TypeError):
+        TaylorFloat([1, 1]) + "a"
@@ -1,6 +1,7 @@
 """Pytests for Dfloat and other tangent-linear methods."""
 from forward_propagation import (Dfloat, sin, cos, tan, exp, log, sinh, cosh,
-                                 tanh, asin, acos, atan, asinh, acosh, atanh)
+                                 tanh, asin, acos, atan, asinh, acosh, atanh,
+                                 sqrt, variables)
 import math
 import pytest
 from numpy import allclose
@@ -192,3 +193,39 @@ def test_hyp(f8, y8):
 def test_inv(f9, y9):
     """Test arcsin, arccos, arctan, arsinh, arcosh and artanh methods."""
     assert allclose((f9.x, f9.dx), (y9.x, y9.dx))
+
+
+def test_negative_base():
+    """Test exponentiation of a negative base by a constant."""
+    f = Dfloat(-2, 1) ** 3
+    assert allclose((f.x, f.dx), (-8, 12))
+
+
+def rosenbrock(x, y, z):
+    """Evaluate a three-variable Rosenbrock-like function."""
+    return (1 - x) ** 2 + 100 * (y - x ** 2) ** 2 + sin(z * x) / exp(y)
+
+
+@pytest.mark.parametrize(
+    "f, point", (
+        (rosenbrock, (0.5, 1.5, 2.0)),
+        (lambda x, y, z: tanh(x * y) ** z + acosh(2 + y) * atanh(z / 4),
+         (0.5, 1.5, 2.0)),
+        (lambda x, y, z: asin(x) * acos(y / 2) / atan(z) + cosh(x) ** sinh(y)
+         - log(tan(z)) * asinh(x), (0.5, 1.5, 1.0))
+    )
+)
+def test_vector_mode(f, point):
+    """Test that one vector-mode pass matches one scalar pass per input."""
+    vector = f(*variables(*point))
+    for i in range(len(point)):
+        scalar = f(*(Dfloat(p, 1 if j == i else 0)
+                     for j, p in enumerate(point)))
+        assert allclose((vector.x, vector.dx[i]), (scalar.x, scalar.dx))
+
+
+def test_sqrt_and_comparisons():
+    """Test sqrt and that comparisons use the primal values."""
+    x = sqrt(Dfloat(4, 1))
+    assert allclose((x.x, x.dx), (2, 0.25))
+    assert Dfloat(1, 5) < 2 and Dfloat(3, -1) >= Dfloat(3, 7)